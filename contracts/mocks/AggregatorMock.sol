@@ -37,6 +37,31 @@ contract AggregatorMock is AggregatorV3Interface {
         latestRoundId = _roundId;
     }
 
+    /// @dev bulk loads round history with explicit updatedAt timestamps
+    /// @dev so multi-day histories don't need a tx and mine per round.
+    /// @dev last round given becomes the latest round
+    function setRounds(
+        uint80[] calldata _roundIds,
+        int256[] calldata answers,
+        uint256[] calldata updatedAts
+    ) external {
+        require(
+            _roundIds.length == answers.length && _roundIds.length == updatedAts.length,
+            "AggregatorMock: length mismatch"
+        );
+        for (uint256 i = 0; i < _roundIds.length; i++) {
+            roundData[_roundIds[i]] = RoundData({
+                answer: answers[i],
+                startedAt: updatedAts[i],
+                updatedAt: updatedAts[i],
+                answeredInRound: _roundIds[i]
+            });
+        }
+        if (_roundIds.length > 0) {
+            latestRoundId = _roundIds[_roundIds.length - 1];
+        }
+    }
+
     function latestRoundData()
         public
         view
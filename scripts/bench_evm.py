@@ -0,0 +1,38 @@
+import click
+import time
+
+from brownie import FixedPointMock, accounts, network
+
+from scripts.utils.evm import EVM
+
+
+def _time(mock, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        mock.mulUp(i * 10**15, 3 * 10**18)
+        mock.divDown(i * 10**15, 3 * 10**18)
+    return time.perf_counter() - start
+
+
+def main(calls=1000):
+    """
+    Benchmarks `calls` pairs of FixedPointMock calls on the development
+    node, as the library tests make them with LIBRARY_BACKEND=brownie,
+    against the same calls in the in-process EVM used with
+    LIBRARY_BACKEND=evm.
+
+    Run with `brownie run bench_evm main [calls]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    calls = int(calls)
+
+    node = _time(accounts[0].deploy(FixedPointMock), calls)
+    click.echo(f"node: {2 * calls} calls in {node:.2f}s, "
+               f"{node / (2 * calls) * 1000:.2f} ms/call")
+
+    evm = EVM()
+    local = _time(evm.deploy(FixedPointMock.abi, FixedPointMock.bytecode),
+                  calls)
+    click.echo(f"in process: {2 * calls} calls in {local:.2f}s, "
+               f"{local / (2 * calls) * 1000:.2f} ms/call, "
+               f"{node / local:.1f}x faster")
@@ -0,0 +1,77 @@
+import click
+import time
+
+from brownie import network
+from eth_abi import decode as abi_decode
+
+from scripts.utils.log_decoder import EVENTS, TOPICS, decode, encode
+
+
+MARKET = "0x" + "11" * 20
+OWNER = "0x" + "22" * 20
+
+# args of a typical build, unwind and liquidation, mixed 6:3:1
+TEMPLATES = (
+    ("Build", (OWNER, 7, 5 * 10**19, 4 * 10**22, True, 2000 * 10**18,
+               10**23, 10**23)),
+    ("Unwind", (OWNER, 7, 5 * 10**17, -3 * 10**18, 1990 * 10**18, 10**23,
+                10**23)),
+    ("Liquidate", (OWNER, OWNER, 7, -10**21, 1900 * 10**18, 10**23,
+                   10**23)),
+)
+MIX = (0,) * 6 + (1,) * 3 + (2,)
+
+
+def synthetic_logs(count: int):
+    """
+    Raw logs as eth_getLogs returns them, ten to a block
+    """
+    logs = [encode(name, MARKET, values) for name, values in TEMPLATES]
+    return [dict(logs[MIX[i % len(MIX)]], blockNumber=i // 10,
+                 logIndex=i % 10)
+            for i in range(count)]
+
+
+def decode_per_log(logs):
+    """
+    Baseline decoding each log's data with eth_abi into a dict
+    """
+    types = {name: [t for _, t, indexed in args if not indexed]
+             for name, args in EVENTS.items()}
+    names = {name: [arg for arg, _, indexed in args if not indexed]
+             for name, args in EVENTS.items()}
+    decoded = []
+    for log in logs:
+        name = TOPICS[bytes(log["topics"][0])]
+        decoded.append(dict(zip(names[name],
+                                abi_decode(types[name], log["data"]))))
+    return decoded
+
+
+def main(count=1000000, baseline=100000):
+    """
+    Benchmarks decoding `count` synthetic Build, Unwind and Liquidate logs
+    into columns with log_decoder, against decoding `baseline` of them
+    one at a time with eth_abi.
+
+    Run with `brownie run bench_logs main [count] [baseline]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    count, baseline = int(count), int(baseline)
+    logs = synthetic_logs(count)
+
+    start = time.perf_counter()
+    decoded = decode(logs)
+    columnar = time.perf_counter() - start
+    sizes = ", ".join(f"{len(v)} {k}" for k, v in decoded.items())
+    click.echo(f"columnar: {count} logs ({sizes}) in {columnar:.2f}s, "
+               f"{count / columnar:,.0f} logs/s")
+
+    if baseline <= 0:
+        return
+    start = time.perf_counter()
+    decode_per_log(logs[:baseline])
+    per_log = time.perf_counter() - start
+    click.echo(f"per log: {baseline} logs in {per_log:.2f}s, "
+               f"{baseline / per_log:,.0f} logs/s, "
+               f"{per_log / baseline * count / columnar:.1f}x slower")
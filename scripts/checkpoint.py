@@ -0,0 +1,35 @@
+import click
+import os
+
+from brownie import OverlayV1Market, chain, network
+
+from scripts.utils import checkpoint
+from scripts.utils.reads import read_book
+
+
+def main(market, path=None, block=None, from_block=0,
+         multicall_address=None):
+    """
+    Exports a versioned checkpoint of a market: params, oi, Roller
+    snapshots, feed data, dpUpperLimit and every position. Load it into
+    the reference engine with `checkpoint.load(path).to_market()` or seed it
+    into a local chain with seed_checkpoint.
+
+    Run with `brownie run checkpoint main <market> [path] [block]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    block = chain[int(block) if block is not None else -1]
+    market = OverlayV1Market.at(market)
+    read, positions = read_book(market, block.number, int(from_block),
+                                multicall_address)
+
+    if path is None:
+        path = os.path.join(
+            "checkpoints", network.show_active(),
+            f"{market.address}-{block.number}.ckpt")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    checkpoint.write(path, market.address, block.number, block.timestamp,
+                     read.state, read.snapshots, read.data,
+                     read.dp_upper_limit, positions)
+    click.echo(f"Wrote checkpoint of {len(positions)} positions at block "
+               f"{block.number} to {path}")
@@ -0,0 +1,132 @@
+import click
+import json
+import time
+
+from brownie import OverlayV1Factory, accounts, interface, network, web3
+from pathlib import Path
+
+from scripts.create import FACTORY
+from scripts.utils.market_config import (
+    ADDRESS_PATTERN, FeedState, load_specs, validate_specs
+)
+from scripts.utils.transactions import CONFIRMED, PipelinedSender
+
+
+def main(config=None, manifest=None):
+    """
+    Creates many OverlayV1Market contracts through factory `deployMarket()`
+    from a yaml or csv config of (feedFactory, feed, params) entries.
+
+    Specs are validated against the factory bounds, factory feed checks and
+    market checks before any transaction is sent. Transactions are broadcast
+    back to back using locally assigned nonces, then receipts are collected
+    and written to a json deployment manifest.
+
+    Run with `brownie run create_batch main <config> [<manifest>]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    if config is None:
+        config = click.prompt("Config (yaml or csv)")
+
+    # instantiate the factory contract
+    factory = OverlayV1Factory.at(FACTORY)
+
+    # load market specs and fetch each feed's macro window and factory
+    # state so the market initialize and factory feed checks can be
+    # validated alongside factory bounds before anything is broadcast
+    specs = load_specs(config)
+    macro_windows = {}
+    feed_states = {}
+    for spec in specs:
+        try:
+            macro_windows[spec.feed.lower()] = interface.IOverlayV1Feed(
+                spec.feed).macroWindow()
+        except Exception:
+            click.echo(f"  {spec.name}: could not read macroWindow for feed "
+                       f"{spec.feed}, checking factory bounds only")
+
+        # malformed addresses are reported by validate_specs
+        if not all(ADDRESS_PATTERN.match(a)
+                   for a in (spec.feed_factory, spec.feed)):
+            continue
+        try:
+            feed_exists = interface.IOverlayV1FeedFactory(
+                spec.feed_factory).isFeed(spec.feed)
+        except Exception:
+            feed_exists = False
+        feed_states[spec.feed.lower()] = FeedState(
+            market=factory.getMarket(spec.feed),
+            feed_factory_supported=factory.isFeedFactory(spec.feed_factory),
+            feed_exists=feed_exists
+        )
+
+    errors = validate_specs(specs, macro_windows, feed_states)
+    if len(errors) > 0:
+        for error in errors:
+            click.echo(f"  {error}")
+        raise click.ClickException(
+            f"{len(errors)} invalid entries in {config}")
+    click.echo(f"Loaded {len(specs)} valid markets from {config}")
+
+    gov = accounts.load(click.prompt(
+        "Account", type=click.Choice(accounts.load())))
+
+    for spec in specs:
+        click.echo(f"  {spec.name}: feed {spec.feed} "
+                   f"(feedFactory {spec.feed_factory})")
+
+    if not click.confirm(f"Deploy {len(specs)} New Markets"):
+        return
+
+    # broadcast all deployMarket txs without waiting on receipts
+    sender = PipelinedSender(gov)
+    steps = [
+        sender.transact(factory, "deployMarket", *spec.as_args(),
+                        name=spec.name)
+        for spec in specs
+    ]
+    sender.run(raise_on_failure=False)
+
+    # assemble the deployment manifest from the receipts
+    records = []
+    for spec, step in zip(specs, steps):
+        record = {
+            "name": spec.name,
+            "feedFactory": spec.feed_factory,
+            "feed": spec.feed,
+            "params": spec.params_dict(),
+            "market": None,
+            "txHash": None,
+            "nonce": step.nonce,
+            "blockNumber": None,
+            "gasUsed": step.gas_used,
+            "status": "deployed" if step.status == CONFIRMED else "failed",
+            "error": step.error
+        }
+        if step.tx is not None:
+            record.update({
+                "txHash": step.tx.txid,
+                "blockNumber": step.tx.block_number
+            })
+        if step.status == CONFIRMED:
+            record["market"] = step.tx.events["MarketDeployed"]["market"]
+        click.echo(f"{spec.name}: {record['status']} {record['market']}")
+        records.append(record)
+
+    if manifest is None:
+        manifest = f"deployments/{network.show_active()}/" \
+            f"markets-{int(time.time())}.json"
+    Path(manifest).parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest, "w") as f:
+        json.dump({
+            "network": network.show_active(),
+            "chainId": web3.chain_id,
+            "factory": factory.address,
+            "sender": gov.address,
+            "config": str(config),
+            "markets": records
+        }, f, indent=2)
+
+    deployed = sum(1 for r in records if r["status"] == "deployed")
+    click.echo(f"{deployed}/{len(records)} markets deployed. "
+               f"Manifest written to {manifest}")
@@ -1,8 +1,12 @@
 import click
 
-from brownie import OverlayV1Token, OverlayV1Factory, accounts, network, web3
+from brownie import (
+    OverlayV1Token, OverlayV1Factory, accounts, network, web3
+)
 from hexbytes import HexBytes
 
+from scripts.utils.transactions import PipelinedSender
+
 
 # governance multisig
 # TODO: change
@@ -12,49 +16,82 @@ GOV = "0x95f972fc4D17a0D343Cd5eaD8d6DCBef5606CA66"
 # TODO: change
 FEE_RECIPIENT = "0xDFafdfF09C1d63257892A8d2F56483588B99315A"
 
+# arbitrum sequencer uptime oracle and grace period after it comes back up
+# SEE: scripts/config/ArbMainnet.config.sol
+SEQUENCER_ORACLE = "0xFdB631F5EE196F0ed6FAa767959853A9F217697D"
+GRACE_PERIOD = 3600
+
 # ROLES
 ADMIN = "ADMIN"
 GOVERNOR = "GOVERNOR"
 MINTER = "MINTER"
 BURNER = "BURNER"
 
+# mode to deploy to a local chain and only report time and gas
+DRY_RUN = "dry-run"
+
 
 def _role(name):
     if name == ADMIN:
         return HexBytes("0x00")
-    return web3.solidityKeccak(['string'], [name])
+    return web3.solidity_keccak(['string'], [name])
 
 
-def main():
+def main(mode=None):
     """
     Deploys new OverlayV1Token and OverlayV1Factory contracts.
 
     Grants token admin rights to the factory to enable deploying of markets
     with mint and burn priveleges. Grants token admin rights to governor and
     renounces all token rights for deployer.
+
+    Transactions are pipelined: the token and factory deploys are sent
+    together, then the role grants together once the token is deployed,
+    and the deployer only renounces admin after every grant succeeded.
+
+    Run with `brownie run deploy main dry-run` on a local chain to report
+    total time and gas without publishing sources.
     """
     click.echo(f"You are using the '{network.show_active()}' network")
-    dev = accounts.load(click.prompt(
-        "Account", type=click.Choice(accounts.load())))
+    dry_run = mode == DRY_RUN
+    if dry_run:
+        if not network.rpc.is_active():
+            raise click.ClickException("dry run requires a local chain")
+        dev = accounts[0]
+    else:
+        dev = accounts.load(click.prompt(
+            "Account", type=click.Choice(accounts.load())))
+
+    sender = PipelinedSender(dev, publish_source=not dry_run)
 
     # deploy OVL
-    ovl = OverlayV1Token.deploy({"from": dev}, publish_source=True)
-    click.echo(f"OVL Token deployed [{ovl.address}]")
+    ovl = sender.deploy(OverlayV1Token)
 
-    # deploy market factory
-    factory = OverlayV1Factory.deploy(
-        ovl, FEE_RECIPIENT, {"from": dev}, publish_source=True)
-    click.echo(f"Factory deployed [{factory.address}]")
+    # deploy market factory. only needs the OVL address, which is known
+    # once its deploy is sent
+    factory = sender.deploy(OverlayV1Factory, ovl, FEE_RECIPIENT,
+                            SEQUENCER_ORACLE, GRACE_PERIOD)
 
     # grant market factory admin role to grant minter + burner roles to markets
     # on deployMarket calls
-    ovl.grantRole(_role(ADMIN), factory, {"from": dev})
+    grants = [sender.transact(ovl, "grantRole", _role(ADMIN), factory,
+                              after=[factory])]
 
     # grant admin rights to gov
-    ovl.grantRole(_role(ADMIN), GOV, {"from": dev})
-    ovl.grantRole(_role(MINTER), GOV, {"from": dev})
-    ovl.grantRole(_role(GOVERNOR), GOV, {"from": dev})
-    click.echo(f"OVL Token roles granted to [{GOV}]")
+    grants.append(sender.transact(ovl, "grantRole", _role(ADMIN), GOV))
+    grants.append(sender.transact(ovl, "grantRole", _role(MINTER), GOV))
+    grants.append(sender.transact(ovl, "grantRole", _role(GOVERNOR), GOV))
+
+    # renounce admin rights so only gov has roles. only once every grant
+    # has succeeded, otherwise the token could be left without an admin
+    sender.transact(ovl, "renounceRole", _role(ADMIN), dev, after=grants)
+
+    try:
+        sender.run()
+    finally:
+        for line in sender.summary():
+            click.echo(line)
 
-    # renounce admin rights so only gov has roles
-    ovl.renounceRole(_role(ADMIN), dev, {"from": dev})
+    click.echo(f"OVL Token deployed [{ovl.address}]")
+    click.echo(f"Factory deployed [{factory.address}]")
+    click.echo(f"OVL Token roles granted to [{GOV}]")
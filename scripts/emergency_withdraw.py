@@ -0,0 +1,61 @@
+import click
+
+from brownie import OverlayV1Market, accounts, chain, interface, network
+
+from scripts.utils.reads import load_position_ids, read_positions
+from scripts.utils.transactions import PipelinedSender
+from scripts.utils.withdrawals import plan
+
+
+def main(market, execute=False, block=None, from_block=0,
+         multicall_address=None):
+    """
+    Plans emergency withdrawals on a shut down market: every live
+    position from the market's Build events, the exact amount owed to
+    each, and whether the market's OVL balance covers the total. Largest
+    withdrawals are planned first.
+
+    With `execute` true (1, true or yes), submits the planned withdrawals
+    of the chosen account as pipelined transactions.
+
+    Run with `brownie run emergency_withdraw main <market> [execute]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    block = chain[int(block) if block is not None else -1]
+    market = OverlayV1Market.at(market)
+    if not market.isShutdown(block_identifier=block.number):
+        click.echo(f"Market {market.address} is not shut down")
+        return
+
+    ids = load_position_ids(market, int(from_block),
+                            to_block=block.number)
+    positions = read_positions(market, ids, block.number, multicall_address)
+    ovl = interface.IOverlayV1Token(market.ovl())
+    p = plan(ids, positions, ovl.balanceOf(market,
+                                           block_identifier=block.number))
+
+    for i, w in enumerate(p.withdrawals):
+        short = "" if w.amount == w.cost else f" (short {w.cost - w.amount})"
+        click.echo(f"{i:>6} {w.owner} {w.position_id:>6} "
+                   f"{w.amount}{short}")
+    click.echo(f"\n{len(p.withdrawals)} positions at block {block.number}: "
+               f"owed {p.owed} balance {p.balance} "
+               f"shortfall {p.shortfall} remaining {p.remaining}")
+
+    if str(execute).lower() not in ("1", "true", "yes"):
+        return
+
+    account = accounts.load(click.prompt(
+        "Account", type=click.Choice(accounts.load())))
+    withdrawals = p.by_owner().get(account.address, [])
+    if len(withdrawals) == 0:
+        click.echo(f"No positions to withdraw for {account.address}")
+        return
+
+    sender = PipelinedSender(account)
+    steps = [sender.transact(market, "emergencyWithdraw", w.position_id)
+             for w in withdrawals]
+    sender.run(raise_on_failure=False)
+    for w, step in zip(withdrawals, steps):
+        click.echo(f"emergencyWithdraw {w.position_id}: {step.status} "
+                   f"(expected {w.amount})")
@@ -0,0 +1,75 @@
+import click
+import numpy as np
+import os
+
+from brownie import OverlayV1Market, chain, interface, network
+
+from scripts.reference.risk import Parameters
+from scripts.utils import feed_series
+from scripts.utils.feed_series import (
+    capacity, concat, from_data, params_from_reads
+)
+from scripts.utils.reads import read_feed_history
+
+
+def main(market, from_block, to_block=None, step=300, path=None,
+         params_path=None, multicall_address=None, workers=8):
+    """
+    Samples the market's feed data, params and dpUpperLimit every `step`
+    blocks from an archive node, one multicall per sampled block with up
+    to `workers` in flight. Appends the feed samples to the feed's
+    columnar history and the params to the market's, then reports how
+    the market's effective capacity behaved over the whole history:
+    notional cap after the front and back running bounds, cap in oi and
+    how often dataIsValid fails. Each sample is analyzed with the params
+    in effect at its timestamp.
+
+    Run with `brownie run feed_history main <market> <from_block>
+    [to_block] [step] [path]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    market = OverlayV1Market.at(market)
+    feed = interface.IOverlayV1Feed(market.feed())
+    to_block = int(to_block) if to_block is not None else chain.height
+
+    if path is None:
+        path = os.path.join("feeds", network.show_active(),
+                            f"{feed.address}.npz")
+    if params_path is None:
+        params_path = os.path.join("feeds", network.show_active(),
+                                   f"{feed.address}-{market.address}.npz")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    os.makedirs(os.path.dirname(params_path) or ".", exist_ok=True)
+
+    blocks = range(int(from_block), to_block + 1, int(step))
+    reads = read_feed_history(market, feed, blocks, multicall_address,
+                              int(workers))
+    series = from_data([r.data for r in reads])
+    history = params_from_reads([r.data.timestamp for r in reads],
+                                [r.params for r in reads],
+                                [r.dp_upper_limit for r in reads])
+    if os.path.exists(path):
+        series = concat([feed_series.load(path), series])
+    if os.path.exists(params_path):
+        history = concat([feed_series.load_params(params_path), history])
+    series.save(path)
+    history.save(params_path)
+    click.echo(f"Saved {len(series)} samples of {feed.address} to {path} "
+               f"and {len(history)} of {market.address} params to "
+               f"{params_path}")
+
+    params, dp_upper_limit = history.at(series.timestamp)
+    cap = capacity(series, params, dp_upper_limit)
+    cap_notional = params[:, Parameters.CapNotional] / 1e18
+    bounded = cap.cap_notional < cap_notional
+    click.echo(f"cap notional: min {cap.cap_notional.min():.2f} "
+               f"median {np.median(cap.cap_notional):.2f} "
+               f"max {cap.cap_notional.max():.2f} OVL "
+               f"(bounded below capNotional in {bounded.mean():.2%})")
+    click.echo(f"cap oi: min {cap.cap_oi.min():.4f} "
+               f"median {np.median(cap.cap_oi):.4f} "
+               f"max {cap.cap_oi.max():.4f}")
+    click.echo(f"spread at zero volume: median "
+               f"{np.median(cap.ask / cap.bid - 1):.4%}")
+    click.echo(f"dataIsValid failed in {(~cap.is_valid).mean():.2%} of "
+               f"samples")
@@ -0,0 +1,110 @@
+import click
+
+from brownie import OverlayV1Factory, accounts, chain, network, web3
+
+from scripts.create import FACTORY
+from scripts.reference.market import data_is_valid, mid_from_feed
+from scripts.reference.position import exists
+from scripts.utils.liquidations import GasCurve, LiquidationQueue, liquidation
+from scripts.utils.reads import (
+    load_invalidations, load_markets, load_position_ids, read_markets,
+    read_positions
+)
+from scripts.utils.transactions import CONFIRMED, PipelinedSender
+from scripts.utils.view_cache import CachedContract, ViewCache
+
+
+def main(ovl_price, max_per_block=10, from_block=0, multicall_address=None):
+    """
+    Keeper that liquidates positions on every market deployed by the
+    factory, most profitable first.
+
+    Each block, market state and positions are read in one multicall per
+    market, liquidatable positions are scored by reward less estimated
+    gas and the top `max_per_block` profitable ones are liquidated with
+    pipelined transactions. Gas used is fed back into the gas curve.
+    `ovl_price` is the price of 1 OVL in native token wei. View calls go
+    through a cache whose hit rate is printed on exit.
+
+    Run with `brownie run liquidate main <ovl_price> [max_per_block]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    keeper = accounts.load(click.prompt(
+        "Account", type=click.Choice(accounts.load())))
+
+    factory = OverlayV1Factory.at(FACTORY)
+    cache = ViewCache()
+    markets = [(CachedContract(market, cache), CachedContract(feed, cache))
+               for market, feed in load_markets(factory, int(from_block))]
+    contracts = {market.address: market for market, _ in markets}
+    gas_curve = GasCurve()
+    ids = {market.address: [] for market, _ in markets}
+    scanned = [int(from_block) - 1]
+
+    def score(block):
+        # only scan for events since the last block read
+        cache.advance(block.number)
+        for event in load_invalidations(factory, contracts.values(),
+                                        scanned[0] + 1, block.number):
+            cache.observe(event)
+        for market, _ in markets:
+            ids[market.address] += load_position_ids(
+                market, scanned[0] + 1, to_block=block.number)
+        scanned[0] = block.number
+
+        queue = LiquidationQueue(web3.eth.gas_price, int(ovl_price),
+                                 gas_curve)
+        elapsed = {}
+        for read in read_markets(markets, block.number, multicall_address):
+            # liquidate() reverts with OVLV1:!data while the feed fails
+            # the market's price drift sanity check
+            if not data_is_valid(read.data, read.dp_upper_limit):
+                click.echo(f"[{block.number}] skipping {read.market}: "
+                           "feed data fails drift check")
+                continue
+
+            market = contracts[read.market]
+            positions = read_positions(market, ids[read.market],
+                                       block.number, multicall_address)
+
+            # liquidate() pays funding before checking, so value positions
+            # against the state after funding at the current timestamp
+            state = read.state.pay_funding(block.timestamp)
+            mid = mid_from_feed(read.data)
+            elapsed[read.market] = \
+                block.timestamp - read.state.timestamp_update_last
+            for (owner, id), pos in zip(ids[read.market], positions):
+                if not exists(pos):
+                    continue
+                queue.push(read.market, owner, id,
+                           liquidation(pos, state, mid),
+                           elapsed[read.market])
+
+        candidates = []
+        for candidate in queue.profitable():
+            candidates.append(candidate)
+            if len(candidates) >= int(max_per_block):
+                break
+        return candidates, elapsed
+
+    try:
+        for block in chain.new_blocks():
+            candidates, elapsed = score(block)
+            if len(candidates) == 0:
+                continue
+
+            sender = PipelinedSender(keeper)
+            steps = [sender.transact(contracts[c.market], "liquidate",
+                                     c.owner, c.position_id)
+                     for c in candidates]
+            sender.run(raise_on_failure=False)
+
+            for candidate, step in zip(candidates, steps):
+                click.echo(f"[{block.number}] liquidate {candidate.owner} "
+                           f"{candidate.position_id} on {candidate.market}: "
+                           f"{step.status} "
+                           f"(expected profit {candidate.profit})")
+                if step.status == CONFIRMED:
+                    gas_curve.add(elapsed[candidate.market], step.gas_used)
+    finally:
+        click.echo(cache.report())
@@ -0,0 +1,59 @@
+import click
+import numpy as np
+
+from brownie import OverlayV1Factory, chain, network
+
+from scripts.create import FACTORY
+from scripts.reference.market import mid_from_feed
+from scripts.utils.funding import liquidation_times
+from scripts.utils.position_book import to_array
+from scripts.utils.reads import (
+    load_markets, load_position_ids, read_markets_with_positions
+)
+
+
+def main(moves="-0.05,0,0.05", limit=20, block=None, from_block=0,
+         multicall_address=None):
+    """
+    Prints when each open position becomes liquidatable from funding with
+    the mid price held at its current value shifted by each of moves
+    (comma separated fractions), soonest first. Keepers can schedule
+    checks at these times instead of polling every block.
+
+    Run with `brownie run liquidation_schedule main [moves] [limit]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    block = chain[int(block) if block is not None else -1]
+    moves = [float(m) for m in str(moves).split(",")]
+    factory = OverlayV1Factory.at(FACTORY)
+    markets = load_markets(factory, int(from_block), block.number)
+    ids = [load_position_ids(market, int(from_block),
+                             to_block=block.number)
+           for market, _ in markets]
+
+    reads = read_markets_with_positions(markets, ids, block.number,
+                                        multicall_address)
+    rows = []
+    for (read, infos), market_ids in zip(reads, ids):
+        if len(infos) == 0:
+            continue
+        state = read.state.pay_funding(block.timestamp)
+        mid_price = mid_from_feed(read.data)
+        prices = [int(mid_price * (1 + m)) for m in moves]
+        times = liquidation_times(
+            state, to_array([(o, i, info) for (o, i), info
+                             in zip(market_ids, infos)]), prices)
+        for j, (owner, id) in enumerate(market_ids):
+            if np.isnan(times[:, j]).all():
+                continue
+            rows.append((times[:, j].min(), read.market, owner, id,
+                         times[:, j]))
+
+    rows.sort(key=lambda row: row[0])
+    header = " ".join(f"{m:+.2%}".rjust(12) for m in moves)
+    click.echo(f"\nseconds until liquidatable at block {block.number}")
+    click.echo(f"{'market':<42} {'owner':<42} {'id':>6} {header}")
+    for _, market, owner, id, times in rows[:int(limit)]:
+        cols = " ".join(f"{t:>12.0f}" if np.isfinite(t) else f"{'never':>12}"
+                        for t in times)
+        click.echo(f"{market:<42} {owner:<42} {id:>6} {cols}")
@@ -0,0 +1,40 @@
+import click
+
+from brownie import OverlayV1Market, chain, interface, network
+
+from scripts.utils.reads import read_markets
+from scripts.utils.sizing import Market, max_collateral, max_leverage
+
+
+def main(market, side, leverage=None, collateral=None,
+         multicall_address=None):
+    """
+    Prints the largest position that can be built on market right now:
+    the max collateral at the given leverage, or the max leverage for the
+    given collateral. Both in 18 decimals. side is "long" or "short".
+
+    Run with `brownie run max_size main <market> long <leverage>` or
+    `brownie run max_size main <market> long None <collateral>`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    if side not in ("long", "short"):
+        raise click.BadParameter(f"{side!r} is not 'long' or 'short'",
+                                 param_hint="side")
+    is_long = side == "long"
+    market = OverlayV1Market.at(market)
+    feed = interface.IOverlayV1Feed(market.feed())
+    block = chain[-1]
+
+    [read] = read_markets([(market, feed)], block.number, multicall_address)
+    # assume the build is mined in the next second
+    m = Market(read.state, read.snapshots, read.data, read.dp_upper_limit,
+               block.timestamp + 1)
+
+    if leverage not in (None, "None"):
+        amount = max_collateral(m, int(leverage), is_long)
+        click.echo(f"Max collateral at {int(leverage) / 1e18}x {side}: "
+                   f"{amount / 1e18} OVL ({amount})")
+    else:
+        amount = max_leverage(m, int(collateral), is_long)
+        click.echo(f"Max leverage for {int(collateral) / 1e18} OVL {side}: "
+                   f"{amount / 1e18}x ({amount})")
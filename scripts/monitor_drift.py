@@ -0,0 +1,40 @@
+import click
+
+from brownie import OverlayV1Factory, chain, network
+
+from scripts.create import FACTORY
+from scripts.utils.drift import DriftMonitor
+from scripts.utils.reads import load_markets, read_markets
+
+
+def main(horizon=3600, window=20, from_block=0, multicall_address=None):
+    """
+    Monitors every market deployed by the factory for feed data drifting
+    toward the dataIsValid bounds. Each block, reads all markets in one
+    multicall and alerts when data is invalid or its current trend is
+    projected to breach the bound within `horizon` seconds.
+
+    Run with `brownie run monitor_drift main [horizon] [window]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    horizon = int(horizon)
+    factory = OverlayV1Factory.at(FACTORY)
+    markets = load_markets(factory, int(from_block))
+    click.echo(f"Monitoring {len(markets)} markets")
+
+    monitor = DriftMonitor(window=int(window))
+    for block in chain.new_blocks():
+        for read in read_markets(markets, block.number, multicall_address):
+            address = read.market
+            dp_upper_limit = read.dp_upper_limit
+            state = monitor.update(address, read.data, dp_upper_limit)
+            if not state.alert(horizon):
+                continue
+
+            if not state.is_valid:
+                click.echo(f"[{block.number}] {address}: data invalid "
+                           f"(dp={state.dp}, limit={dp_upper_limit})")
+            else:
+                click.echo(f"[{block.number}] {address}: projected to "
+                           f"breach in {state.seconds_to_breach:.0f}s "
+                           f"(utilization={state.utilization:+.2%})")
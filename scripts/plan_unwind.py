@@ -0,0 +1,43 @@
+import click
+
+from brownie import OverlayV1Market, chain, interface, network
+
+from scripts.utils.impact import Market
+from scripts.utils.reads import read_markets_with_positions
+from scripts.utils.unwind_plan import plan
+
+
+def main(market, owner, position_id, fraction=10**18, volatility=0.,
+         risk_aversion=0., gas_cost=0., max_slices=10,
+         multicall_address=None):
+    """
+    Plans unwinding `fraction` (18 decimals) of a position in slices
+    spaced in time to reduce price impact, given price `volatility` per
+    sqrt(second), `risk_aversion` to the variance of exposure still held
+    and `gas_cost` in OVL per unwind. Prints each slice's time, unwind()
+    fraction and simulated exit price.
+
+    Run with `brownie run plan_unwind main <market> <owner> <position_id>
+    [fraction] [volatility] [risk_aversion] [gas_cost]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    market = OverlayV1Market.at(market)
+    feed = interface.IOverlayV1Feed(market.feed())
+    block = chain[-1]
+
+    [(read, [pos])] = read_markets_with_positions(
+        [(market, feed)], [[(owner, int(position_id))]], block.number,
+        multicall_address)
+    # assume the first unwind is mined in the next second
+    m = Market(read.state, read.snapshots, read.data, read.dp_upper_limit,
+               block.timestamp + 1)
+
+    p = plan(m, pos, int(fraction), float(volatility), float(risk_aversion),
+             float(gas_cost), int(max_slices))
+    click.echo(f"{len(p.slices)} slices {p.interval}s apart: proceeds "
+               f"{p.proceeds:.4f} OVL at average price "
+               f"{p.average_price:.6f}, risk {p.risk:.4f}, "
+               f"score {p.score:.4f}")
+    for s in p.slices:
+        click.echo(f"  +{s.time}s: unwind({s.fraction}) at "
+                   f"{s.price / 1e18:.6f}, value {s.value / 1e18:.4f} OVL")
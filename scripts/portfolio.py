@@ -0,0 +1,58 @@
+import click
+
+from brownie import OverlayV1Factory, chain, network
+
+from scripts.create import FACTORY
+from scripts.reference.market import mid_from_feed
+from scripts.utils.portfolio import totals, valuation
+from scripts.utils.position_book import to_array
+from scripts.utils.reads import (
+    load_markets, load_position_ids, read_markets_with_positions
+)
+
+
+def main(owner, block=None, from_block=0, multicall_address=None):
+    """
+    Values every position of owner across all markets deployed by the
+    factory: value, PnL, funding accrued, liquidation price and margin
+    health. Market state and positions are read in one multicall.
+
+    Run with `brownie run portfolio main <owner> [block]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    block = chain[int(block) if block is not None else -1]
+    factory = OverlayV1Factory.at(FACTORY)
+    markets = load_markets(factory, int(from_block), block.number)
+    ids = [load_position_ids(market, int(from_block), owner, block.number)
+           for market, _ in markets]
+
+    reads = read_markets_with_positions(markets, ids, block.number,
+                                        multicall_address)
+    valuations = []
+    for (read, infos), market_ids in zip(reads, ids):
+        if len(infos) == 0:
+            continue
+        # value against state after funding at the block timestamp
+        state = read.state.pay_funding(block.timestamp)
+        v = valuation(read.market, state, mid_from_feed(read.data),
+                      to_array([(o, i, info) for (o, i), info
+                                in zip(market_ids, infos)]))
+        valuations.append(v)
+
+        click.echo(f"\n{read.market}")
+        for j in range(len(v)):
+            if v.notional[j] == 0:
+                continue
+            side = "long " if v.is_long[j] else "short"
+            click.echo(
+                f"  {v.position_id[j]:>6} {side}"
+                f" value {v.value[j]:.6f} pnl {v.pnl[j]:+.6f}"
+                f" funding {v.funding[j]:+.6f}"
+                f" liq price {v.liquidation_price[j]:.6g}"
+                f" health {v.health[j]:.3f}")
+
+    t = totals(valuations)
+    click.echo(f"\n{t.positions} open positions at block {block.number}: "
+               f"collateral {t.collateral:.6f} value {t.value:.6f} "
+               f"pnl {t.pnl:+.6f} funding {t.funding:+.6f} "
+               f"min health {t.min_health:.3f}")
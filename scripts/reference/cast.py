@@ -0,0 +1,19 @@
+UINT32_MAX = 2**32 - 1
+INT192_MAX = 2**191 - 1
+INT192_MIN = -2**191
+
+
+def to_uint32_bounded(value: int) -> int:
+    """
+    Casts an uint256 to an uint32 bounded by uint32 range of values
+    """
+    return value if value <= UINT32_MAX else UINT32_MAX
+
+
+def to_int192_bounded(value: int) -> int:
+    """
+    Casts an int256 to an int192 bounded by int192 range of values
+    """
+    if value < INT192_MIN:
+        return INT192_MIN
+    return value if value <= INT192_MAX else INT192_MAX
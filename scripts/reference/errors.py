@@ -0,0 +1,17 @@
+class Revert(Exception):
+    """
+    Raised where the mirrored contract would revert. The exception message
+    is the contract's revert reason string
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def require(condition: bool, reason: str):
+    """
+    Mirrors solidity `require`: raises Revert(reason) if condition is false
+    """
+    if not condition:
+        raise Revert(reason)
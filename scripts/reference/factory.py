@@ -0,0 +1,84 @@
+from typing import List, Sequence, Tuple
+
+from .errors import Revert, require
+from .risk import NUM_PARAMETERS, Parameters
+
+
+# risk param bounds mirrored from OverlayV1Factory
+# NOTE: 1bps = 1e14
+PARAMS_MIN = [
+    0,  # MIN_K = 0
+    10**16,  # MIN_LMBDA = 0.01
+    0,  # MIN_DELTA = 0
+    10**18,  # MIN_CAP_PAYOFF = 1x
+    0,  # MIN_CAP_NOTIONAL = 0 OVL
+    10**18,  # MIN_CAP_LEVERAGE = 1x
+    86400,  # MIN_CIRCUIT_BREAKER_WINDOW = 1 day
+    0,  # MIN_CIRCUIT_BREAKER_MINT_TARGET = 0 OVL
+    10**16,  # MIN_MAINTENANCE_MARGIN_FRACTION = 1%
+    10**16,  # MIN_MAINTENANCE_MARGIN_BURN_RATE = 1%
+    10**15,  # MIN_LIQUIDATION_FEE_RATE = 0.10% (10 bps)
+    10**14,  # MIN_TRADING_FEE_RATE = 0.01% (1 bps)
+    10**14,  # MIN_MINIMUM_COLLATERAL = 1e-4 OVL
+    10**12,  # MIN_PRICE_DRIFT_UPPER_LIMIT = 0.01 bps/s
+    100  # MIN_AVERAGE_BLOCK_TIME = 0.1s
+]
+PARAMS_MAX = [
+    4 * 10**12,  # MAX_K = ~ 1000 bps / 8 hr
+    10 * 10**18,  # MAX_LMBDA = 10
+    200 * 10**14,  # MAX_DELTA = 2% (200 bps)
+    100 * 10**18,  # MAX_CAP_PAYOFF = 100x
+    88_888_888 * 10**18,  # MAX_CAP_NOTIONAL = 88,888,888 OVL
+    99 * 10**18,  # MAX_CAP_LEVERAGE = 99x
+    31536000,  # MAX_CIRCUIT_BREAKER_WINDOW = 365 days
+    88_888_888 * 10**18,  # MAX_CIRCUIT_BREAKER_MINT_TARGET = 88,888,888 OVL
+    2 * 10**17,  # MAX_MAINTENANCE_MARGIN_FRACTION = 20%
+    5 * 10**17,  # MAX_MAINTENANCE_MARGIN_BURN_RATE = 50%
+    2 * 10**17,  # MAX_LIQUIDATION_FEE_RATE = 20.00% (2000 bps)
+    100 * 10**14,  # MAX_TRADING_FEE_RATE = 1% (100 bps)
+    100_000 * 10**18,  # MAX_MINIMUM_COLLATERAL = 100,000 OVL
+    10**14,  # MAX_PRICE_DRIFT_UPPER_LIMIT = 1 bps/s
+    3600000  # MAX_AVERAGE_BLOCK_TIME = 1h (arbitrary but large)
+]
+
+
+def _check_length(params: Sequence[int]):
+    if len(params) != NUM_PARAMETERS:
+        raise ValueError(
+            f"expected {NUM_PARAMETERS} risk params, got {len(params)}")
+
+
+def check_risk_param(name: Parameters, value: int):
+    """
+    Checks risk param is within acceptable bounds. Mirrors
+    OverlayV1Factory._checkRiskParam
+    """
+    min_value = PARAMS_MIN[int(name)]
+    max_value = PARAMS_MAX[int(name)]
+    require(value >= min_value and value <= max_value,
+            "OVLV1: param out of bounds")
+
+
+def check_risk_params(params: Sequence[int]):
+    """
+    Checks all risk params are within acceptable bounds. Mirrors
+    OverlayV1Factory._checkRiskParams
+    """
+    _check_length(params)
+    for name in Parameters:
+        check_risk_param(name, params[int(name)])
+
+
+def risk_param_errors(params: Sequence[int]) -> List[Tuple[Parameters, str]]:
+    """
+    Returns every (name, reason) pair that would cause the factory to
+    revert on the given params instead of stopping at the first
+    """
+    _check_length(params)
+    errors = []
+    for name in Parameters:
+        try:
+            check_risk_param(name, params[int(name)])
+        except Revert as e:
+            errors.append((name, e.reason))
+    return errors
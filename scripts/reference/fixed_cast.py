@@ -0,0 +1,21 @@
+from .errors import require
+
+
+PRECISION_CHANGER = 10**14
+UINT16_MAX = 2**16 - 1
+
+
+def to_uint256_fixed(value: int) -> int:
+    """
+    Casts a uint16 to a FixedPoint uint256 with 18 decimals
+    """
+    return value * PRECISION_CHANGER
+
+
+def to_uint16_fixed(value: int) -> int:
+    """
+    Casts a FixedPoint uint256 to a uint16 with 4 decimals
+    """
+    ret256 = value // PRECISION_CHANGER
+    require(ret256 <= UINT16_MAX, "OVLV1: FixedCast out of bounds")
+    return ret256
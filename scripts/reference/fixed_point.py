@@ -0,0 +1,145 @@
+"""
+Exact integer port of contracts/libraries/FixedPoint.sol. Values are
+uint256/int256 fixed point numbers with 18 decimals stored as python ints.
+"""
+from . import log_exp_math
+from .errors import require
+
+
+ONE = 10**18  # 18 decimal places
+TWO = 2 * ONE
+FOUR = 4 * ONE
+MAX_POW_RELATIVE_ERROR = 10000  # 10^(-14)
+
+# Minimum base for the power function when the exponent is 'free'
+MIN_POW_BASE_FREE_EXPONENT = 7 * 10**17
+
+
+def sub_floor(a: int, b: int) -> int:
+    """
+    a - b but floors to zero if a <= b
+    """
+    return a - b if a > b else 0
+
+
+def mul_down(a: int, b: int) -> int:
+    return (a * b) // ONE
+
+
+def mul_up(a: int, b: int) -> int:
+    product = a * b
+    if product == 0:
+        return 0
+    return ((product - 1) // ONE) + 1
+
+
+def div_down(a: int, b: int) -> int:
+    if a == 0:
+        return 0
+    return (a * ONE) // b
+
+
+def div_up(a: int, b: int) -> int:
+    if a == 0:
+        return 0
+    return ((a * ONE - 1) // b) + 1
+
+
+def pow_down(x: int, y: int) -> int:
+    """
+    Returns x^y, assuming both are fixed point numbers, rounding down
+    """
+    if y == 0 or x == ONE:
+        return ONE
+    elif x == 0:
+        return 0
+    elif y == ONE:
+        return x
+    elif y == TWO:
+        return mul_down(x, x)
+    elif y == FOUR:
+        square = mul_down(x, x)
+        return mul_down(square, square)
+
+    raw = log_exp_math.pow(x, y)
+    max_error = mul_up(raw, MAX_POW_RELATIVE_ERROR) + 1
+    return 0 if raw < max_error else raw - max_error
+
+
+def pow_up(x: int, y: int) -> int:
+    """
+    Returns x^y, assuming both are fixed point numbers, rounding up
+    """
+    if y == 0 or x == ONE:
+        return ONE
+    elif x == 0:
+        return 0
+    elif y == ONE:
+        return x
+    elif y == TWO:
+        return mul_up(x, x)
+    elif y == FOUR:
+        square = mul_up(x, x)
+        return mul_up(square, square)
+
+    raw = log_exp_math.pow(x, y)
+    max_error = mul_up(raw, MAX_POW_RELATIVE_ERROR) + 1
+    return raw + max_error
+
+
+def exp_down(x: int) -> int:
+    """
+    Returns e^x, assuming x is a fixed point number, rounding down
+    """
+    if x == 0:
+        return ONE
+    require(x < 2**255, "FixedPoint: x out of bounds")
+
+    raw = log_exp_math.exp(x)
+    max_error = mul_up(raw, MAX_POW_RELATIVE_ERROR) + 1
+    return 0 if raw < max_error else raw - max_error
+
+
+def exp_up(x: int) -> int:
+    """
+    Returns e^x, assuming x is a fixed point number, rounding up
+    """
+    if x == 0:
+        return ONE
+    require(x < 2**255, "FixedPoint: x out of bounds")
+
+    raw = log_exp_math.exp(x)
+    max_error = mul_up(raw, MAX_POW_RELATIVE_ERROR) + 1
+    return raw + max_error
+
+
+def log_down(a: int, b: int) -> int:
+    """
+    Returns log_b(a), assuming a, b are fixed point numbers, rounding down
+    """
+    require(a > 0 and a < 2**255, "FixedPoint: a out of bounds")
+    require(b > 0 and b < 2**255, "FixedPoint: b out of bounds")
+
+    raw = log_exp_math.log(a, b)
+    max_error = mul_up(abs(raw), MAX_POW_RELATIVE_ERROR) + 1
+    return raw - max_error
+
+
+def log_up(a: int, b: int) -> int:
+    """
+    Returns log_b(a), assuming a, b are fixed point numbers, rounding up
+    """
+    require(a > 0 and a < 2**255, "FixedPoint: a out of bounds")
+    require(b > 0 and b < 2**255, "FixedPoint: b out of bounds")
+
+    raw = log_exp_math.log(a, b)
+    max_error = mul_up(abs(raw), MAX_POW_RELATIVE_ERROR) + 1
+    return raw + max_error
+
+
+def complement(x: int) -> int:
+    """
+    Returns the complement of a value (1 - x), capped to 0 if x is larger
+    than 1
+    """
+    return ONE - x if x < ONE else 0
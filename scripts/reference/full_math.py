@@ -0,0 +1,20 @@
+def mul_div(a: int, b: int, denominator: int) -> int:
+    """
+    floor(a * b / denominator) with full precision. Mirrors
+    v3-core FullMath.mulDiv, which reverts on a zero denominator or a
+    result overflowing uint256
+    """
+    result = (a * b) // denominator
+    if result >= 2**256:
+        raise OverflowError("FullMath: mulDiv overflow")
+    return result
+
+
+def mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    """
+    ceil(a * b / denominator) with full precision
+    """
+    result = mul_div(a, b, denominator)
+    if (a * b) % denominator > 0:
+        result += 1
+    return result
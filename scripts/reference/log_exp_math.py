@@ -0,0 +1,225 @@
+"""
+Exact integer port of contracts/libraries/LogExpMath.sol.
+
+Solidity signed division and modulo truncate toward zero, whereas python
+floors, so all signed arithmetic goes through _div and _mod below.
+"""
+from .errors import require
+
+
+# All arguments and return values are 18 decimal fixed point numbers.
+ONE_18 = 10**18
+
+# Internally, intermediate values are computed with higher precision as 20
+# decimal fixed point numbers, and in the case of ln36, 36 decimals.
+ONE_20 = 10**20
+ONE_36 = 10**36
+
+MAX_NATURAL_EXPONENT = 130 * 10**18
+MIN_NATURAL_EXPONENT = -41 * 10**18
+
+# Bounds for ln_36's argument
+LN_36_LOWER_BOUND = ONE_18 - 10**17
+LN_36_UPPER_BOUND = ONE_18 + 10**17
+
+MILD_EXPONENT_BOUND = 2**254 // ONE_20
+
+# 18 decimal constants
+x0 = 128000000000000000000  # 2ˆ7
+a0 = 38877084059945950922200000000000000000000000000000000000  # eˆ(x0)
+x1 = 64000000000000000000  # 2ˆ6
+a1 = 6235149080811616882910000000  # eˆ(x1) (no decimals)
+
+# 20 decimal constants
+x2 = 3200000000000000000000  # 2ˆ5
+a2 = 7896296018268069516100000000000000  # eˆ(x2)
+x3 = 1600000000000000000000  # 2ˆ4
+a3 = 888611052050787263676000000  # eˆ(x3)
+x4 = 800000000000000000000  # 2ˆ3
+a4 = 298095798704172827474000  # eˆ(x4)
+x5 = 400000000000000000000  # 2ˆ2
+a5 = 5459815003314423907810  # eˆ(x5)
+x6 = 200000000000000000000  # 2ˆ1
+a6 = 738905609893065022723  # eˆ(x6)
+x7 = 100000000000000000000  # 2ˆ0
+a7 = 271828182845904523536  # eˆ(x7)
+x8 = 50000000000000000000  # 2ˆ-1
+a8 = 164872127070012814685  # eˆ(x8)
+x9 = 25000000000000000000  # 2ˆ-2
+a9 = 128402541668774148407  # eˆ(x9)
+x10 = 12500000000000000000  # 2ˆ-3
+a10 = 113314845306682631683  # eˆ(x10)
+x11 = 6250000000000000000  # 2ˆ-4
+a11 = 106449445891785942956  # eˆ(x11)
+
+
+def _div(a: int, b: int) -> int:
+    """
+    Signed integer division truncating toward zero like solidity
+    """
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+def _mod(a: int, b: int) -> int:
+    """
+    Signed integer modulo with the sign of the dividend like solidity
+    """
+    return a - b * _div(a, b)
+
+
+def pow(x: int, y: int) -> int:
+    """
+    Exponentiation (x^y) with unsigned 18 decimal fixed point base and
+    exponent
+    """
+    if y == 0:
+        # We solve the 0^0 indetermination by making it equal one.
+        return ONE_18
+
+    if x == 0:
+        return 0
+
+    require(x < 2**255, "x out of bounds")
+    require(y < MILD_EXPONENT_BOUND, "y out of bounds")
+
+    if LN_36_LOWER_BOUND < x and x < LN_36_UPPER_BOUND:
+        ln_36_x = _ln_36(x)
+        logx_times_y = (_div(ln_36_x, ONE_18) * y
+                        + _div(_mod(ln_36_x, ONE_18) * y, ONE_18))
+    else:
+        logx_times_y = _ln(x) * y
+    logx_times_y = _div(logx_times_y, ONE_18)
+
+    require(MIN_NATURAL_EXPONENT <= logx_times_y
+            and logx_times_y <= MAX_NATURAL_EXPONENT,
+            "product out of bounds")
+
+    return exp(logx_times_y)
+
+
+def exp(x: int) -> int:
+    """
+    Natural exponentiation (e^x) with signed 18 decimal fixed point
+    exponent
+    """
+    require(x >= MIN_NATURAL_EXPONENT and x <= MAX_NATURAL_EXPONENT,
+            "invalid exponent")
+
+    if x < 0:
+        # e^(-x) is computed as 1 / e^x
+        return _div(ONE_18 * ONE_18, exp(-x))
+
+    if x >= x0:
+        x -= x0
+        first_an = a0
+    elif x >= x1:
+        x -= x1
+        first_an = a1
+    else:
+        first_an = 1  # One with no decimal places
+
+    # transform x into a 20 decimal fixed point number
+    x *= 100
+
+    # accumulated product of all a_n (except a0 and a1)
+    product = ONE_20
+    for x_n, a_n in ((x2, a2), (x3, a3), (x4, a4), (x5, a5), (x6, a6),
+                     (x7, a7), (x8, a8), (x9, a9)):
+        if x >= x_n:
+            x -= x_n
+            product = _div(product * a_n, ONE_20)
+
+    # Taylor series expansion for e^x with 12 terms
+    series_sum = ONE_20
+    term = x
+    series_sum += term
+    for n in range(2, 13):
+        term = _div(_div(term * x, ONE_20), n)
+        series_sum += term
+
+    return _div(_div(product * series_sum, ONE_20) * first_an, 100)
+
+
+def log(arg: int, base: int) -> int:
+    """
+    Logarithm (log(arg, base)) with signed 18 decimal fixed point base
+    and argument
+    """
+    if LN_36_LOWER_BOUND < base and base < LN_36_UPPER_BOUND:
+        log_base = _ln_36(base)
+    else:
+        log_base = _ln(base) * ONE_18
+
+    if LN_36_LOWER_BOUND < arg and arg < LN_36_UPPER_BOUND:
+        log_arg = _ln_36(arg)
+    else:
+        log_arg = _ln(arg) * ONE_18
+
+    return _div(log_arg * ONE_18, log_base)
+
+
+def ln(a: int) -> int:
+    """
+    Natural logarithm (ln(a)) with signed 18 decimal fixed point argument
+    """
+    require(a > 0, "out of bounds")
+    if LN_36_LOWER_BOUND < a and a < LN_36_UPPER_BOUND:
+        return _div(_ln_36(a), ONE_18)
+    return _ln(a)
+
+
+def _ln(a: int) -> int:
+    if a < ONE_18:
+        # ln(a) = - ln(1/a)
+        return -_ln(_div(ONE_18 * ONE_18, a))
+
+    total = 0
+    if a >= a0 * ONE_18:
+        a = _div(a, a0)  # Integer, not fixed point division
+        total += x0
+
+    if a >= a1 * ONE_18:
+        a = _div(a, a1)  # Integer, not fixed point division
+        total += x1
+
+    # convert the sum and a to 20 digit fixed point
+    total *= 100
+    a *= 100
+
+    for x_n, a_n in ((x2, a2), (x3, a3), (x4, a4), (x5, a5), (x6, a6),
+                     (x7, a7), (x8, a8), (x9, a9), (x10, a10), (x11, a11)):
+        if a >= a_n:
+            a = _div(a * ONE_20, a_n)
+            total += x_n
+
+    # ln(a) = 2 * (z + z^3 / 3 + z^5 / 5 + ...) for z = (a - 1) / (a + 1)
+    z = _div((a - ONE_20) * ONE_20, a + ONE_20)
+    z_squared = _div(z * z, ONE_20)
+
+    num = z
+    series_sum = num
+    for n in (3, 5, 7, 9, 11):
+        num = _div(num * z_squared, ONE_20)
+        series_sum += _div(num, n)
+
+    series_sum *= 2
+
+    return _div(total + series_sum, 100)
+
+
+def _ln_36(x: int) -> int:
+    # transform x to a 36 digit fixed point value
+    x *= ONE_18
+
+    # ln(x) = 2 * (z + z^3 / 3 + z^5 / 5 + ...) for z = (x - 1) / (x + 1)
+    z = _div((x - ONE_36) * ONE_36, x + ONE_36)
+    z_squared = _div(z * z, ONE_36)
+
+    num = z
+    series_sum = num
+    for n in (3, 5, 7, 9, 11, 13, 15):
+        num = _div(num * z_squared, ONE_36)
+        series_sum += _div(num, n)
+
+    return series_sum * 2
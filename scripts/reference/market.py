@@ -0,0 +1,536 @@
+"""
+Python mirror of the OverlayV1Market calculations, operating on plain
+ints (18 decimal fixed point) so results match the contract exactly.
+"""
+from dataclasses import dataclass, replace
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from . import fixed_point as fp
+from . import position
+from .errors import require
+from .fixed_cast import to_uint16_fixed
+from .oracle import Data
+from .risk import Parameters, get
+from .roller import Snapshot, cumulative, transform
+from .tick import price_to_tick
+
+
+ONE = 10**18  # 18 decimal places
+TO_MS = 10**3  # convert seconds to milliseconds
+
+# cap for euler exponent powers; SEE: ./libraries/LogExpMath.sol::pow
+MAX_NATURAL_EXPONENT = 20 * 10**18
+
+
+def max_leverage(delta: int, maintenance_margin_fraction: int,
+                 liquidation_fee_rate: int) -> int:
+    """
+    Returns the largest capLeverage that won't make a position built at
+    the cap immediately liquidatable given the spread, maintenance margin
+    and liquidation fee rate
+    """
+    return fp.div_down(
+        ONE,
+        2 * delta + fp.div_down(maintenance_margin_fraction,
+                                ONE - liquidation_fee_rate)
+    )
+
+
+def _check_max_leverage(cap_leverage: int, delta: int,
+                        maintenance_margin_fraction: int,
+                        liquidation_fee_rate: int):
+    require(
+        cap_leverage <= max_leverage(
+            delta, maintenance_margin_fraction, liquidation_fee_rate),
+        "OVLV1: max lev immediately liquidatable"
+    )
+
+
+def _check_price_drift(price_drift_upper_limit: int, macro_window: int):
+    require(price_drift_upper_limit * macro_window < MAX_NATURAL_EXPONENT,
+            "OVLV1: price drift exceeds max exp")
+
+
+def dp_upper_limit(price_drift_upper_limit: int, macro_window: int) -> int:
+    """
+    Returns the cached dpUpperLimit = e**(priceDriftUpperLimit * macroWindow)
+    as computed by OverlayV1Market._cacheRiskCalc
+    """
+    pow = price_drift_upper_limit * macro_window
+    return fp.exp_up(pow)
+
+
+def check_initialize_params(params: Sequence[int], macro_window: int):
+    """
+    Checks the risk params OverlayV1Market.initialize validates on deploy.
+    Does not include the factory bounds checked before initialize
+    """
+    _check_max_leverage(
+        get(params, Parameters.CapLeverage),
+        get(params, Parameters.Delta),
+        get(params, Parameters.MaintenanceMarginFraction),
+        get(params, Parameters.LiquidationFeeRate)
+    )
+    _check_price_drift(get(params, Parameters.PriceDriftUpperLimit),
+                       macro_window)
+
+    # initialize reverts if dpUpperLimit overflows in exp
+    dp_upper_limit(get(params, Parameters.PriceDriftUpperLimit),
+                   macro_window)
+
+
+def check_risk_param(params: Sequence[int], name: Parameters, value: int,
+                     macro_window: int):
+    """
+    Checks the governance per-market risk parameter is valid given the
+    market's current params. Mirrors OverlayV1Market._checkRiskParam
+    """
+    delta = get(params, Parameters.Delta)
+    cap_leverage = get(params, Parameters.CapLeverage)
+    maintenance_margin_fraction = get(
+        params, Parameters.MaintenanceMarginFraction)
+    liquidation_fee_rate = get(params, Parameters.LiquidationFeeRate)
+
+    if name == Parameters.Delta:
+        _check_max_leverage(cap_leverage, value,
+                            maintenance_margin_fraction, liquidation_fee_rate)
+    elif name == Parameters.CapLeverage:
+        _check_max_leverage(value, delta,
+                            maintenance_margin_fraction, liquidation_fee_rate)
+    elif name == Parameters.MaintenanceMarginFraction:
+        _check_max_leverage(cap_leverage, delta, value, liquidation_fee_rate)
+    elif name == Parameters.LiquidationFeeRate:
+        _check_max_leverage(cap_leverage, delta,
+                            maintenance_margin_fraction, value)
+    elif name == Parameters.PriceDriftUpperLimit:
+        _check_price_drift(value, macro_window)
+
+
+def data_drift(data: Data) -> int:
+    """
+    Returns dp = priceOverMacroWindow / priceOneMacroWindowAgo rounded up,
+    the ratio dataIsValid compares against dpUpperLimit. Zero if either
+    price is zero
+    """
+    price_now = data.price_over_macro_window
+    price_last = data.price_one_macro_window_ago
+    if price_last == 0 or price_now == 0:
+        return 0
+    return fp.div_up(price_now, price_last)
+
+
+def data_is_valid(data: Data, dp_upper_limit: int) -> bool:
+    """
+    Sanity check on data fetched from oracle in case of manipulation.
+    Mirrors OverlayV1Market.dataIsValid given the market's dpUpperLimit
+    """
+    dp_lower_limit = fp.div_down(ONE, dp_upper_limit)
+    dp = data_drift(data)
+    if dp == 0:
+        # data is not valid if price is zero
+        return False
+    return dp >= dp_lower_limit and dp <= dp_upper_limit
+
+
+def mid_from_feed(data: Data) -> int:
+    """
+    Mid price without impact/spread given oracle data. Mirrors
+    OverlayV1Market._midFromFeed
+    """
+    return (data.price_over_micro_window + data.price_over_macro_window) // 2
+
+
+def oi_from_notional(notional: int, mid_price: int) -> int:
+    """
+    Open interest in number of contracts for a given notional
+    """
+    return fp.div_down(notional, mid_price)
+
+
+def _impact_pow(params: Sequence[int], volume: int) -> int:
+    # static spread (delta) and market impact (lmbda * volume)
+    delta = get(params, Parameters.Delta)
+    lmbda = get(params, Parameters.Lmbda)
+    pow = delta + fp.mul_up(lmbda, volume)
+    require(pow < MAX_NATURAL_EXPONENT, "OVLV1:slippage>max")
+    return pow
+
+
+def bid(params: Sequence[int], data: Data, volume: int) -> int:
+    """
+    Bid price given oracle data and recent volume. Mirrors
+    OverlayV1Market.bid
+    """
+    bid_ = min(data.price_over_micro_window, data.price_over_macro_window)
+    pow = _impact_pow(params, volume)
+    return fp.mul_down(bid_, fp.div_down(ONE, fp.exp_up(pow)))
+
+
+def ask(params: Sequence[int], data: Data, volume: int) -> int:
+    """
+    Ask price given oracle data and recent volume. Mirrors
+    OverlayV1Market.ask
+    """
+    ask_ = max(data.price_over_micro_window, data.price_over_macro_window)
+    pow = _impact_pow(params, volume)
+    return fp.mul_up(ask_, fp.exp_up(pow))
+
+
+def front_run_bound(params: Sequence[int], data: Data) -> int:
+    """
+    Bound on notional cap to mitigate front-running attack
+    """
+    lmbda = get(params, Parameters.Lmbda)
+    return fp.mul_down(lmbda, data.reserve_over_micro_window)
+
+
+def back_run_bound(params: Sequence[int], data: Data) -> int:
+    """
+    Bound on notional cap to mitigate back-running attack
+    """
+    average_block_time = get(params, Parameters.AverageBlockTime)
+    window = (data.macro_window * ONE * TO_MS) // average_block_time
+    delta = get(params, Parameters.Delta)
+    return fp.mul_down(
+        fp.mul_down(fp.mul_down(delta, data.reserve_over_micro_window),
+                    window),
+        2 * ONE)
+
+
+def cap_notional_adjusted_for_bounds(params: Sequence[int], data: Data,
+                                     cap: int) -> int:
+    """
+    Notional cap adjusted down for front-running and back-running bounds
+    """
+    if data.has_reserve:
+        cap = min(cap, front_run_bound(params, data))
+        cap = min(cap, back_run_bound(params, data))
+    return cap
+
+
+def circuit_breaker(params: Sequence[int], snapshot: Snapshot,
+                    cap: int) -> int:
+    """
+    Bound on oi cap from circuit breaker given the snapshot of recently
+    minted. Mirrors OverlayV1Market.circuitBreaker
+    """
+    minted = cumulative(snapshot)
+    target = get(params, Parameters.CircuitBreakerMintTarget)
+    if minted <= target:
+        return cap
+    elif minted >= 2 * target:
+        return 0
+
+    adjustment = 2 * ONE - fp.div_down(minted, target)
+    return fp.mul_down(cap, adjustment)
+
+
+def cap_oi_adjusted_for_circuit_breaker(params: Sequence[int],
+                                        snapshot_minted: Snapshot,
+                                        timestamp: int, cap: int) -> int:
+    """
+    Oi cap adjusted down for the circuit breaker, with snapshotMinted
+    decayed to timestamp
+    """
+    window = get(params, Parameters.CircuitBreakerWindow)
+    snapshot = transform(snapshot_minted, timestamp, window, 0)
+    return circuit_breaker(params, snapshot, cap)
+
+
+def register_volume(snapshot: Snapshot, data: Data, timestamp: int,
+                    volume: int, cap: int) -> Snapshot:
+    """
+    Returns the bid or ask volume snapshot after registering volume at
+    timestamp, normalized with respect to cap. Cumulative of the result
+    is the volume passed to bid or ask. Mirrors _registerVolumeBid/Ask
+    """
+    value = fp.div_up(volume, cap)
+    return transform(snapshot, timestamp, data.micro_window, value)
+
+
+@dataclass
+class MarketState:
+    """
+    Snapshot of the OverlayV1Market storage the view calculations need
+    """
+    params: List[int]
+    oi_long: int
+    oi_short: int
+    oi_long_shares: int
+    oi_short_shares: int
+    timestamp_update_last: int
+
+    def oi_on_side(self, is_long: bool) -> int:
+        return self.oi_long if is_long else self.oi_short
+
+    def oi_shares_on_side(self, is_long: bool) -> int:
+        return self.oi_long_shares if is_long else self.oi_short_shares
+
+    def oi_after_funding(self, oi_overweight: int, oi_underweight: int,
+                         time_elapsed: int) -> Tuple[int, int]:
+        """
+        Current open interest after funding payments transferred from
+        overweight oi side to underweight oi side. Mirrors
+        OverlayV1Market.oiAfterFunding
+        """
+        oi_total = oi_overweight + oi_underweight
+        oi_imbalance = oi_overweight - oi_underweight
+        oi_invariant = oi_underweight * oi_overweight
+
+        # If no OI or imbalance, no funding occurs
+        if oi_total == 0 or oi_imbalance == 0:
+            return (oi_overweight, oi_underweight)
+
+        # draw down the imbalance by factor of e**(-2*k*t)
+        funding_factor = 0
+        pow = 2 * get(self.params, Parameters.K) * time_elapsed
+        if pow < MAX_NATURAL_EXPONENT:
+            funding_factor = fp.div_down(ONE, fp.exp_up(pow))
+
+        # OI_tot(t) = OI_tot(0) * \
+        #  sqrt( 1 - (OI_imb(0)/OI_tot(0))**2 * (1 - e**(-4*k*t)) )
+        oi_imb_fraction = fp.div_down(oi_imbalance, oi_total)
+        under_root = ONE - fp.mul_down(
+            fp.mul_down(oi_imb_fraction, oi_imb_fraction),
+            ONE - fp.mul_down(funding_factor, funding_factor))
+        oi_total = fp.mul_down(oi_total, fp.pow_down(under_root, ONE // 2))
+
+        # OI_imb(t) = OI_imb(0) * e**(-2*k*t)
+        oi_imbalance = fp.mul_down(oi_imbalance, funding_factor)
+
+        # overweight pays underweight
+        oi_overweight = (oi_total + oi_imbalance) // 2
+        if oi_overweight != 0:
+            oi_underweight = 0 if oi_invariant == 0 \
+                else (oi_invariant - 1) // oi_overweight + 1
+        return (oi_overweight, oi_underweight)
+
+    def pay_funding(self, timestamp: int) -> "MarketState":
+        """
+        Returns the state after funding is paid at timestamp, as the
+        market does at the start of every update(). Mirrors _payFunding
+        """
+        time_elapsed = timestamp - self.timestamp_update_last
+        if time_elapsed <= 0:
+            return self
+
+        is_long_overweight = self.oi_long > self.oi_short
+        oi_overweight = self.oi_long if is_long_overweight else self.oi_short
+        oi_underweight = self.oi_short if is_long_overweight \
+            else self.oi_long
+
+        oi_overweight, oi_underweight = self.oi_after_funding(
+            oi_overweight, oi_underweight, time_elapsed)
+
+        return replace(
+            self,
+            oi_long=oi_overweight if is_long_overweight else oi_underweight,
+            oi_short=oi_underweight if is_long_overweight else oi_overweight,
+            timestamp_update_last=timestamp
+        )
+
+
+class Build(NamedTuple):
+    """
+    Outcome of OverlayV1Market.build: the new position, market state and
+    volume snapshots after the build, and the entry price and fee paid
+    """
+    position: position.Info
+    state: MarketState
+    snapshots: Tuple[Snapshot, Snapshot, Snapshot]  # volume bid/ask, minted
+    oi: int
+    price: int
+    trading_fee: int
+
+
+def build(state: MarketState, snapshots: Tuple[Snapshot, Snapshot, Snapshot],
+          data: Data, dp_upper_limit: int, timestamp: int, collateral: int,
+          leverage: int, is_long: bool,
+          price_limit: Optional[int] = None) -> Build:
+    """
+    Builds a position at timestamp given the market's state, snapshots and
+    latest feed data. Raises Revert with the reason build() would revert
+    with. price_limit of None skips the slippage check. Mirrors
+    OverlayV1Market.build
+    """
+    params = state.params
+    require(leverage >= ONE, "OVLV1:lev<min")
+    require(leverage <= get(params, Parameters.CapLeverage), "OVLV1:lev>max")
+    require(collateral >= get(params, Parameters.MinCollateral),
+            "OVLV1:collateral<min")
+
+    # update pays funding then checks data from feed
+    state = state.pay_funding(timestamp)
+    require(data_is_valid(data, dp_upper_limit), "OVLV1:!data")
+
+    notional = fp.mul_up(collateral, leverage)
+    mid_price = mid_from_feed(data)
+    oi = oi_from_notional(notional, mid_price)
+    require(oi > 0, "OVLV1:oi==0")
+
+    debt = notional - collateral
+    trading_fee = fp.mul_up(notional,
+                            get(params, Parameters.TradingFeeRate))
+
+    cap_oi = oi_from_notional(
+        cap_notional_adjusted_for_bounds(
+            params, data, get(params, Parameters.CapNotional)),
+        mid_price)
+
+    # longs get the ask and shorts get the bid on build
+    snapshot_bid, snapshot_ask, snapshot_minted = snapshots
+    if is_long:
+        snapshot_ask = register_volume(snapshot_ask, data, timestamp, oi,
+                                       cap_oi)
+        price = ask(params, data, cumulative(snapshot_ask))
+    else:
+        snapshot_bid = register_volume(snapshot_bid, data, timestamp, oi,
+                                       cap_oi)
+        price = bid(params, data, cumulative(snapshot_bid))
+    if price_limit is not None:
+        require(price <= price_limit if is_long else price >= price_limit,
+                "OVLV1:slippage>max")
+
+    # add to the side's aggregate oi and shares. mirrors _addToOiAggregates
+    oi_total_on_side = state.oi_on_side(is_long)
+    oi_total_shares_on_side = state.oi_shares_on_side(is_long)
+    oi_shares = position.calc_oi_shares(oi, oi_total_on_side,
+                                        oi_total_shares_on_side)
+    oi_total_on_side += oi
+    oi_total_shares_on_side += oi_shares
+    cap_oi_circuited = cap_oi_adjusted_for_circuit_breaker(
+        params, snapshot_minted, timestamp, cap_oi)
+    require(oi_total_on_side <= cap_oi_circuited, "OVLV1:oi>cap")
+    if is_long:
+        state = replace(state, oi_long=oi_total_on_side,
+                        oi_long_shares=oi_total_shares_on_side)
+    else:
+        state = replace(state, oi_short=oi_total_on_side,
+                        oi_short_shares=oi_total_shares_on_side)
+
+    pos = position.Info(notional, debt, price_to_tick(mid_price),
+                        price_to_tick(price), is_long, False, oi_shares,
+                        to_uint16_fixed(ONE))
+    require(
+        not position.liquidatable(
+            pos, oi_total_on_side, oi_total_shares_on_side, mid_price,
+            get(params, Parameters.CapPayoff),
+            get(params, Parameters.MaintenanceMarginFraction),
+            get(params, Parameters.LiquidationFeeRate)),
+        "OVLV1:liquidatable"
+    )
+    return Build(pos, state, (snapshot_bid, snapshot_ask, snapshot_minted),
+                 oi, price, trading_fee)
+
+
+def _reduce_oi_and_oi_shares(state: MarketState, pos: position.Info,
+                             fraction: int) -> MarketState:
+    # subtract open interest from the side's aggregate oi and shares
+    if pos.is_long:
+        return replace(
+            state,
+            oi_long=fp.sub_floor(state.oi_long, position.oi_current(
+                pos, fraction, state.oi_long, state.oi_long_shares)),
+            oi_long_shares=state.oi_long_shares
+            - position.oi_shares_current(pos, fraction))
+    return replace(
+        state,
+        oi_short=fp.sub_floor(state.oi_short, position.oi_current(
+            pos, fraction, state.oi_short, state.oi_short_shares)),
+        oi_short_shares=state.oi_short_shares
+        - position.oi_shares_current(pos, fraction))
+
+
+class Unwind(NamedTuple):
+    """
+    Outcome of OverlayV1Market.unwind: the updated position, market state
+    and snapshots, the fraction unwound after truncation to 1bps, and the
+    exit price, value, cost and fee
+    """
+    position: position.Info
+    state: MarketState
+    snapshots: Tuple[Snapshot, Snapshot, Snapshot]  # volume bid/ask, minted
+    fraction: int
+    price: int
+    value: int
+    cost: int
+    trading_fee: int
+
+
+def unwind(state: MarketState, snapshots: Tuple[Snapshot, Snapshot, Snapshot],
+           data: Data, dp_upper_limit: int, timestamp: int,
+           pos: position.Info, fraction: int,
+           price_limit: Optional[int] = None) -> Unwind:
+    """
+    Unwinds fraction of pos at timestamp. Raises Revert with the reason
+    unwind() would revert with. price_limit of None skips the slippage
+    check. Mirrors OverlayV1Market.unwind
+    """
+    params = state.params
+    require(fraction <= ONE, "OVLV1:fraction>max")
+    # only keep 4 decimal precision (1 bps) for fraction given
+    fraction -= fraction % 10**14
+    require(fraction > 0, "OVLV1:fraction<min")
+
+    state = state.pay_funding(timestamp)
+    require(data_is_valid(data, dp_upper_limit), "OVLV1:!data")
+    require(position.exists(pos), "OVLV1:!position")
+
+    oi_total_on_side = state.oi_on_side(pos.is_long)
+    oi_total_shares_on_side = state.oi_shares_on_side(pos.is_long)
+    mid_price = mid_from_feed(data)
+    cap_payoff = get(params, Parameters.CapPayoff)
+    require(
+        not position.liquidatable(
+            pos, oi_total_on_side, oi_total_shares_on_side, mid_price,
+            cap_payoff, get(params, Parameters.MaintenanceMarginFraction),
+            get(params, Parameters.LiquidationFeeRate)),
+        "OVLV1:liquidatable"
+    )
+
+    # longs get the bid and shorts get the ask on unwind. cap only
+    # adjusted for bounds (no circuit breaker)
+    cap_oi = oi_from_notional(
+        cap_notional_adjusted_for_bounds(
+            params, data, get(params, Parameters.CapNotional)),
+        mid_price)
+    oi = position.oi_current(pos, fraction, oi_total_on_side,
+                             oi_total_shares_on_side)
+    snapshot_bid, snapshot_ask, snapshot_minted = snapshots
+    if pos.is_long:
+        snapshot_bid = register_volume(snapshot_bid, data, timestamp, oi,
+                                       cap_oi)
+        price = bid(params, data, cumulative(snapshot_bid))
+    else:
+        snapshot_ask = register_volume(snapshot_ask, data, timestamp, oi,
+                                       cap_oi)
+        price = ask(params, data, cumulative(snapshot_ask))
+    if price_limit is not None:
+        require(price >= price_limit if pos.is_long
+                else price <= price_limit, "OVLV1:slippage>max")
+
+    value = position.value(pos, fraction, oi_total_on_side,
+                           oi_total_shares_on_side, price, cap_payoff)
+    cost = position.cost(pos, fraction)
+    trading_fee = min(
+        position.trading_fee(pos, fraction, oi_total_on_side,
+                             oi_total_shares_on_side, price, cap_payoff,
+                             get(params, Parameters.TradingFeeRate)),
+        value)
+
+    state = _reduce_oi_and_oi_shares(state, pos, fraction)
+    snapshot_minted = transform(
+        snapshot_minted, timestamp,
+        get(params, Parameters.CircuitBreakerWindow), value - cost)
+
+    pos = pos._replace(
+        oi_shares=pos.oi_shares - position.oi_shares_current(pos, fraction),
+        fraction_remaining=position.updated_fraction_remaining(pos,
+                                                               fraction))
+    # ensure there are no dead shares left
+    if pos.fraction_remaining == 0 and pos.oi_shares > 0:
+        state = _reduce_oi_and_oi_shares(state, pos, ONE)
+        pos = pos._replace(oi_shares=0)
+
+    return Unwind(pos, state, (snapshot_bid, snapshot_ask, snapshot_minted),
+                  fraction, price, value, cost, trading_fee)
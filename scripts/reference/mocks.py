@@ -0,0 +1,125 @@
+"""
+Python mirrors of the library mocks in contracts/mocks, with the same
+function names and argument order as the contracts, so tests written
+against a deployed mock can run against the reference implementations.
+Struct args may be plain tuples as passed to brownie
+"""
+from typing import Callable, Dict
+
+from . import cast, fixed_cast, fixed_point, position, risk, roller, tick
+from .position import Info
+from .roller import Snapshot
+
+
+def _method(fn: Callable, struct=None) -> Callable:
+    # mock method calling fn, converting a leading struct arg to its
+    # NamedTuple
+    def method(self, *args):
+        if struct is not None:
+            args = (struct(*args[0]),) + args[1:]
+        return fn(*args)
+    method.__name__ = fn.__name__
+    return method
+
+
+def _add(a: int, b: int) -> int:
+    # checked addition. overflow is caught by the uint256 output range
+    return a + b
+
+
+def _sub(a: int, b: int) -> int:
+    # checked subtraction. underflow is caught by the uint256 output range
+    return a - b
+
+
+class CastMock:
+    toUint32Bounded = _method(cast.to_uint32_bounded)
+    toInt192Bounded = _method(cast.to_int192_bounded)
+
+
+class FixedCastMock:
+    toUint256Fixed = _method(fixed_cast.to_uint256_fixed)
+    toUint16Fixed = _method(fixed_cast.to_uint16_fixed)
+
+
+class FixedPointMock:
+    add = _method(_add)
+    sub = _method(_sub)
+    subFloor = _method(fixed_point.sub_floor)
+    mulDown = _method(fixed_point.mul_down)
+    mulUp = _method(fixed_point.mul_up)
+    divDown = _method(fixed_point.div_down)
+    divUp = _method(fixed_point.div_up)
+    powDown = _method(fixed_point.pow_down)
+    powUp = _method(fixed_point.pow_up)
+    expDown = _method(fixed_point.exp_down)
+    expUp = _method(fixed_point.exp_up)
+    logDown = _method(fixed_point.log_down)
+    logUp = _method(fixed_point.log_up)
+    complement = _method(fixed_point.complement)
+
+
+class TickMock:
+    priceToTick = _method(tick.price_to_tick)
+    tickToPrice = _method(tick.tick_to_price)
+
+
+class RollerMock:
+    cumulative = _method(roller.cumulative, Snapshot)
+    transform = _method(roller.transform, Snapshot)
+
+
+class RiskMock:
+    def __init__(self):
+        self._params = [0] * risk.NUM_PARAMETERS
+
+    def params(self, idx: int) -> int:
+        return self._params[idx]
+
+    def get(self, name: int) -> int:
+        # invalid enum values revert, as ValueError here
+        return risk.get(self._params, risk.Parameters(name))
+
+    def set(self, name: int, value: int):
+        risk.set(self._params, risk.Parameters(name), value)
+
+    def getEnumFromUint(self, idx: int) -> int:
+        return int(risk.Parameters(idx))
+
+
+class PositionMock:
+    def __init__(self):
+        self._positions: Dict[bytes, Info] = {}
+
+    def positions(self, key: bytes) -> Info:
+        return self._positions.get(
+            bytes(key), Info(0, 0, 0, 0, False, False, 0, 0))
+
+    def get(self, owner, id: int) -> Info:
+        return self.positions(position.get_key(str(owner), id))
+
+    def set(self, owner, id: int, pos):
+        self._positions[position.get_key(str(owner), id)] = Info(*pos)
+
+    exists = _method(position.exists, Info)
+    getFractionRemaining = _method(position.get_fraction_remaining, Info)
+    updatedFractionRemaining = _method(position.updated_fraction_remaining,
+                                       Info)
+    midPriceAtEntry = _method(position.mid_price_at_entry, Info)
+    entryPrice = _method(position.entry_price, Info)
+    calcOiShares = _method(position.calc_oi_shares)
+    notionalInitial = _method(position.notional_initial, Info)
+    oiInitial = _method(position.oi_initial, Info)
+    oiSharesCurrent = _method(position.oi_shares_current, Info)
+    debtInitial = _method(position.debt_initial, Info)
+    oiCurrent = _method(position.oi_current, Info)
+    cost = _method(position.cost, Info)
+    value = _method(position.value, Info)
+    notionalWithPnl = _method(position.notional_with_pnl, Info)
+    tradingFee = _method(position.trading_fee, Info)
+    liquidatable = _method(position.liquidatable, Info)
+
+
+MOCKS = {cls.__name__: cls for cls in (
+    CastMock, FixedCastMock, FixedPointMock, TickMock, RollerMock,
+    RiskMock, PositionMock)}
@@ -0,0 +1,16 @@
+from typing import NamedTuple
+
+
+class Data(NamedTuple):
+    """
+    Mirrors the Oracle.Data struct returned by IOverlayV1Feed.latest().
+    A brownie return value can be converted with Data(*feed.latest())
+    """
+    timestamp: int
+    micro_window: int
+    macro_window: int
+    price_over_micro_window: int  # p(now) averaged over micro
+    price_over_macro_window: int  # p(now) averaged over macro
+    price_one_macro_window_ago: int  # p(now - macro) avg over macro
+    reserve_over_micro_window: int  # r(now) in ovl averaged over micro
+    has_reserve: bool  # whether oracle has manipulable reserve pool
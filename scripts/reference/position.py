@@ -0,0 +1,202 @@
+"""
+Python mirror of contracts/libraries/Position.sol
+"""
+from typing import NamedTuple
+
+from eth_utils import keccak, to_bytes
+
+from . import fixed_point as fp
+from .fixed_cast import to_uint16_fixed, to_uint256_fixed
+from .full_math import mul_div
+from .tick import tick_to_price
+
+
+ONE = 10**18
+
+
+class Info(NamedTuple):
+    """
+    Mirrors the Position.Info struct. A brownie return value from
+    market.positions(key) can be converted with Info(*pos)
+    """
+    notional_initial: int  # initial notional = collateral * leverage
+    debt_initial: int  # initial debt = notional - collateral
+    mid_tick: int  # midPrice = 1.0001 ** midTick at build
+    entry_tick: int  # entryPrice = 1.0001 ** entryTick at build
+    is_long: bool  # whether long or short
+    liquidated: bool  # whether has been liquidated (mutable)
+    oi_shares: int  # current shares of aggregate open interest on side
+    fraction_remaining: int  # fraction of initial position remaining
+
+
+def get_key(owner: str, id: int) -> bytes:
+    """
+    Returns the key of the position in the market's positions mapping,
+    keccak256(abi.encodePacked(owner, id))
+    """
+    return keccak(to_bytes(hexstr=owner) + id.to_bytes(32, "big"))
+
+
+def exists(self: Info) -> bool:
+    """
+    Whether the position exists. False if liquidated or fully unwound
+    """
+    return self.fraction_remaining > 0
+
+
+def get_fraction_remaining(self: Info) -> int:
+    return to_uint256_fixed(self.fraction_remaining)
+
+
+def updated_fraction_remaining(self: Info, fraction_removed: int) -> int:
+    """
+    Computes an updated fraction remaining of the initial position given
+    fractionRemoved unwound/liquidated from remaining position
+    """
+    fraction_remaining = fp.mul_down(get_fraction_remaining(self),
+                                     ONE - fraction_removed)
+    return to_uint16_fixed(fraction_remaining)
+
+
+def mid_price_at_entry(self: Info) -> int:
+    return tick_to_price(self.mid_tick)
+
+
+def entry_price(self: Info) -> int:
+    return tick_to_price(self.entry_tick)
+
+
+def calc_oi_shares(oi: int, oi_total_on_side: int,
+                   oi_total_shares_on_side: int) -> int:
+    """
+    Computes the amount of shares of open interest to issue a newly
+    built position
+    """
+    if oi_total_on_side == 0 or oi_total_shares_on_side == 0:
+        return oi
+    return mul_div(oi, oi_total_shares_on_side, oi_total_on_side)
+
+
+def _oi_initial(self: Info) -> int:
+    return fp.div_down(self.notional_initial, mid_price_at_entry(self))
+
+
+def notional_initial(self: Info, fraction: int) -> int:
+    notional_for_remaining = fp.mul_up(self.notional_initial,
+                                       get_fraction_remaining(self))
+    return fp.mul_up(notional_for_remaining, fraction)
+
+
+def oi_initial(self: Info, fraction: int) -> int:
+    oi_initial_for_remaining = fp.mul_up(_oi_initial(self),
+                                         get_fraction_remaining(self))
+    return fp.mul_up(oi_initial_for_remaining, fraction)
+
+
+def oi_shares_current(self: Info, fraction: int) -> int:
+    return fp.mul_down(self.oi_shares, fraction)
+
+
+def debt_initial(self: Info, fraction: int) -> int:
+    debt_for_remaining = fp.mul_up(self.debt_initial,
+                                   get_fraction_remaining(self))
+    return fp.mul_up(debt_for_remaining, fraction)
+
+
+def oi_current(self: Info, fraction: int, oi_total_on_side: int,
+               oi_total_shares_on_side: int) -> int:
+    """
+    Computes the current open interest of remaining position accounting
+    for potential funding payments between long/short sides
+    """
+    oi_shares = oi_shares_current(self, fraction)
+    if oi_shares == 0 or oi_total_on_side == 0 \
+            or oi_total_shares_on_side == 0:
+        return 0
+    return mul_div(oi_shares, oi_total_on_side, oi_total_shares_on_side)
+
+
+def cost(self: Info, fraction: int) -> int:
+    """
+    Computes the remaining position's cost
+    """
+    return fp.sub_floor(notional_initial(self, fraction),
+                        debt_initial(self, fraction))
+
+
+def value(self: Info, fraction: int, oi_total_on_side: int,
+          oi_total_shares_on_side: int, current_price: int,
+          cap_payoff: int) -> int:
+    """
+    Computes the value of remaining position. Floors to zero
+    """
+    pos_oi_initial = oi_initial(self, fraction)
+    pos_notional_initial = notional_initial(self, fraction)
+    pos_debt = debt_initial(self, fraction)
+
+    pos_oi_current = oi_current(self, fraction, oi_total_on_side,
+                                oi_total_shares_on_side)
+    pos_entry_price = entry_price(self)
+
+    funded = fp.div_up(fp.mul_up(pos_notional_initial, pos_oi_current),
+                       pos_oi_initial)
+    if self.is_long:
+        val = funded + min(
+            fp.mul_up(pos_oi_current, current_price),
+            fp.mul_up(fp.mul_up(pos_oi_current, pos_entry_price),
+                      ONE + cap_payoff)
+        )
+        return fp.sub_floor(
+            val, pos_debt + fp.mul_up(pos_oi_current, pos_entry_price))
+
+    val = funded + fp.mul_up(pos_oi_current, pos_entry_price)
+    return fp.sub_floor(
+        val, pos_debt + fp.mul_up(pos_oi_current, current_price))
+
+
+def notional_with_pnl(self: Info, fraction: int, oi_total_on_side: int,
+                      oi_total_shares_on_side: int, current_price: int,
+                      cap_payoff: int) -> int:
+    """
+    Computes the current notional of remaining position including PnL.
+    Floors to debt if value <= 0
+    """
+    pos_value = value(self, fraction, oi_total_on_side,
+                      oi_total_shares_on_side, current_price, cap_payoff)
+    return pos_value + debt_initial(self, fraction)
+
+
+def trading_fee(self: Info, fraction: int, oi_total_on_side: int,
+                oi_total_shares_on_side: int, current_price: int,
+                cap_payoff: int, trading_fee_rate: int) -> int:
+    """
+    Computes the trading fees to be imposed on remaining position for
+    build/unwind
+    """
+    pos_notional = notional_with_pnl(self, fraction, oi_total_on_side,
+                                     oi_total_shares_on_side, current_price,
+                                     cap_payoff)
+    return fp.mul_up(pos_notional, trading_fee_rate)
+
+
+def liquidatable(self: Info, oi_total_on_side: int,
+                 oi_total_shares_on_side: int, current_price: int,
+                 cap_payoff: int, maintenance_margin_fraction: int,
+                 liquidation_fee_rate: int) -> bool:
+    """
+    Whether a position can be liquidated: value * (1 - liq fee rate) is
+    less than the maintenance margin
+    """
+    fraction = ONE
+    pos_notional_initial = notional_initial(self, fraction)
+
+    if self.fraction_remaining == 0:
+        # already been liquidated or doesn't exist
+        return False
+
+    val = value(self, fraction, oi_total_on_side, oi_total_shares_on_side,
+                current_price, cap_payoff)
+    maintenance_margin = fp.mul_up(pos_notional_initial,
+                                   maintenance_margin_fraction)
+    liquidation_fee = fp.mul_down(val, liquidation_fee_rate)
+    return val < maintenance_margin + liquidation_fee
@@ -0,0 +1,59 @@
+from enum import IntEnum
+from typing import Sequence
+
+
+class Parameters(IntEnum):
+    """
+    Mirrors the Risk.Parameters enum. Value is the index into the
+    uint256[15] params array stored on each market
+    """
+    K = 0  # funding constant
+    Lmbda = 1  # market impact constant
+    Delta = 2  # bid-ask static spread constant
+    CapPayoff = 3  # payoff cap
+    CapNotional = 4  # initial notional cap
+    CapLeverage = 5  # initial leverage cap
+    CircuitBreakerWindow = 6  # trailing window for circuit breaker
+    CircuitBreakerMintTarget = 7  # target worst case inflation rate
+    MaintenanceMarginFraction = 8  # maintenance margin (mm) constant
+    MaintenanceMarginBurnRate = 9  # burn rate for mm constant
+    LiquidationFeeRate = 10  # liquidation fee charged on liquidate
+    TradingFeeRate = 11  # trading fee charged on build/unwind
+    MinCollateral = 12  # minimum ovl collateral to open position
+    PriceDriftUpperLimit = 13  # upper limit for feed price changes
+    AverageBlockTime = 14  # average block time of the respective chain
+
+    @property
+    def key(self) -> str:
+        """
+        Returns the lower camel case name used in scripts and configs
+        (e.g. capLeverage for Parameters.CapLeverage)
+        """
+        return self.name[0].lower() + self.name[1:]
+
+    @classmethod
+    def from_key(cls, key: str) -> "Parameters":
+        """
+        Returns the parameter associated with the lower camel case name
+        """
+        for name in cls:
+            if name.key == key:
+                return name
+        raise KeyError(f"unknown risk parameter: {key}")
+
+
+NUM_PARAMETERS = len(Parameters)
+
+
+def get(params: Sequence[int], name: Parameters) -> int:
+    """
+    Gets the value associated with the given parameter type
+    """
+    return params[int(name)]
+
+
+def set(params: list, name: Parameters, value: int):
+    """
+    Sets the value associated with the given parameter type
+    """
+    params[int(name)] = value
@@ -0,0 +1,61 @@
+"""
+Python mirror of contracts/libraries/Roller.sol
+"""
+from typing import NamedTuple
+
+from .cast import to_int192_bounded, to_uint32_bounded
+
+
+class Snapshot(NamedTuple):
+    """
+    Mirrors the Roller.Snapshot struct. A brownie return value from
+    market.snapshotMinted() can be converted with Snapshot(*snap)
+    """
+    timestamp: int  # time last snapshot was taken
+    window: int  # window (length of time) over which will decay
+    accumulator: int  # accumulator value which will decay to zero
+
+
+def cumulative(self: Snapshot) -> int:
+    return self.accumulator
+
+
+def _div(a: int, b: int) -> int:
+    # solidity signed division truncates toward zero
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b > 0) else -q
+
+
+def transform(self: Snapshot, timestamp: int, window: int,
+              value: int) -> Snapshot:
+    """
+    Adjusts accumulator value downward linearly over time then adds
+    value. Accumulator goes to zero as one window passes
+    """
+    timestamp32 = timestamp % 2**32  # truncated by compiler
+    dt = timestamp32 - self.timestamp if timestamp32 >= self.timestamp \
+        else 2**32 + timestamp32 - self.timestamp
+    snap_window = self.window
+    snap_accumulator = cumulative(self)
+
+    if dt >= snap_window or snap_window == 0:
+        # if one window has passed, prior value has decayed to zero
+        return Snapshot(timestamp32, to_uint32_bounded(window),
+                        to_int192_bounded(value))
+
+    # fraction of value remaining given linear decay
+    snap_accumulator = _div(snap_accumulator * (snap_window - dt),
+                            snap_window)
+
+    # add in the new value for accumulator now
+    accumulator_now = snap_accumulator + value
+    if accumulator_now == 0:
+        return Snapshot(timestamp32, to_uint32_bounded(window), 0)
+
+    # recalculate window for future decay as a value weighted average time
+    # of time left in window last for accumulator last and window for value
+    w1 = abs(snap_accumulator)
+    w2 = abs(value)
+    window_now = (w1 * (snap_window - dt) + w2 * window) // (w1 + w2)
+    return Snapshot(timestamp32, to_uint32_bounded(window_now),
+                    to_int192_bounded(accumulator_now))
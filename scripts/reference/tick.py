@@ -0,0 +1,35 @@
+from . import fixed_point as fp
+from .errors import require
+from .log_exp_math import _div
+
+
+ONE = 10**18
+PRICE_BASE = 10**18 + 10**14  # 1.0001
+MAX_TICK_256 = 120 * 10**22
+MIN_TICK_256 = -41 * 10**22
+
+
+def price_to_tick(price: int) -> int:
+    """
+    Computes the tick associated with the given price where
+    price = 1.0001 ** tick. Truncates toward zero like Tick.priceToTick
+    """
+    tick256 = fp.log_down(price, PRICE_BASE)
+    require(tick256 >= MIN_TICK_256 and tick256 <= MAX_TICK_256,
+            "OVLV1: tick out of bounds")
+    return _div(tick256, ONE)
+
+
+def tick_to_price(tick: int) -> int:
+    """
+    Computes the price associated with the given tick where
+    price = 1.0001 ** tick
+    """
+    tick256 = tick * ONE
+    require(tick256 >= MIN_TICK_256 and tick256 <= MAX_TICK_256,
+            "OVLV1: tick out of bounds")
+
+    pow = abs(tick256)
+    if tick256 >= 0:
+        return fp.pow_down(PRICE_BASE, pow)
+    return fp.div_down(ONE, fp.pow_up(PRICE_BASE, pow))
@@ -0,0 +1,72 @@
+"""
+Offline validation of risk params against both the OverlayV1Factory
+bounds and the OverlayV1Market cross-param checks, so bad parameter sets
+are rejected without sending a transaction.
+"""
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from . import factory, market
+from .errors import Revert
+from .risk import Parameters, get
+
+
+Error = Tuple[Optional[Parameters], str]
+
+
+def deploy_market_errors(params: Sequence[int],
+                         macro_window: int) -> List[Error]:
+    """
+    Returns (name, reason) pairs for every reason deployMarket would revert
+    on the given params for a feed with the given macro window. Factory
+    bounds are reported for all params; market initialize checks only run
+    once the bounds pass, as they would on chain
+    """
+    errors = factory.risk_param_errors(params)
+    if len(errors) > 0:
+        return errors
+
+    try:
+        market.check_initialize_params(params, macro_window)
+    except Revert as e:
+        errors.append((None, e.reason))
+    return errors
+
+
+def set_risk_param_errors(params: Sequence[int], name: Parameters,
+                          value: int, macro_window: int) -> List[Error]:
+    """
+    Returns (name, reason) pairs for why OverlayV1Factory.setRiskParam
+    would revert updating name to value on a market with current params
+    """
+    try:
+        factory.check_risk_param(name, value)
+        market.check_risk_param(params, name, value, macro_window)
+    except Revert as e:
+        return [(name, e.reason)]
+    return []
+
+
+def is_valid(params: Sequence[int], macro_window: int) -> bool:
+    """
+    Whether deployMarket would accept the given params
+    """
+    return len(deploy_market_errors(params, macro_window)) == 0
+
+
+def filter_valid(param_sets: Iterable[Sequence[int]],
+                 macro_window: int) -> List[Sequence[int]]:
+    """
+    Returns only the param sets deployMarket would accept. Useful for
+    pruning parameter sweeps in bulk
+    """
+    return [params for params in param_sets if is_valid(params, macro_window)]
+
+
+def cached_risk_calcs(params: Sequence[int], macro_window: int) -> dict:
+    """
+    Returns the values the market caches on initialize for valid params
+    """
+    return {
+        "dpUpperLimit": market.dp_upper_limit(
+            get(params, Parameters.PriceDriftUpperLimit), macro_window)
+    }
@@ -0,0 +1,91 @@
+import click
+import csv
+import os
+
+from brownie import OverlayV1Factory, chain, interface, network
+
+from scripts.create import FACTORY
+from scripts.utils import revenue
+from scripts.utils.log_decoder import address_topic, to_logs, topic
+from scripts.utils.reads import load_logs, load_markets
+from scripts.utils.revenue import KINDS, Ledger, attribute
+
+
+def fee_recipients(factory, from_block, to_block):
+    """
+    Every address that was the factory's fee recipient at some block in
+    [from_block, to_block]: the recipient at to_block and each one
+    replaced by a FeeRecipientUpdated in between
+    """
+    updates = factory.events.get_sequence(from_block=from_block,
+                                          to_block=to_block,
+                                          event_type="FeeRecipientUpdated")
+    return {factory.feeRecipient(block_identifier=to_block)} | {
+        factory.feeRecipient(block_identifier=e.blockNumber - 1)
+        for e in updates}
+
+
+def main(period="day", path=None, from_block=0, to_block=None,
+         ledger_path=None):
+    """
+    Attributes every trading fee and liquidated remaining margin paid to
+    the fee recipient to its market, position and block, from market
+    events and OVL Transfer logs from the markets to the fee recipient,
+    and prints revenue rolled up by `period` ("hour", "day" or "market").
+    Writes the rollups to `path` as CSV if given.
+
+    The ledger and its rollups are saved to `ledger_path`, by default
+    under ledgers/<network>. Later runs load it and only scan blocks
+    after the last one scanned, else scanning starts at `from_block`.
+
+    Run with `brownie run revenue main [period] [path]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    to_block = int(to_block) if to_block is not None else chain.height
+    if ledger_path is None:
+        ledger_path = os.path.join("ledgers", network.show_active(),
+                                   "revenue.json")
+    ledger = revenue.load(ledger_path) if os.path.exists(ledger_path) \
+        else Ledger()
+    start = ledger.last_block + 1 if ledger.last_block >= 0 \
+        else int(from_block)
+
+    factory = OverlayV1Factory.at(FACTORY)
+    ovl = interface.IOverlayV1Token(factory.ovl())
+    addresses = [market.address for market, _
+                 in load_markets(factory, to_block=to_block)]
+    if len(addresses) > 0 and start <= to_block:
+        events = to_logs(load_logs(addresses, [[topic(e) for e in KINDS]],
+                                   start, to_block))
+        recipients = fee_recipients(factory, start, to_block)
+        transfers = to_logs(load_logs(
+            ovl.address,
+            [topic("Transfer"), [address_topic(a) for a in addresses],
+             [address_topic(r) for r in recipients]],
+            start, to_block))
+
+        # every flow is paired with one of these transfers
+        timestamps = {n: chain[n].timestamp
+                      for n in {t.blockNumber for t in transfers}}
+        flows = attribute(events, transfers, timestamps)
+        ledger.add(flows, to_block)
+        os.makedirs(os.path.dirname(ledger_path) or ".", exist_ok=True)
+        ledger.save(ledger_path)
+        click.echo(f"Scanned blocks {start} to {to_block}: "
+                   f"{len(flows)} new flows")
+
+    rows = ledger.rows(period)
+    header = ["market"] + ([] if period == "market" else ["start"]) \
+        + ["fees", "margin", "count"]
+    for row in rows:
+        click.echo(" ".join(str(v) for v in row))
+    total = ledger.revenue("day")
+    click.echo(f"\n{total.count} flows to block {ledger.last_block}: "
+               f"fees {total.fees} margin {total.margin}")
+
+    if path is not None:
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        click.echo(f"Wrote {len(rows)} rows to {path}")
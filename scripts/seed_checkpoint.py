@@ -0,0 +1,27 @@
+import click
+
+from brownie import OverlayV1FeedMock, OverlayV1Market, accounts, network
+
+from scripts.utils import checkpoint
+from scripts.utils.seeding import seed
+
+
+def main(path, market, feed_mock=None):
+    """
+    Seeds a checkpoint written by the checkpoint script into the storage
+    of market on a local chain, and sets the price and reserve of
+    feed_mock, an OverlayV1FeedMock, from the checkpoint's feed data if
+    given.
+
+    Run with `brownie run seed_checkpoint main <path> <market> [feed_mock]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    ckpt = checkpoint.load(path)
+    market = OverlayV1Market.at(market)
+    if feed_mock is not None:
+        feed_mock = OverlayV1FeedMock.at(feed_mock)
+
+    slots = seed(market, ckpt, feed_mock, accounts[0])
+    click.echo(f"Seeded {len(ckpt.positions)} positions from block "
+               f"{ckpt.block_number} of {ckpt.market} into "
+               f"{market.address} ({len(slots)} slots)")
@@ -0,0 +1,32 @@
+import click
+import os
+
+from brownie import OverlayV1Market, chain, network
+
+from scripts.utils import position_book
+from scripts.utils.reads import read_book
+
+
+def main(market, path=None, block=None, from_block=0,
+         multicall_address=None):
+    """
+    Snapshots the full position book of a market to a binary file that
+    analysis workers can memory-map with `position_book.load(path)`.
+
+    Run with `brownie run snapshot_book main <market> [path] [block]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    block = chain[int(block) if block is not None else -1]
+    market = OverlayV1Market.at(market)
+    read, positions = read_book(market, block.number, int(from_block),
+                                multicall_address)
+
+    if path is None:
+        path = os.path.join(
+            "snapshots", network.show_active(),
+            f"{market.address}-{block.number}.book")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    position_book.write(path, market.address, block.number, block.timestamp,
+                        read.state, read.snapshots, positions)
+    click.echo(f"Wrote {len(positions)} positions at block {block.number} "
+               f"to {path}")
@@ -0,0 +1,115 @@
+import click
+import os
+
+from brownie import OverlayV1Factory, chain, interface, network
+
+from scripts.create import FACTORY
+from scripts.reference.risk import Parameters
+from scripts.reference.roller import Snapshot
+from scripts.utils import supply
+from scripts.utils.log_decoder import address_topic, to_logs, topic
+from scripts.utils.reads import load_logs, load_markets
+from scripts.utils.supply import (
+    EVENTS, ZERO_ADDRESS, SupplyLedger, reconcile
+)
+
+
+def window_updates(factory, addresses, from_block, to_block):
+    """
+    ParamUpdated logs setting the circuitBreakerWindow of the markets at
+    addresses in [from_block, to_block], in chain order
+    """
+    updates = to_logs(load_logs(
+        factory.address,
+        [topic("ParamUpdated"), None, [address_topic(a) for a in addresses]],
+        from_block, to_block))
+    return [u for u in updates
+            if u.args["name"] == Parameters.CircuitBreakerWindow]
+
+
+def main(period="day", from_block=0, to_block=None, ledger_path=None):
+    """
+    Reconstructs OVL minted and burned by every market from OVL Transfer
+    events to and from the zero address, joined with the markets' Unwind
+    and Liquidate events. Prints net inflation per market and `period`
+    ("hour" or "day"), and the rolling minted replayed from the logs next
+    to the market's on chain snapshotMinted. Each event is replayed with
+    the circuitBreakerWindow in effect at its block.
+
+    The ledger is saved to `ledger_path`, by default under
+    ledgers/<network>. Later runs load it and only scan blocks after the
+    last one scanned, else scanning starts at `from_block`.
+
+    Run with `brownie run supply main [period]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    block = chain[int(to_block) if to_block is not None else -1]
+    factory = OverlayV1Factory.at(FACTORY)
+    ovl = interface.IOverlayV1Token(factory.ovl())
+    markets = [market for market, _ in load_markets(factory,
+                                                    to_block=block.number)]
+
+    if ledger_path is None:
+        ledger_path = os.path.join("ledgers", network.show_active(),
+                                   "supply.json")
+    ledger = supply.load(ledger_path) if os.path.exists(ledger_path) \
+        else SupplyLedger()
+    start = ledger.last_block + 1 if ledger.last_block >= 0 \
+        else int(from_block)
+
+    addresses = [market.address for market in markets]
+    if len(addresses) > 0 and start <= block.number:
+        # window before the first update scanned, for markets the ledger
+        # has not seen yet, then every update in chain order
+        updates = window_updates(factory, addresses, start, block.number)
+        for m in markets:
+            if m.address in ledger.windows:
+                continue
+            first = next((u.blockNumber for u in updates
+                          if u.args["market"] == m.address),
+                         block.number + 1)
+            ledger.set_window(m.address, m.params(
+                Parameters.CircuitBreakerWindow, block_identifier=first - 1))
+        for u in updates:
+            ledger.set_window(u.args["market"], u.args["value"],
+                              u.blockNumber, u.logIndex)
+
+        events = to_logs(load_logs(addresses, [[topic(e) for e in EVENTS]],
+                                   start, block.number))
+        # only mints to and burns from the markets
+        zero, topics = address_topic(ZERO_ADDRESS), \
+            [address_topic(a) for a in addresses]
+        transfers = []
+        for frm, to in ((zero, topics), (topics, zero)):
+            transfers += to_logs(load_logs(ovl.address,
+                                           [topic("Transfer"), frm, to],
+                                           start, block.number))
+        timestamps = {n: chain[n].timestamp
+                      for n in {e.blockNumber for e in events}}
+
+        records = reconcile(events, transfers, timestamps)
+        ledger.add(records, block.number)
+        os.makedirs(os.path.dirname(ledger_path) or ".", exist_ok=True)
+        ledger.save(ledger_path)
+        click.echo(f"Scanned blocks {start} to {block.number}: "
+                   f"{len(records)} new records")
+
+    rollups = {"hour": ledger.hour, "day": ledger.day}[period]
+    for (market, start), net in sorted(rollups.items()):
+        click.echo(f"{market} {start} {net:+}")
+
+    click.echo("")
+    for market in markets:
+        s = ledger.markets[market.address]
+        snapshot = Snapshot(*market.snapshotMinted(
+            block_identifier=block.number))
+        replayed, on_chain = ledger.compare(market.address, snapshot,
+                                            block.timestamp)
+        click.echo(f"{market.address} minted {s.minted} burned {s.burned} "
+                   f"net {s.net:+} rolling {replayed:+} "
+                   f"snapshotMinted {on_chain:+}")
+
+    for r in ledger.mismatches():
+        click.echo(f"mismatch {r.market} {r.event} {r.position_id} "
+                   f"in {r.transaction_hash}: transfers {r.minted} "
+                   f"registered {r.expected}")
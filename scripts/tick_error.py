@@ -0,0 +1,68 @@
+import click
+
+from brownie import OverlayV1Factory, chain, network
+
+from scripts.create import FACTORY
+from scripts.reference.market import mid_from_feed
+from scripts.reference.oracle import Data
+from scripts.utils.log_decoder import checksummed, topic
+from scripts.utils.position_book import to_ints
+from scripts.utils.reads import load_logs, load_markets, read_positions
+from scripts.utils.tick_error import Bias, analyze, synthetic
+
+
+def _echo(name: str, bias: Bias):
+    click.echo(f"{name:>6}: {bias.count} builds, entry error "
+               f"{bias.entry_error_mean:+.4f}bp mean "
+               f"({bias.entry_error_max:+.4f}bp max), mid error "
+               f"{bias.mid_error_mean:+.4f}bp, PnL bias "
+               f"{bias.pnl_bias_total:+.6f} OVL total "
+               f"({bias.pnl_bias_max:+.6f} max)")
+
+
+def main(from_block=0, multicall_address=None, synthetic_builds=0,
+         price=2000., volatility=0.05, delta=0.0025):
+    """
+    Quantifies the entry price and PnL bias from positions storing prices
+    as ticks. Replays the priceToTick/tickToPrice round trip for every
+    Build across all markets deployed by the factory, valued at each
+    market's current mid price, per side and in aggregate. With
+    `synthetic_builds` > 0, analyzes that many random builds around
+    `price` instead.
+
+    Run with `brownie run tick_error main [from_block]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    if int(synthetic_builds) > 0:
+        builds = synthetic(int(synthetic_builds), float(price),
+                           float(volatility), float(delta))
+        for name, bias in analyze(*builds).items():
+            _echo(name, bias)
+        return
+
+    block = chain[-1].number
+    factory = OverlayV1Factory.at(FACTORY)
+    columns = ([], [], [], [], [])
+    for market, feed in load_markets(factory, int(from_block)):
+        build = load_logs(market.address, [topic("Build")],
+                          int(from_block), block)["Build"]
+        if len(build) == 0:
+            continue
+        infos = read_positions(
+            market, list(zip(checksummed(build["sender"]),
+                             to_ints(build["positionId"]))),
+            block, multicall_address)
+        exit_ = mid_from_feed(Data(*feed.latest(block_identifier=block)))
+
+        # Build oi is notional / mid at build before rounding to a tick
+        rows = [(is_long, info.notional_initial / 1e18,
+                 info.notional_initial * 10**18 // oi, price, exit_)
+                for is_long, info, oi, price in zip(
+                    build["isLong"].tolist(), infos, to_ints(build["oi"]),
+                    to_ints(build["price"]))]
+        for column, values in zip(columns, zip(*rows)):
+            column.extend(values)
+        _echo(market.address[:8], analyze(*zip(*rows))["all"])
+
+    for name, bias in analyze(*columns).items():
+        _echo(name, bias)
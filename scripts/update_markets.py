@@ -0,0 +1,75 @@
+import click
+
+from brownie import OverlayV1Factory, accounts, chain, network, web3
+
+from scripts.create import FACTORY
+from scripts.reference.market import mid_from_feed
+from scripts.utils.reads import (
+    load_invalidations, load_markets, read_markets
+)
+from scripts.utils.transactions import CONFIRMED, PipelinedSender
+from scripts.utils.updates import UpdateScheduler
+from scripts.utils.view_cache import CachedContract, ViewCache
+
+
+def main(error_price, gas_budget=1000000, max_interval=None, from_block=0,
+         multicall_address=None):
+    """
+    Keeper that calls update() on markets deployed by the factory only
+    when worth it.
+
+    Each block, all markets are read in one multicall and scored by the
+    pending funding step, valued at `error_price` native token wei per
+    OVL, less estimated gas. The best pokes within `gas_budget` gas, and
+    any market not updated for `max_interval` seconds or close to funding
+    factor saturation, are updated with pipelined transactions. View
+    calls go through a cache whose hit rate is printed on exit.
+
+    Run with `brownie run update_markets main <error_price> [gas_budget]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    keeper = accounts.load(click.prompt(
+        "Account", type=click.Choice(accounts.load())))
+
+    factory = OverlayV1Factory.at(FACTORY)
+    cache = ViewCache()
+    markets = [(CachedContract(market, cache), CachedContract(feed, cache))
+               for market, feed in load_markets(factory, int(from_block))]
+    contracts = {market.address: market for market, _ in markets}
+    scheduler = UpdateScheduler(
+        web3.eth.gas_price, int(error_price), int(gas_budget),
+        int(max_interval) if max_interval is not None else None)
+    scanned = chain.height
+
+    try:
+        for block in chain.new_blocks():
+            cache.advance(block.number)
+            for event in load_invalidations(factory, contracts.values(),
+                                            scanned + 1, block.number):
+                cache.observe(event)
+            scanned = block.number
+
+            scheduler.gas_price = web3.eth.gas_price
+            pokes = scheduler.schedule(
+                scheduler.poke(read.market, read.state, read.data,
+                               read.dp_upper_limit, mid_from_feed(read.data),
+                               block.timestamp)
+                for read in read_markets(markets, block.number,
+                                         multicall_address))
+            if len(pokes) == 0:
+                continue
+
+            sender = PipelinedSender(keeper)
+            steps = [sender.transact(contracts[p.market], "update")
+                     for p in pokes]
+            sender.run(raise_on_failure=False)
+
+            for poke, step in zip(pokes, steps):
+                forced = " forced" if poke.forced else ""
+                click.echo(f"[{block.number}] update {poke.market}{forced}: "
+                           f"{step.status} (elapsed {poke.elapsed}s, "
+                           f"step {poke.step})")
+                if step.status == CONFIRMED:
+                    scheduler.record(poke, step.gas_used)
+    finally:
+        click.echo(cache.report())
@@ -0,0 +1,72 @@
+"""
+ABI type helpers shared by the in-process EVM and mock backends
+"""
+from typing import Any, Dict, List
+
+
+def abi_type(param: Dict) -> str:
+    """
+    Canonical type string of an ABI input or output, expanding structs
+    to tuples
+    """
+    t = param["type"]
+    if not t.startswith("tuple"):
+        return t
+    inner = ",".join(abi_type(c) for c in param["components"])
+    return f"({inner}){t[len('tuple'):]}"
+
+
+def address(value: Any) -> Any:
+    """
+    Address of a brownie or in-process account or contract, or value
+    """
+    if hasattr(value, "address"):
+        return value.address
+    return value
+
+
+def normalize(t: str, value: Any) -> Any:
+    """
+    Coerces an arg for ABI type t the way brownie does for the common
+    cases: accounts and contracts to addresses, numbers to int
+    """
+    if t.endswith("]"):
+        base = t[:t.rindex("[")]
+        return [normalize(base, v) for v in value]
+    if t.startswith("("):
+        types = _split(t[1:-1])
+        return tuple(normalize(s, v) for s, v in zip(types, value))
+    if t == "address":
+        return str(address(value))
+    if t.startswith("uint") or t.startswith("int"):
+        return int(value)
+    return value
+
+
+def _split(types: str) -> List[str]:
+    # split comma separated types at the top level of nesting
+    parts, depth, start = [], 0, 0
+    for i, c in enumerate(types):
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "," and depth == 0:
+            parts.append(types[start:i])
+            start = i + 1
+    if types:
+        parts.append(types[start:])
+    return parts
+
+
+def in_range(t: str, value: Any) -> bool:
+    """
+    Whether value fits ABI type t. Only integer types are checked
+    """
+    if t.startswith("uint"):
+        bits = int(t[4:] or 256)
+        return 0 <= value < 2**bits
+    if t.startswith("int"):
+        bits = int(t[3:] or 256)
+        return -2**(bits - 1) <= value < 2**(bits - 1)
+    return True
@@ -0,0 +1,229 @@
+"""
+Versioned checkpoint of everything needed to reproduce a market at a
+block.
+
+A checkpoint file is the position book format (see position_book) with
+the feed data and dpUpperLimit added to the header under its own magic,
+so the same file can be replayed in the reference engine with
+`Checkpoint.to_market()` and seeded into the storage of a market on a local
+chain with `storage()` (see seed_checkpoint.py).
+
+The version is read before the rest of the header, so files written by
+older versions stay loadable as HEADER_DTYPES grows.
+"""
+import numpy as np
+
+from eth_utils import keccak
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from scripts.reference.market import MarketState
+from scripts.reference.oracle import Data
+from scripts.reference.position import Info, get_key
+from scripts.reference.roller import Snapshot
+from scripts.utils.impact import Market
+from scripts.utils.position_book import (
+    HEADER_DTYPE, POSITION_DTYPE, UINT256, Book, fill_header, to_array,
+    to_ints, to_limbs
+)
+
+
+MAGIC = b"OVLVCKPT"
+VERSION = 1
+
+DATA_DTYPE = np.dtype([
+    ("timestamp", "<u8"),
+    ("micro_window", "<u8"),
+    ("macro_window", "<u8"),
+    ("price_over_micro_window", UINT256),
+    ("price_over_macro_window", UINT256),
+    ("price_one_macro_window_ago", UINT256),
+    ("reserve_over_micro_window", UINT256),
+    ("has_reserve", "?"),
+])
+
+# header dtype of each version, extending the position book header
+HEADER_DTYPES = {
+    1: np.dtype([(name, HEADER_DTYPE.fields[name][0])
+                 for name in HEADER_DTYPE.names] + [
+        ("dp_upper_limit", UINT256),
+        ("data", DATA_DTYPE),
+    ]),
+}
+
+_PREFIX_DTYPE = np.dtype([("magic", "S8"), ("version", "<u4")])
+
+# OverlayV1Market storage slots. slot 0 is Pausable._paused
+SLOT_PARAMS = 1  # uint256[15] in slots 1-15
+SLOT_OI_LONG = 16
+SLOT_OI_SHORT = 17
+SLOT_OI_LONG_SHARES = 18
+SLOT_OI_SHORT_SHARES = 19
+SLOT_SNAPSHOT_VOLUME_BID = 20
+SLOT_SNAPSHOT_VOLUME_ASK = 21
+SLOT_SNAPSHOT_MINTED = 22
+SLOT_POSITIONS = 23
+SLOT_TOTAL_POSITIONS = 24
+SLOT_TIMESTAMP_UPDATE_LAST = 25
+SLOT_DP_UPPER_LIMIT = 26
+
+
+class Checkpoint(Book):
+    """
+    Checkpoint loaded from disk. positions is a memory-mapped structured
+    array with POSITION_DTYPE
+    """
+
+    @property
+    def version(self) -> int:
+        return int(self.header["version"])
+
+    @property
+    def dp_upper_limit(self) -> int:
+        return to_ints(self.header["dp_upper_limit"])[0]
+
+    def data(self) -> Data:
+        """
+        Returns the feed's Oracle.Data at the checkpoint block
+        """
+        d = self.header["data"]
+        return Data(int(d["timestamp"]), int(d["micro_window"]),
+                    int(d["macro_window"]),
+                    to_ints(d["price_over_micro_window"])[0],
+                    to_ints(d["price_over_macro_window"])[0],
+                    to_ints(d["price_one_macro_window_ago"])[0],
+                    to_ints(d["reserve_over_micro_window"])[0],
+                    bool(d["has_reserve"]))
+
+    def to_market(self, timestamp: Optional[int] = None) -> Market:
+        """
+        Returns the reference engine's view of the market for a trade
+        mined at timestamp, by default the checkpoint block's
+        """
+        return Market(self.state(), self.snapshots(), self.data(),
+                      self.dp_upper_limit,
+                      self.timestamp if timestamp is None else timestamp)
+
+    def infos(self) -> List[Tuple[str, int, Info]]:
+        """
+        Returns (owner, positionId, Position.Info) of every position
+        """
+        return [(self.owner(i), int(self.positions["position_id"][i]),
+                 self.info(i)) for i in range(len(self.positions))]
+
+
+def write(path: str, market: str, block_number: int, timestamp: int,
+          state: MarketState, snapshots: Tuple[Snapshot, Snapshot, Snapshot],
+          data: Data, dp_upper_limit: int,
+          positions: Sequence[Tuple[str, int, Info]]):
+    """
+    Writes a checkpoint of market at block_number to path. snapshots are
+    (snapshotVolumeBid, snapshotVolumeAsk, snapshotMinted), data is the
+    feed's latest() and positions are (owner, positionId, Position.Info)
+    tuples
+    """
+    header = np.zeros(1, dtype=HEADER_DTYPES[VERSION])
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    fill_header(header, market, block_number, timestamp, state, snapshots,
+                len(positions))
+    header["dp_upper_limit"] = to_limbs([dp_upper_limit], UINT256.shape[0])
+    header["data"] = (
+        data.timestamp, data.micro_window, data.macro_window,
+        *to_limbs([data.price_over_micro_window,
+                   data.price_over_macro_window,
+                   data.price_one_macro_window_ago,
+                   data.reserve_over_micro_window], UINT256.shape[0]),
+        data.has_reserve)
+
+    with open(path, "wb") as f:
+        f.write(header.tobytes())
+        f.write(to_array(positions).tobytes())
+
+
+def load(path: str) -> Checkpoint:
+    """
+    Memory-maps the checkpoint at path read only
+    """
+    prefix = np.fromfile(path, dtype=_PREFIX_DTYPE, count=1)
+    if len(prefix) == 0 or prefix[0]["magic"] != MAGIC:
+        raise ValueError(f"{path} is not a market checkpoint")
+    version = int(prefix[0]["version"])
+    if version not in HEADER_DTYPES:
+        raise ValueError(f"{path} has unsupported version {version}")
+
+    dtype = HEADER_DTYPES[version]
+    header = np.fromfile(path, dtype=dtype, count=1)
+    count = int(header[0]["count"])
+    if count == 0:
+        return Checkpoint(header[0], np.zeros(0, dtype=POSITION_DTYPE))
+    positions = np.memmap(path, dtype=POSITION_DTYPE, mode="r",
+                          offset=dtype.itemsize, shape=(count,))
+    return Checkpoint(header[0], positions)
+
+
+def pack_snapshot(snap: Snapshot) -> int:
+    """
+    Storage word of a Roller.Snapshot: uint32 timestamp, uint32 window and
+    int192 accumulator packed from the low bits
+    """
+    return snap.timestamp | (snap.window << 32) \
+        | ((snap.accumulator % 2**192) << 64)
+
+
+def pack_position(info: Info) -> Tuple[int, int]:
+    """
+    The two storage words of a Position.Info, packed from the low bits
+    """
+    first = info.notional_initial | (info.debt_initial << 96) \
+        | ((info.mid_tick % 2**24) << 192) \
+        | ((info.entry_tick % 2**24) << 216) \
+        | (int(info.is_long) << 240) | (int(info.liquidated) << 248)
+    second = info.oi_shares | (info.fraction_remaining << 240)
+    return first, second
+
+
+def position_slot(key: bytes) -> int:
+    """
+    First storage slot of positions[key]
+    """
+    return int.from_bytes(
+        keccak(key + SLOT_POSITIONS.to_bytes(32, "big")), "big")
+
+
+def storage(checkpoint: Checkpoint,
+            timestamp: Optional[int] = None) -> Dict[int, int]:
+    """
+    Returns the OverlayV1Market storage slots and values that reproduce
+    the checkpoint. Nonzero timestamps are shifted by timestamp less the
+    checkpoint block's timestamp, so the market can be seeded on a chain
+    whose clock is already past the checkpoint. _totalPositions is set
+    past the largest position id so new builds don't overwrite seeded
+    positions
+    """
+    shift = 0 if timestamp is None else timestamp - checkpoint.timestamp
+
+    def shifted(t: int) -> int:
+        return t + shift if t > 0 else t
+
+    state = checkpoint.state()
+    slots = {SLOT_PARAMS + i: p for i, p in enumerate(state.params)}
+    slots.update({
+        SLOT_OI_LONG: state.oi_long,
+        SLOT_OI_SHORT: state.oi_short,
+        SLOT_OI_LONG_SHARES: state.oi_long_shares,
+        SLOT_OI_SHORT_SHARES: state.oi_short_shares,
+        SLOT_TIMESTAMP_UPDATE_LAST: shifted(state.timestamp_update_last),
+        SLOT_DP_UPPER_LIMIT: checkpoint.dp_upper_limit,
+    })
+    for slot, snap in zip((SLOT_SNAPSHOT_VOLUME_BID, SLOT_SNAPSHOT_VOLUME_ASK,
+                           SLOT_SNAPSHOT_MINTED), checkpoint.snapshots()):
+        slots[slot] = pack_snapshot(snap._replace(
+            timestamp=shifted(snap.timestamp)))
+
+    infos = checkpoint.infos()
+    for owner, id, info in infos:
+        slot = position_slot(get_key(owner, id))
+        slots[slot], slots[slot + 1] = pack_position(info)
+    if len(infos) > 0:
+        slots[SLOT_TOTAL_POSITIONS] = max(id for _, id, _ in infos) + 1
+    return slots
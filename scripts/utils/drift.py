@@ -0,0 +1,101 @@
+"""
+Predicts when a market's feed data will fail OverlayV1Market.dataIsValid,
+which halts build, unwind and liquidate with `OVLV1:!data`.
+
+dataIsValid requires dp = priceOverMacroWindow / priceOneMacroWindowAgo to
+stay within [1/dpUpperLimit, dpUpperLimit]. The monitor tracks ln(dp) per
+market, fits a linear trend over recent samples and projects the time at
+which it will cross either bound.
+"""
+from collections import deque
+from dataclasses import dataclass
+from math import log
+from typing import Deque, Dict, Optional, Tuple
+
+from scripts.reference.fixed_point import ONE, div_down
+from scripts.reference.market import data_drift, data_is_valid
+from scripts.reference.oracle import Data
+
+
+@dataclass
+class DriftState:
+    """
+    Drift of a market's feed data relative to its dataIsValid bounds
+    """
+    market: str
+    timestamp: int
+    dp: int  # 18 decimal drift ratio used by dataIsValid
+    dp_upper_limit: int
+    is_valid: bool
+    utilization: float  # ln(dp) / ln(dpUpperLimit), in [-1, 1] when valid
+    slope: float  # change in ln(dp) per second from recent trend
+    seconds_to_breach: Optional[float]  # None if trend moves away
+
+    def alert(self, horizon: float) -> bool:
+        """
+        Whether data is invalid now or projected to be within horizon
+        seconds
+        """
+        return not self.is_valid or (
+            self.seconds_to_breach is not None
+            and self.seconds_to_breach <= horizon)
+
+
+def _slope(samples: Deque[Tuple[int, float]]) -> float:
+    """
+    Least squares slope of ln(dp) vs timestamp
+    """
+    n = len(samples)
+    if n < 2:
+        return 0.0
+    mean_t = sum(t for t, _ in samples) / n
+    mean_x = sum(x for _, x in samples) / n
+    var_t = sum((t - mean_t) ** 2 for t, _ in samples)
+    if var_t == 0:
+        return 0.0
+    cov = sum((t - mean_t) * (x - mean_x) for t, x in samples)
+    return cov / var_t
+
+
+class DriftMonitor:
+    """
+    Tracks ln(dp) over the last `window` samples for each market
+    """
+
+    def __init__(self, window: int = 20):
+        self.window = window
+        self._samples: Dict[str, Deque[Tuple[int, float]]] = {}
+
+    def update(self, market: str, data: Data,
+               dp_upper_limit: int) -> DriftState:
+        """
+        Adds the latest feed data for market and returns its drift state
+        """
+        dp = data_drift(data)
+        valid = data_is_valid(data, dp_upper_limit)
+
+        # log bounds, using the exact lower limit the market computes
+        upper = log(dp_upper_limit / ONE)
+        lower = log(div_down(ONE, dp_upper_limit) / ONE)
+        if dp == 0:
+            self._samples.pop(market, None)
+            return DriftState(market, data.timestamp, dp, dp_upper_limit,
+                              valid, float("nan"), 0.0, None)
+
+        x = log(dp / ONE)
+        samples = self._samples.setdefault(market,
+                                           deque(maxlen=self.window))
+        if len(samples) > 0 and samples[-1][0] == data.timestamp:
+            samples.pop()
+        samples.append((data.timestamp, x))
+
+        slope = _slope(samples)
+        seconds_to_breach = None
+        if slope > 0:
+            seconds_to_breach = max((upper - x) / slope, 0.0)
+        elif slope < 0:
+            seconds_to_breach = max((lower - x) / slope, 0.0)
+
+        utilization = x / upper if upper > 0 else float("inf")
+        return DriftState(market, data.timestamp, dp, dp_upper_limit, valid,
+                          utilization, slope, seconds_to_breach)
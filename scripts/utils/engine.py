@@ -0,0 +1,257 @@
+"""
+Block-driven incremental computation of derived market quantities.
+
+Each market keeps a dependency graph from raw chain reads (feed data,
+market state, Roller snapshots, positions, block timestamp) to derived
+quantities (mid/bid/ask, dataIsValid, funding projections, impact,
+position valuations). When a new block arrives only the sources are
+set. A derived node is recomputed only if one of its inputs changed
+since it was last computed, and a recomputed node whose value is equal
+to its previous value (per its `eq`) does not dirty its dependents.
+"""
+import asyncio
+import numpy as np
+
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence,
+    Tuple
+)
+
+from scripts.reference.market import (
+    MarketState, ask, bid, data_is_valid, mid_from_feed
+)
+from scripts.reference.risk import Parameters, get
+from scripts.reference.roller import cumulative, transform
+from scripts.utils.portfolio import valuation
+
+
+def equal(a: Any, b: Any) -> bool:
+    """
+    Default node equality. Arrays compare by value, anything that can't
+    be reduced to a single bool compares unequal
+    """
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return isinstance(a, np.ndarray) and isinstance(b, np.ndarray) \
+            and np.array_equal(a, b)
+    try:
+        return bool(a == b)
+    except ValueError:
+        return False
+
+
+class Node:
+    def __init__(self, name: str, fn: Optional[Callable],
+                 inputs: Sequence[str], eq: Callable[[Any, Any], bool]):
+        self.name = name
+        self.fn = fn  # None for sources
+        self.inputs = tuple(inputs)
+        self.eq = eq
+        self.value = None
+        self.version = 0  # incremented each time value changes
+        self.input_versions: Optional[Tuple[int, ...]] = None
+
+
+class Graph:
+    """
+    Dependency graph of named values. Nodes must be added after their
+    inputs, so insertion order is a topological order
+    """
+
+    def __init__(self):
+        self._nodes: Dict[str, Node] = {}
+        self.computed = 0
+        self.skipped = 0
+
+    def source(self, name: str, eq: Callable[[Any, Any], bool] = equal):
+        self._add(Node(name, None, (), eq))
+
+    def node(self, name: str, fn: Callable, inputs: Sequence[str],
+             eq: Callable[[Any, Any], bool] = equal):
+        """
+        Adds a derived node computed as fn(*input values)
+        """
+        for i in inputs:
+            if i not in self._nodes:
+                raise KeyError(f"{name} input {i} not in graph")
+        self._add(Node(name, fn, inputs, eq))
+
+    def _add(self, node: Node):
+        if node.name in self._nodes:
+            raise KeyError(f"{node.name} already in graph")
+        self._nodes[node.name] = node
+
+    def __getitem__(self, name: str) -> Any:
+        return self._nodes[name].value
+
+    def set(self, name: str, value: Any) -> bool:
+        """
+        Sets a source value. Returns whether it changed
+        """
+        node = self._nodes[name]
+        if node.fn is not None:
+            raise KeyError(f"{name} is not a source")
+        return self._update(node, value)
+
+    def _update(self, node: Node, value: Any) -> bool:
+        if node.version > 0 and node.eq(node.value, value):
+            return False
+        node.value = value
+        node.version += 1
+        return True
+
+    def recompute(self) -> List[str]:
+        """
+        Recomputes derived nodes with changed inputs. Returns names of
+        nodes whose value changed
+        """
+        changed = []
+        for node in self._nodes.values():
+            if node.fn is None:
+                continue
+            inputs = [self._nodes[i] for i in node.inputs]
+            versions = tuple(i.version for i in inputs)
+            if versions == node.input_versions or 0 in versions:
+                # inputs unchanged or not all available yet
+                self.skipped += 1
+                continue
+
+            node.input_versions = versions
+            self.computed += 1
+            if self._update(node, node.fn(*[i.value for i in inputs])):
+                changed.append(node.name)
+        return changed
+
+
+def _oi_close(tolerance: float) -> Callable[[Any, Any], bool]:
+    # funding moves oi every second. treat as unchanged within tolerance
+    # so positions are not revalued every block for wei level moves
+    def eq(a: MarketState, b: MarketState) -> bool:
+        if a.params != b.params:
+            return False
+        for x, y in ((a.oi_long, b.oi_long), (a.oi_short, b.oi_short)):
+            if abs(x - y) > tolerance * max(x, y):
+                return False
+        return (a.oi_long_shares, a.oi_short_shares) \
+            == (b.oi_long_shares, b.oi_short_shares)
+    return eq
+
+
+def _volumes(snapshots, data, timestamp) -> Tuple[int, int]:
+    # rolling bid and ask volume decayed to timestamp
+    bid_snapshot, ask_snapshot, _ = snapshots
+    return (cumulative(transform(bid_snapshot, timestamp, data.micro_window,
+                                 0)),
+            cumulative(transform(ask_snapshot, timestamp, data.micro_window,
+                                 0)))
+
+
+def _quotes(params, data, volumes) -> Tuple[int, int]:
+    volume_bid, volume_ask = volumes
+    return (bid(params, data, volume_bid), ask(params, data, volume_ask))
+
+
+def _funding_rate(state: MarketState) -> float:
+    """
+    Instantaneous rate at which the overweight side pays per second as a
+    fraction of its oi: 2 * k * imbalance / oi overweight
+    """
+    k = get(state.params, Parameters.K) / 1e18
+    over = max(state.oi_long, state.oi_short)
+    under = min(state.oi_long, state.oi_short)
+    if over == 0:
+        return 0.
+    return 2 * k * (over - under) / over
+
+
+def market_graph(market: str, funding_tolerance: float = 1e-6) -> Graph:
+    """
+    Returns the dependency graph for one market. Sources are "data",
+    "dp_upper_limit", "state", "snapshots", "positions" (POSITION_DTYPE
+    array) and "timestamp"
+    """
+    g = Graph()
+    for name in ("data", "dp_upper_limit", "state", "snapshots",
+                 "positions", "timestamp"):
+        g.source(name)
+
+    # feed data -> mid/bid/ask
+    g.node("params", lambda state: state.params, ["state"])
+    g.node("valid", data_is_valid, ["data", "dp_upper_limit"])
+    g.node("mid", mid_from_feed, ["data"])
+
+    # snapshots -> impact
+    g.node("volumes", _volumes, ["snapshots", "data", "timestamp"])
+    g.node("quotes", _quotes, ["params", "data", "volumes"])
+
+    # oi/shares -> funding projections
+    g.node("funding", lambda state, timestamp: state.pay_funding(timestamp),
+           ["state", "timestamp"], eq=_oi_close(funding_tolerance))
+    g.node("funding_rate", _funding_rate, ["funding"])
+
+    # positions -> valuations and liquidation checks
+    g.node("valuation",
+           lambda positions, funding, mid: valuation(market, funding, mid,
+                                                     positions),
+           ["positions", "funding", "mid"], eq=lambda a, b: False)
+    g.node("liquidatable",
+           lambda v: v.position_id[v.health < 1].tolist(), ["valuation"])
+    return g
+
+
+class Engine:
+    """
+    Drives one graph per market from a stream of blocks. read(block) is
+    awaited for every block and returns {market: {source: value}}. Each
+    market's changed nodes are passed to on_change(block, market, graph,
+    changed)
+    """
+
+    def __init__(self, read: Callable[[Any], Awaitable[Dict[str, Dict]]],
+                 on_change: Optional[Callable] = None,
+                 funding_tolerance: float = 1e-6):
+        self.read = read
+        self.on_change = on_change
+        self.funding_tolerance = funding_tolerance
+        self.graphs: Dict[str, Graph] = {}
+
+    def process(self, block, reads: Dict[str, Dict]):
+        for market, sources in reads.items():
+            graph = self.graphs.get(market)
+            if graph is None:
+                graph = market_graph(market, self.funding_tolerance)
+                self.graphs[market] = graph
+            for name, value in sources.items():
+                graph.set(name, value)
+
+            changed = graph.recompute()
+            if self.on_change is not None and len(changed) > 0:
+                self.on_change(block, market, graph, changed)
+
+    async def run(self, blocks: AsyncIterator):
+        async for block in blocks:
+            self.process(block, await self.read(block))
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of derived node evaluations skipped across markets
+        """
+        computed = sum(g.computed for g in self.graphs.values())
+        skipped = sum(g.skipped for g in self.graphs.values())
+        total = computed + skipped
+        return skipped / total if total > 0 else 0.
+
+
+async def poll_blocks(web3, interval: float = 1.0) -> AsyncIterator:
+    """
+    Yields each new block from web3, polling in a worker thread so the
+    event loop isn't blocked
+    """
+    last = None
+    while True:
+        block = await asyncio.to_thread(web3.eth.get_block, "latest")
+        if last is None or block.number > last:
+            last = block.number
+            yield block
+        else:
+            await asyncio.sleep(interval)
@@ -0,0 +1,235 @@
+"""
+In-process EVM for executing compiled contracts without a node.
+
+Contracts are deployed to a py-evm chain through eth-tester and called
+with calldata encoded directly from their ABI, so a call costs a few
+milliseconds of EVM execution with no RPC or process boundary. Meant
+for stateless or lightly stateful mocks such as the library mocks,
+where the round trip to a development node dominates test time.
+Requires eth-tester[py-evm].
+"""
+import json
+
+from eth.exceptions import Revert as EVMRevert
+from eth_abi import decode, encode
+from eth_tester import EthereumTester, PyEVMBackend
+from eth_tester.exceptions import TransactionFailed
+from eth_utils import function_abi_to_4byte_selector, to_canonical_address
+from typing import Any, Dict, List, Optional, Sequence
+
+from scripts.reference.errors import Revert
+from scripts.utils.abi import abi_type, address, normalize
+
+
+GAS_LIMIT = 10_000_000
+
+# selector of Error(string), the revert data of require with a reason
+ERROR_SELECTOR = bytes.fromhex("08c379a0")
+
+
+def _reason(error: TransactionFailed) -> Optional[str]:
+    # eth-tester decodes Error(string) to its message and otherwise gives
+    # the repr of the raw revert bytes, as for panics and bare reverts
+    msg = str(error)
+    return None if msg.startswith(("b'", 'b"')) else msg
+
+
+def _computation_reason(error: Exception) -> Optional[str]:
+    # reason of a failed computation: the message of Error(string) revert
+    # data, else none, as for panics, bare reverts and exceptional halts
+    data = error.args[0] if isinstance(error, EVMRevert) and error.args \
+        else b""
+    if data[:4] != ERROR_SELECTOR:
+        return None
+    return decode(["string"], data[4:])[0]
+
+
+class Function:
+    def __init__(self, contract: "Contract", abi: Dict):
+        self.contract = contract
+        self.abi = abi
+        self.name = abi["name"]
+        self.inputs = [abi_type(i) for i in abi["inputs"]]
+        self.outputs = [abi_type(o) for o in abi["outputs"]]
+        self.selector = function_abi_to_4byte_selector(abi)
+        self.is_view = abi.get("stateMutability") in ("view", "pure")
+
+    def encode_input(self, *args) -> bytes:
+        values = [normalize(t, a) for t, a in zip(self.inputs, args)]
+        return self.selector + encode(self.inputs, values)
+
+    def decode_output(self, data: bytes) -> Any:
+        values = decode(self.outputs, data)
+        return values[0] if len(values) == 1 else values
+
+    def call(self, *args, tx: Optional[Dict] = None) -> Any:
+        """
+        Executes the function without mining a transaction
+        """
+        data = self.encode_input(*args)
+        return self.decode_output(self.contract.evm.call(
+            self.contract.address, data, tx))
+
+    def transact(self, *args, tx: Optional[Dict] = None) -> Dict:
+        """
+        Mines a transaction calling the function. Returns the receipt
+        """
+        return self.contract.evm.transact(self.contract.address,
+                                          self.encode_input(*args), tx)
+
+    def __call__(self, *args) -> Any:
+        # trailing dict is tx params, as in brownie
+        tx = None
+        if len(args) == len(self.inputs) + 1 and isinstance(args[-1], dict):
+            args, tx = args[:-1], args[-1]
+        if len(args) != len(self.inputs):
+            raise TypeError(f"{self.name} expects {len(self.inputs)} "
+                            f"arguments, got {len(args)}")
+        if self.is_view:
+            return self.call(*args, tx=tx)
+        return self.transact(*args, tx=tx)
+
+
+class Contract:
+    """
+    Deployed contract with its ABI functions as attributes. View and
+    pure functions are called, others transacted
+    """
+
+    def __init__(self, evm: "EVM", address: str, abi: Sequence[Dict]):
+        self.evm = evm
+        self.address = address
+        self.abi = abi
+        self._functions: Dict[str, List[Function]] = {}
+        for item in abi:
+            if item.get("type") == "function":
+                self._functions.setdefault(item["name"], []).append(
+                    Function(self, item))
+
+    def __getattr__(self, name: str) -> Any:
+        functions = self.__dict__.get("_functions", {})
+        if name not in functions:
+            raise AttributeError(name)
+        overloads = functions[name]
+        if len(overloads) > 1:
+            raise AttributeError(f"{name} is overloaded")
+        return overloads[0]
+
+    def __str__(self) -> str:
+        return self.address
+
+
+class EVM:
+    """
+    A py-evm chain in this process with eth-tester's funded accounts
+    """
+
+    def __init__(self):
+        self.tester = EthereumTester(PyEVMBackend())
+        self.accounts = self.tester.get_accounts()
+        self._vm = None
+        self._head = None
+
+    def _latest_vm(self):
+        # vm on the latest block's state, rebuilt only after a new block
+        # is mined, as building one costs more than most calls
+        chain = self.tester.backend.chain
+        head = chain.get_canonical_head()
+        if head.hash != self._head:
+            self._vm = chain.get_vm(at_header=head)
+            self._head = head.hash
+        return self._vm
+
+    def _tx(self, to: Optional[str], data: bytes,
+            tx: Optional[Dict]) -> Dict:
+        tx = dict(tx or {})
+        params = {
+            "from": str(address(tx.get("from", self.accounts[0]))),
+            "data": "0x" + data.hex(),
+            "gas": int(tx.get("gas", tx.get("gas_limit", GAS_LIMIT))),
+        }
+        if to is not None:
+            params["to"] = to
+        if "value" in tx:
+            params["value"] = int(tx["value"])
+        return params
+
+    def call(self, to: str, data: bytes, tx: Optional[Dict] = None) -> bytes:
+        """
+        Executes calldata against the latest state. Raises Revert if it
+        reverts, with the revert reason if there is one
+
+        Runs the code as a message straight on the vm, skipping the
+        transaction building and signature checks of eth-tester's call
+        """
+        tx = dict(tx or {})
+        vm = self._latest_vm()
+        state = vm.state
+        sender = to_canonical_address(
+            str(address(tx.get("from", self.accounts[0]))))
+        target = to_canonical_address(to)
+        snapshot = state.snapshot()
+        try:
+            computation = vm.execute_bytecode(
+                origin=sender, gas_price=0,
+                gas=int(tx.get("gas", tx.get("gas_limit", GAS_LIMIT))),
+                to=target, sender=sender, value=int(tx.get("value", 0)),
+                data=data, code=state.get_code(target))
+        finally:
+            state.revert(snapshot)
+        if computation.is_error:
+            raise Revert(_computation_reason(computation.error))
+        return computation.output
+
+    def transact(self, to: Optional[str], data: bytes,
+                 tx: Optional[Dict] = None) -> Dict:
+        """
+        Mines a transaction. Raises Revert without mining if it would
+        revert
+        """
+        params = self._tx(to, data, tx)
+        try:
+            if to is None:
+                self.tester.call(params, "latest")
+            else:
+                self.call(to, data, tx)
+        except TransactionFailed as e:
+            raise Revert(_reason(e)) from None
+        return self.tester.get_transaction_receipt(
+            self.tester.send_transaction(params))
+
+    def deploy(self, abi: Sequence[Dict], bytecode: str, *args,
+               tx: Optional[Dict] = None) -> Contract:
+        """
+        Deploys bytecode, hex with or without 0x prefix, with constructor
+        args
+        """
+        code = bytes.fromhex(bytecode[2:] if bytecode.startswith("0x")
+                             else bytecode)
+        constructor = next((i for i in abi if i.get("type") ==
+                            "constructor"), None)
+        if constructor is not None:
+            types = [abi_type(i) for i in constructor["inputs"]]
+            code += encode(types, [normalize(t, a)
+                                   for t, a in zip(types, args)])
+        receipt = self.tester.get_transaction_receipt(
+            self.tester.send_transaction(self._tx(None, code, tx)))
+        return Contract(self, receipt["contract_address"], abi)
+
+    def deploy_artifact(self, path: str, *args,
+                        tx: Optional[Dict] = None) -> Contract:
+        """
+        Deploys from a compiled artifact with abi and bytecode, such as
+        brownie's build/contracts/<Name>.json
+        """
+        with open(path) as f:
+            artifact = json.load(f)
+        return self.deploy(artifact["abi"], artifact["bytecode"], *args,
+                           tx=tx)
+
+    @property
+    def timestamp(self) -> int:
+        """
+        Timestamp of the latest block
+        """
+        return self.tester.get_block_by_number("latest")["timestamp"]
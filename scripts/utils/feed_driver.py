@@ -0,0 +1,79 @@
+"""
+Plays planned price paths (see price_path) against OverlayV1FeedMock.
+
+Automining is paused while each block's setPrice/setReserve calls are
+broadcast, then the block is mined with all of them at the step's
+timestamp. A long path costs one mined block per distinct timestamp
+rather than a mined block per call plus a chain.mine() in between.
+"""
+from brownie import chain, web3
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from scripts.utils.price_path import Block, plan
+
+
+def set_automine(on: bool):
+    """
+    Turns automining on the development node on or off. anvil and
+    hardhat use evm_setAutomine, ganache miner_start/miner_stop
+    """
+    response = web3.provider.make_request("evm_setAutomine", [on])
+    if "error" in response:
+        web3.provider.make_request("miner_start" if on else "miner_stop",
+                                   [])
+
+
+class FeedDriver:
+    """
+    Drives feed, an OverlayV1FeedMock, from account. Path times are
+    seconds after start, by default the second after the latest block
+    """
+
+    def __init__(self, feed, account, start: Optional[int] = None):
+        self.feed = feed
+        self.account = account
+        self.start = start if start is not None \
+            else chain[-1].timestamp + 1
+
+    def plan(self, steps) -> List[Block]:
+        """
+        Plans steps against the mock's current price and reserve
+        """
+        return plan(steps, self.feed.price(), self.feed.reserve())
+
+    def blocks(self, blocks: Sequence[Block]) -> Iterator[Tuple[Block,
+                                                                int]]:
+        """
+        Mines each planned block in turn, yielding it with its block
+        number so callers can interleave their own transactions between
+        blocks
+        """
+        for block in blocks:
+            set_automine(False)
+            try:
+                txs = [getattr(self.feed, method)(
+                    value, {"from": self.account, "required_confs": 0})
+                    for method, value in block.calls]
+                chain.mine(timestamp=self.start + block.time)
+            finally:
+                set_automine(True)
+
+            for tx in txs:
+                tx.wait(1)
+                if tx.status != 1:
+                    raise RuntimeError(f"{tx.fn_name} reverted in {tx.txid}")
+            yield block, chain.height
+
+    def play(self, steps,
+             on_block: Optional[Callable[[Block, int], None]] = None
+             ) -> List[int]:
+        """
+        Plans and plays steps, calling on_block(block, number) after each
+        mined block. Returns the mined block numbers
+        """
+        numbers = []
+        for block, number in self.blocks(self.plan(steps)):
+            numbers.append(number)
+            if on_block is not None:
+                on_block(block, number)
+        return numbers
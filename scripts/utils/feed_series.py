@@ -0,0 +1,257 @@
+"""
+Columnar history of a feed's Oracle.Data and vectorized analytics over
+it.
+
+Samples are stored as one column per Oracle.Data field, with prices and
+reserve in float64 units of price and OVL rather than 1e18 fixed point.
+The quantities the market derives from feed data are computed over
+whole columns at once with the same formulas as OverlayV1Market.
+Results agree with the exact integer mirror in scripts/reference to
+float precision. dataIsValid can differ only for samples within float
+precision of the drift bounds.
+
+Markets can change their risk params and dpUpperLimit over the history,
+so a market's values are sampled alongside the feed in a ParamSeries.
+The analytics take either one set of params for every sample or a set
+per sample, as ParamSeries.at returns.
+"""
+import numpy as np
+
+from typing import NamedTuple, Sequence, Tuple, Union
+
+from scripts.reference.oracle import Data
+from scripts.reference.risk import NUM_PARAMETERS, Parameters
+
+
+ONE = 1e18
+TO_MS = 1e3
+
+FIELDS = ("timestamp", "micro_window", "macro_window",
+          "price_over_micro_window", "price_over_macro_window",
+          "price_one_macro_window_ago", "reserve_over_micro_window",
+          "has_reserve")
+
+
+class FeedSeries(NamedTuple):
+    """
+    Oracle.Data samples of one feed as columns, sorted by timestamp
+    """
+    timestamp: np.ndarray
+    micro_window: np.ndarray
+    macro_window: np.ndarray
+    price_over_micro_window: np.ndarray
+    price_over_macro_window: np.ndarray
+    price_one_macro_window_ago: np.ndarray
+    reserve_over_micro_window: np.ndarray
+    has_reserve: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def save(self, path: str):
+        """
+        Saves the columns to an uncompressed .npz at path
+        """
+        np.savez(path, **self._asdict())
+
+
+def from_data(samples: Sequence[Data]) -> FeedSeries:
+    """
+    Builds a series from Oracle.Data samples. Duplicate timestamps keep
+    the last sample
+    """
+    columns = list(zip(*samples)) if len(samples) > 0 else [()] * 8
+    series = FeedSeries(
+        np.asarray(columns[0], dtype=np.int64),
+        np.asarray(columns[1], dtype=np.int64),
+        np.asarray(columns[2], dtype=np.int64),
+        *[np.asarray(c, dtype=float) / ONE for c in columns[3:7]],
+        np.asarray(columns[7], dtype=bool))
+    return concat([series])
+
+
+class ParamSeries(NamedTuple):
+    """
+    A market's risk params and dpUpperLimit sampled over time, sorted by
+    timestamp. Raw fixed point values as float64
+    """
+    timestamp: np.ndarray
+    params: np.ndarray  # (n, NUM_PARAMETERS)
+    dp_upper_limit: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def save(self, path: str):
+        """
+        Saves the columns to an uncompressed .npz at path
+        """
+        np.savez(path, **self._asdict())
+
+    def at(self, timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (params, dp_upper_limit) in effect at each of timestamps: from the
+        last sample at or before it, else the first sample
+        """
+        idx = np.searchsorted(self.timestamp, timestamps, side="right") - 1
+        idx = np.clip(idx, 0, None)
+        return self.params[idx], self.dp_upper_limit[idx]
+
+
+def params_from_reads(timestamps: Sequence[int],
+                      params: Sequence[Sequence[int]],
+                      dp_upper_limits: Sequence[int]) -> ParamSeries:
+    """
+    Builds a param series from the params and dpUpperLimit read at each
+    of timestamps. Duplicate timestamps keep the last sample
+    """
+    series = ParamSeries(
+        np.asarray(timestamps, dtype=np.int64),
+        np.asarray(params, dtype=float).reshape(-1, NUM_PARAMETERS),
+        np.asarray(dp_upper_limits, dtype=float))
+    return concat([series])
+
+
+Series = Union[FeedSeries, ParamSeries]
+# one set of params for every sample, or (n, NUM_PARAMETERS) per sample
+Params = Union[Sequence[int], np.ndarray]
+
+
+def concat(series: Sequence[Series]) -> Series:
+    """
+    Merges series of the same kind, sorted by timestamp. Duplicate
+    timestamps keep the sample from the last series given
+    """
+    merged = [np.concatenate([getattr(s, name) for s in series])
+              for name in series[0]._fields]
+    # reverse so np.unique's first occurrence is the last one given
+    _, idx = np.unique(merged[0][::-1], return_index=True)
+    idx = len(merged[0]) - 1 - idx
+    return type(series[0])(*[column[idx] for column in merged])
+
+
+def load(path: str) -> FeedSeries:
+    """
+    Loads a series saved with FeedSeries.save
+    """
+    with np.load(path) as f:
+        return FeedSeries(*[f[name] for name in FIELDS])
+
+
+def load_params(path: str) -> ParamSeries:
+    """
+    Loads a series saved with ParamSeries.save
+    """
+    with np.load(path) as f:
+        return ParamSeries(*[f[name] for name in ParamSeries._fields])
+
+
+def _param(params: Params, name: Parameters):
+    # one value for a single set of params, else one per sample
+    return np.asarray(params, dtype=float)[..., int(name)]
+
+
+def mid(s: FeedSeries) -> np.ndarray:
+    """
+    Mirrors OverlayV1Market._midFromFeed
+    """
+    return (s.price_over_micro_window + s.price_over_macro_window) / 2
+
+
+def bid_ask(s: FeedSeries,
+            params: Params) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (bid, ask) at zero volume, so with the static spread delta only.
+    Mirrors OverlayV1Market.bid and ask
+    """
+    delta = _param(params, Parameters.Delta) / ONE
+    bid = np.minimum(s.price_over_micro_window, s.price_over_macro_window)
+    ask = np.maximum(s.price_over_micro_window, s.price_over_macro_window)
+    return bid * np.exp(-delta), ask * np.exp(delta)
+
+
+def front_run_bound(s: FeedSeries, params: Params) -> np.ndarray:
+    """
+    Mirrors OverlayV1Market.frontRunBound
+    """
+    return _param(params, Parameters.Lmbda) / ONE \
+        * s.reserve_over_micro_window
+
+
+def back_run_bound(s: FeedSeries, params: Params) -> np.ndarray:
+    """
+    Mirrors OverlayV1Market.backRunBound
+    """
+    average_block_time = _param(params, Parameters.AverageBlockTime)
+    window = s.macro_window * TO_MS / average_block_time
+    delta = _param(params, Parameters.Delta) / ONE
+    return 2 * delta * s.reserve_over_micro_window * window
+
+
+def cap_notional_adjusted_for_bounds(s: FeedSeries,
+                                     params: Params) -> np.ndarray:
+    """
+    Mirrors OverlayV1Market.capNotionalAdjustedForBounds for the market's
+    capNotional
+    """
+    cap = _param(params, Parameters.CapNotional) / ONE
+    bounded = np.minimum(np.minimum(cap, front_run_bound(s, params)),
+                         back_run_bound(s, params))
+    return np.where(s.has_reserve, bounded, cap)
+
+
+def data_is_valid(s: FeedSeries,
+                  dp_upper_limit: Union[int, np.ndarray]) -> np.ndarray:
+    """
+    Mirrors OverlayV1Market.dataIsValid given the market's dpUpperLimit
+    """
+    upper = np.asarray(dp_upper_limit, dtype=float) / ONE
+    now = s.price_over_macro_window
+    ago = s.price_one_macro_window_ago
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dp = np.where((now > 0) & (ago > 0), now / ago, 0.)
+    return (dp > 0) & (dp >= 1 / upper) & (dp <= upper)
+
+
+class Capacity(NamedTuple):
+    """
+    Per sample arrays of what a market derives from its feed data.
+    Prices in feed units, notional in OVL
+    """
+    timestamp: np.ndarray
+    mid: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    front_run_bound: np.ndarray
+    back_run_bound: np.ndarray
+    cap_notional: np.ndarray  # adjusted for bounds
+    cap_oi: np.ndarray  # cap_notional / mid
+    is_valid: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+
+def capacity(s: FeedSeries, params: Params,
+             dp_upper_limit: Union[int, np.ndarray]) -> Capacity:
+    """
+    Computes what a market with params and dpUpperLimit derives from every
+    sample of its feed, in one pass over the columns. Either is one value
+    for all samples or one per sample
+    """
+    mid_ = mid(s)
+    bid, ask = bid_ask(s, params)
+    cap_notional = cap_notional_adjusted_for_bounds(s, params)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cap_oi = np.where(mid_ > 0, cap_notional / mid_, 0.)
+    return Capacity(
+        timestamp=s.timestamp,
+        mid=mid_,
+        bid=bid,
+        ask=ask,
+        front_run_bound=front_run_bound(s, params),
+        back_run_bound=back_run_bound(s, params),
+        cap_notional=cap_notional,
+        cap_oi=cap_oi,
+        is_valid=data_is_valid(s, dp_upper_limit)
+    )
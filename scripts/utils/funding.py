@@ -0,0 +1,114 @@
+"""
+Funding-aware prediction of when positions become liquidatable.
+
+Funding draws the oi imbalance down as e**(-2kt) while conserving the
+product of the long and short oi (OverlayV1Market.oiAfterFunding), so
+the overweight side's oi decays toward sqrt(oiLong * oiShort):
+
+    over(t) = (sqrt(imb0**2 * f**2 + 4 * inv) + imb0 * f) / 2
+
+with f = e**(-2kt) and inv = oiLong * oiShort. Inverting gives the time
+at which over(t) falls to x in closed form:
+
+    f = (x**2 - inv) / (x * imb0)
+
+A position's value is linear in its current oi at a fixed price, so
+each position has a critical side oi below which it is liquidatable.
+Solving for when the side reaches it gives the liquidation time for the
+whole book in one vectorized evaluation.
+"""
+import numpy as np
+
+from typing import Sequence
+
+from scripts.reference.market import MarketState
+from scripts.reference.risk import Parameters, get
+from scripts.utils.portfolio import columns
+
+
+ONE = 1e18
+
+
+def oi_after_funding(oi_overweight, oi_underweight, k: float, t):
+    """
+    Vectorized float (oi overweight, oi underweight) after funding for t
+    seconds at funding constant k (per second, not 18 decimals)
+    """
+    over = np.asarray(oi_overweight, dtype=float)
+    under = np.asarray(oi_underweight, dtype=float)
+    f = np.exp(-2 * k * np.asarray(t, dtype=float))
+    imbalance = (over - under) * f
+    total = np.sqrt(imbalance**2 + 4 * over * under)
+    over_now = (total + imbalance) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        under_now = np.where(over_now > 0, over * under / over_now, 0.)
+    return over_now, under_now
+
+
+def time_to_oi(oi_overweight: float, oi_underweight: float, k: float,
+               oi_target) -> np.ndarray:
+    """
+    Seconds until funding draws the overweight side's oi down to
+    oi_target. Zero if already at or below, inf if never reached
+    """
+    x = np.asarray(oi_target, dtype=float)
+    invariant = oi_overweight * oi_underweight
+    imbalance = oi_overweight - oi_underweight
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = (x**2 - invariant) / (x * imbalance)
+        t = -np.log(f) / (2 * k)
+    t = np.where(x >= oi_overweight, 0., t)
+    never = (x**2 <= invariant) | (k <= 0) | (imbalance <= 0)
+    return np.where(never & (x < oi_overweight), np.inf, t)
+
+
+def liquidation_times(state: MarketState, positions: np.ndarray,
+                      prices: Sequence[int]) -> np.ndarray:
+    """
+    Seconds after state.timestamp_update_last until each position becomes
+    liquidatable from funding alone, with the mid price held at each of
+    prices (18 decimals). state should be the state after funding at the
+    current timestamp. Returns an array of shape (len(prices),
+    len(positions)): 0 if liquidatable now, inf if never and nan if the
+    position is already closed or liquidated
+    """
+    params = state.params
+    k = get(params, Parameters.K) / ONE
+    cap_payoff = get(params, Parameters.CapPayoff) / ONE
+    mm_fraction = get(params, Parameters.MaintenanceMarginFraction) / ONE
+    liq_fee_rate = get(params, Parameters.LiquidationFeeRate) / ONE
+
+    c = columns(positions)
+    oi_total, shares_total = c.side_totals(state)
+    price = np.asarray(prices, dtype=float)[:, None] / ONE
+
+    # value = oi * a - debt where a is the funded notional per oi plus pnl
+    # per oi at price. liquidatable when value * (1 - lfr) < mm
+    with np.errstate(divide="ignore", invalid="ignore"):
+        funded_per_oi = np.where(c.oi_initial > 0,
+                                 c.notional / c.oi_initial, 0.)
+    pnl_per_oi = np.where(
+        c.is_long,
+        np.minimum(price, c.entry * (1 + cap_payoff)) - c.entry,
+        c.entry - price)
+    a = funded_per_oi + pnl_per_oi
+    threshold = c.notional * mm_fraction / (1 - liq_fee_rate) + c.debt
+
+    # critical aggregate oi on side below which position is liquidatable
+    with np.errstate(divide="ignore", invalid="ignore"):
+        critical = np.where(c.shares > 0,
+                            threshold / a * shares_total / c.shares, np.inf)
+    critical = np.where(a > 0, critical, np.inf)
+
+    over = max(state.oi_long, state.oi_short) / ONE
+    under = min(state.oi_long, state.oi_short) / ONE
+    is_over = np.where(c.is_long, state.oi_long > state.oi_short,
+                       state.oi_short > state.oi_long)
+
+    # overweight side decays toward sqrt(inv) so reaches critical in finite
+    # time only if above it. underweight side grows so is liquidatable now
+    # or never
+    target = np.where(is_over, critical, 0.)
+    times = time_to_oi(over, under, k, target)
+    times = np.where(critical > oi_total, 0., times)
+    return np.where(c.alive, times, np.nan)
@@ -0,0 +1,227 @@
+"""
+Inverse of the market's price impact for slippage-bounded sizing.
+
+Takers buying (building long, unwinding short) pay the ask and takers
+selling (building short, unwinding long) get the bid:
+
+    ask = max(priceMicro, priceMacro) * e**(delta + lmbda * volume)
+    bid = min(priceMicro, priceMacro) * e**(-delta - lmbda * volume)
+
+where volume is the side's Roller accumulated volume decayed to now plus
+oi / capOi. Given a price limit this solves for the volume in closed
+form, then steps to the exact integer boundary with the reference
+bid/ask so sizes returned here pass the contract's slippage check.
+"""
+import numpy as np
+
+from math import log
+from typing import Callable, NamedTuple, Optional, Sequence, Tuple
+
+from scripts.reference import position
+from scripts.reference.errors import Revert
+from scripts.reference.market import (
+    MAX_NATURAL_EXPONENT, MarketState, ask, bid,
+    cap_notional_adjusted_for_bounds, mid_from_feed, oi_from_notional,
+    register_volume
+)
+from scripts.reference.oracle import Data
+from scripts.reference.position import Info
+from scripts.reference.risk import Parameters, get
+from scripts.reference.roller import Snapshot, cumulative, transform
+
+
+ONE = 10**18
+UINT256_MAX = 2**256 - 1
+
+# relative slack on float closed-form estimates before they are verified
+# against the exact integer math
+TOLERANCE = 1e-6
+
+
+class Market(NamedTuple):
+    """
+    Everything build() and unwind() read, at the timestamp the trade
+    would be mined
+    """
+    state: MarketState
+    snapshots: Tuple[Snapshot, Snapshot, Snapshot]
+    data: Data
+    dp_upper_limit: int
+    timestamp: int
+
+
+def bisect_max(ok: Callable[[int], bool], lo: int, hi: int) -> int:
+    """
+    Largest x in [lo, hi] with ok(x), given ok(lo) and ok monotone
+    decreasing
+    """
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if ok(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def bracket_max(ok: Callable[[int], bool], lo: int, hi: int,
+                estimate: Optional[float]) -> Tuple[int, int]:
+    """
+    Narrows [lo, hi] around a float estimate of the largest x with ok(x).
+    Each narrowing is verified with ok so a wrong estimate only costs
+    the extra evaluations
+    """
+    if estimate is None:
+        return lo, hi
+    below = int(estimate * (1 - TOLERANCE))
+    above = int(estimate * (1 + TOLERANCE)) + 1
+    if lo < above < hi and not ok(above):
+        hi = above - 1
+    if lo < below < hi and ok(below):
+        lo = below
+    return lo, hi
+
+
+def _side(market: Market, is_ask: bool):
+    # (snapshot, base price, cap oi) for the side the taker trades on
+    data = market.data
+    params = market.state.params
+    snapshot = market.snapshots[1] if is_ask else market.snapshots[0]
+    base = max(data.price_over_micro_window, data.price_over_macro_window) \
+        if is_ask else min(data.price_over_micro_window,
+                           data.price_over_macro_window)
+    cap_oi = oi_from_notional(
+        cap_notional_adjusted_for_bounds(
+            params, data, get(params, Parameters.CapNotional)),
+        mid_from_feed(data))
+    return snapshot, base, cap_oi
+
+
+def price(market: Market, oi: int, is_ask: bool) -> int:
+    """
+    Exact ask (is_ask) or bid a taker of oi would get
+    """
+    snapshot, _, cap_oi = _side(market, is_ask)
+    snapshot = register_volume(snapshot, market.data, market.timestamp, oi,
+                               cap_oi)
+    fn = ask if is_ask else bid
+    return fn(market.state.params, market.data, cumulative(snapshot))
+
+
+def _within(price_: int, price_limit: int, is_ask: bool) -> bool:
+    return price_ <= price_limit if is_ask else price_ >= price_limit
+
+
+def max_oi(market: Market, price_limit: int, is_ask: bool) -> int:
+    """
+    Largest oi a taker can trade on the ask (is_ask) or bid with the
+    price within price_limit. Zero if even the smallest trade exceeds it
+    and UINT256_MAX if there is no impact. Ignores oi caps. See sizing
+    for the largest buildable size
+    """
+    params = market.state.params
+    snapshot, base, cap_oi = _side(market, is_ask)
+
+    def ok(oi: int) -> bool:
+        try:
+            return _within(price(market, oi, is_ask), price_limit, is_ask)
+        except Revert:
+            # pow over MAX_NATURAL_EXPONENT reverts
+            return False
+
+    if cap_oi == 0 or not ok(0):
+        return 0
+
+    # pow = ln(limit / base) for asks, -ln(limit / base) for bids
+    delta = get(params, Parameters.Delta) / 1e18
+    lmbda = get(params, Parameters.Lmbda) / 1e18
+    if is_ask:
+        max_pow = log(price_limit / base)
+    elif price_limit > 0:
+        max_pow = -log(price_limit / base)
+    else:
+        # any bid is within a zero limit. only bound is the max exponent
+        max_pow = MAX_NATURAL_EXPONENT / 1e18
+    decayed = cumulative(transform(snapshot, market.timestamp,
+                                   market.data.micro_window, 0)) / 1e18
+    if lmbda == 0:
+        # no impact so any size is within limit
+        return UINT256_MAX
+
+    estimate = ((max_pow - delta) / lmbda - decayed) * cap_oi
+    hi = int(max(estimate, 0.) * (1 + TOLERANCE)) + 1
+    while ok(hi):
+        hi *= 2
+    lo, hi = bracket_max(ok, 0, hi, estimate)
+    return bisect_max(ok, lo, hi)
+
+
+def max_build_oi(market: Market, is_long: bool, price_limit: int) -> int:
+    """
+    Largest oi a build on side can be with entry price within price_limit
+    """
+    return max_oi(market, price_limit, is_ask=is_long)
+
+
+def max_build_notional(market: Market, is_long: bool, price_limit: int) -> int:
+    """
+    Largest notional (collateral * leverage) a build on side can be with
+    entry price within price_limit
+    """
+    oi = max_build_oi(market, is_long, price_limit)
+    if oi == 0:
+        return 0
+    # largest notional with oiFromNotional(notional, mid) <= oi
+    mid_price = mid_from_feed(market.data)
+    return ((oi + 1) * mid_price - 1) // ONE
+
+
+def max_unwind_fraction(market: Market, pos: Info, price_limit: int) -> int:
+    """
+    Largest fraction of pos, in the 1bps steps unwind() keeps, that can
+    be unwound with exit price within price_limit. Zero if none
+    """
+    state = market.state.pay_funding(market.timestamp)
+    oi_total = state.oi_on_side(pos.is_long)
+    oi_total_shares = state.oi_shares_on_side(pos.is_long)
+    is_ask = not pos.is_long
+
+    def ok(bps: int) -> bool:
+        oi = position.oi_current(pos, bps * 10**14, oi_total,
+                                 oi_total_shares)
+        try:
+            return _within(price(market, oi, is_ask), price_limit, is_ask)
+        except Revert:
+            return False
+
+    return bisect_max(ok, 0, 10**4) * 10**14 if ok(1) else 0
+
+
+def impact_curve(market: Market, is_ask: bool,
+                 notionals: Sequence[float]) -> np.ndarray:
+    """
+    Prices a taker would get on the ask (is_ask) or bid for each notional
+    (18 decimals), as one vectorized float evaluation
+    """
+    params = market.state.params
+    snapshot, base, cap_oi = _side(market, is_ask)
+    delta = get(params, Parameters.Delta) / 1e18
+    lmbda = get(params, Parameters.Lmbda) / 1e18
+    decayed = cumulative(transform(snapshot, market.timestamp,
+                                   market.data.micro_window, 0)) / 1e18
+    mid = mid_from_feed(market.data) / 1e18
+
+    oi = np.asarray(notionals, dtype=float) / 1e18 / mid
+    volume = decayed + oi / (cap_oi / 1e18)
+    pow = delta + lmbda * volume
+    sign = 1. if is_ask else -1.
+    return base / 1e18 * np.exp(sign * pow)
+
+
+def slippage(market: Market, is_ask: bool,
+             notionals: Sequence[float]) -> np.ndarray:
+    """
+    Fractional slippage from mid for each notional: price / mid - 1
+    """
+    mid = mid_from_feed(market.data) / 1e18
+    return impact_curve(market, is_ask, notionals) / mid - 1
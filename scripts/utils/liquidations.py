@@ -0,0 +1,179 @@
+"""
+Keeper side scheduling of OverlayV1Market.liquidate() calls.
+
+Liquidators are paid value * liquidationFeeRate, which for small or deeply
+underwater positions is often less than the gas to liquidate. Candidates
+are scored by expected reward less estimated gas cost, both in native
+token wei, and kept in a priority queue with ties broken by how far the
+position is below its liquidation threshold.
+"""
+import heapq
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from statistics import median
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from scripts.reference import position
+from scripts.reference.fixed_point import mul_down, mul_up
+from scripts.reference.market import MarketState
+from scripts.reference.position import Info
+from scripts.reference.risk import Parameters, get
+
+
+ONE = 10**18
+
+# liquidate() gas used when no measurements are available yet
+DEFAULT_LIQUIDATE_GAS = 250000
+
+
+@dataclass
+class Liquidation:
+    """
+    Outcome of liquidating a position at the given mid price
+    """
+    liquidatable: bool
+    value: int  # position value at mid price
+    reward: int  # OVL paid to liquidator = value * liquidationFeeRate
+    shortfall: int  # maintenance margin + fee - value. > 0 if liquidatable
+
+
+def liquidation(pos: Info, state: MarketState, mid_price: int) -> Liquidation:
+    """
+    Computes whether pos is liquidatable and the reward for doing so,
+    given the market state after funding and the mid price from the feed.
+    Mirrors the checks and amounts in OverlayV1Market.liquidate
+    """
+    params = state.params
+    cap_payoff = get(params, Parameters.CapPayoff)
+    mm_fraction = get(params, Parameters.MaintenanceMarginFraction)
+    liq_fee_rate = get(params, Parameters.LiquidationFeeRate)
+    oi_total = state.oi_on_side(pos.is_long)
+    oi_total_shares = state.oi_shares_on_side(pos.is_long)
+
+    can = position.liquidatable(pos, oi_total, oi_total_shares, mid_price,
+                                cap_payoff, mm_fraction, liq_fee_rate)
+    val = position.value(pos, ONE, oi_total, oi_total_shares, mid_price,
+                         cap_payoff)
+    reward = mul_down(val, liq_fee_rate)
+    maintenance_margin = mul_up(position.notional_initial(pos, ONE),
+                                mm_fraction)
+    return Liquidation(can, val, reward if can else 0,
+                       maintenance_margin + reward - val)
+
+
+class GasCurve:
+    """
+    Measured liquidate() gas used as a function of seconds elapsed since
+    the market's last update. The first interaction in a block pays
+    funding and writes oi storage, so gas depends on elapsed time.
+    Estimates interpolate linearly between bucket medians
+    """
+
+    def __init__(self, buckets: Tuple[int, ...] = (0, 1, 60, 3600),
+                 default: int = DEFAULT_LIQUIDATE_GAS):
+        self.buckets = buckets
+        self.default = default
+        self._samples: Dict[int, List[int]] = {b: [] for b in buckets}
+
+    def _bucket(self, elapsed: int) -> int:
+        # largest bucket <= elapsed
+        idx = max(bisect_right(self.buckets, elapsed) - 1, 0)
+        return self.buckets[idx]
+
+    def add(self, elapsed: int, gas_used: int):
+        """
+        Records the gas used by a liquidate() sent elapsed seconds after
+        the market's last update
+        """
+        self._samples[self._bucket(elapsed)].append(gas_used)
+
+    def estimate(self, elapsed: int) -> int:
+        """
+        Estimated gas for a liquidate() elapsed seconds after the market's
+        last update
+        """
+        points = [(b, median(s)) for b, s in self._samples.items()
+                  if len(s) > 0]
+        if len(points) == 0:
+            return self.default
+        if elapsed <= points[0][0]:
+            return int(points[0][1])
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            if elapsed <= x1:
+                return int(y0 + (y1 - y0) * (elapsed - x0) / (x1 - x0))
+        return int(points[-1][1])
+
+
+@dataclass(order=True)
+class Candidate:
+    """
+    A liquidatable position. Ordered so the best candidate is smallest:
+    highest profit first, then largest shortfall
+    """
+    sort_key: Tuple[int, int] = field(init=False, repr=False)
+    profit: int  # expected reward less gas cost in native wei
+    shortfall: int
+    market: str = field(compare=False)
+    owner: str = field(compare=False)
+    position_id: int = field(compare=False)
+    reward: int = field(compare=False)
+    gas: int = field(compare=False)
+
+    def __post_init__(self):
+        self.sort_key = (-self.profit, -self.shortfall)
+
+
+class LiquidationQueue:
+    """
+    Priority queue of liquidation candidates scored by expected profit
+    given the current gas price and OVL price in native token
+    """
+
+    def __init__(self, gas_price: int, ovl_price: int,
+                 gas_curve: Optional[GasCurve] = None):
+        self.gas_price = gas_price  # wei per gas
+        self.ovl_price = ovl_price  # native wei per 1e18 OVL
+        self.gas_curve = gas_curve or GasCurve()
+        self._heap: List[Tuple[Candidate, int]] = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def score(self, reward: int, elapsed: int) -> Tuple[int, int]:
+        """
+        Returns (profit, gas) for a liquidation paying reward OVL sent
+        elapsed seconds after the market's last update
+        """
+        gas = self.gas_curve.estimate(elapsed)
+        return reward * self.ovl_price // ONE - gas * self.gas_price, gas
+
+    def push(self, market: str, owner: str, position_id: int,
+             liq: Liquidation, elapsed: int) -> Optional[Candidate]:
+        """
+        Queues a position if it is liquidatable. Returns the candidate
+        """
+        if not liq.liquidatable:
+            return None
+        profit, gas = self.score(liq.reward, elapsed)
+        candidate = Candidate(profit, liq.shortfall, market, owner,
+                              position_id, liq.reward, gas)
+        # count breaks remaining ties in insertion order
+        heapq.heappush(self._heap, (candidate, self._count))
+        self._count += 1
+        return candidate
+
+    def peek(self) -> Optional[Candidate]:
+        return self._heap[0][0] if len(self._heap) > 0 else None
+
+    def pop(self) -> Candidate:
+        return heapq.heappop(self._heap)[0]
+
+    def profitable(self, min_profit: int = 0) -> Iterator[Candidate]:
+        """
+        Pops candidates in priority order while their expected profit is
+        above min_profit
+        """
+        while len(self._heap) > 0 and self.peek().profit > min_profit:
+            yield self.pop()
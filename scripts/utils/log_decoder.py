@@ -0,0 +1,316 @@
+"""
+Columnar decoding of raw OverlayV1Market Build, Unwind and Liquidate
+logs, and the OVL Transfer logs they are joined with. The factory's
+ParamUpdated and the market's CacheRiskCalc, which change market views,
+are decoded the same way.
+
+Each event has only fixed-width fields, so the data of every log of one
+event is the same number of 32 byte words. Logs are grouped by topic0,
+their data concatenated into one buffer and every field decoded for all
+logs at once with NumPy, into a structured array per event. No Python
+object is created per field. Integer fields are stored as little-endian
+uint64 limbs as in position_book, so use `to_ints` for exact values and
+`to_floats` for vectorized analysis.
+
+Raw logs are web3 log dicts as returned by eth_getLogs, with address,
+topics, data, blockNumber, transactionHash and logIndex.
+"""
+import numpy as np
+
+from eth_utils import keccak, to_checksum_address
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+from scripts.utils.position_book import ADDRESS, UINT256, limbs, to_ints
+
+
+INT256 = limbs(256)
+HASH = np.dtype(("u1", (32,)))
+
+# (name, type, indexed) of each event's args. SEE: OverlayV1Market.sol
+EVENTS = {
+    "Build": (
+        ("sender", "address", True),
+        ("positionId", "uint256", False),
+        ("oi", "uint256", False),
+        ("debt", "uint256", False),
+        ("isLong", "bool", False),
+        ("price", "uint256", False),
+        ("oiAfterBuild", "uint256", False),
+        ("oiSharesAfterBuild", "uint256", False),
+    ),
+    "Unwind": (
+        ("sender", "address", True),
+        ("positionId", "uint256", False),
+        ("fraction", "uint256", False),
+        ("mint", "int256", False),
+        ("price", "uint256", False),
+        ("oiAfterUnwind", "uint256", False),
+        ("oiSharesAfterUnwind", "uint256", False),
+    ),
+    "Liquidate": (
+        ("sender", "address", True),
+        ("owner", "address", True),
+        ("positionId", "uint256", False),
+        ("mint", "int256", False),
+        ("price", "uint256", False),
+        ("oiAfterLiquidate", "uint256", False),
+        ("oiSharesAfterLiquidate", "uint256", False),
+    ),
+    "CacheRiskCalc": (
+        ("newDpUpperLimit", "uint256", False),
+    ),
+    # OVL token. SEE: OverlayV1Token.sol
+    "Transfer": (
+        ("from", "address", True),
+        ("to", "address", True),
+        ("value", "uint256", False),
+    ),
+    # factory. SEE: OverlayV1Factory.sol, name is a Risk.Parameters enum
+    "ParamUpdated": (
+        ("user", "address", True),
+        ("market", "address", True),
+        ("name", "uint8", False),
+        ("value", "uint256", False),
+    ),
+}
+
+_FIELD_DTYPES = {"address": ADDRESS, "uint256": UINT256, "int256": INT256,
+                 "bool": np.dtype("?"), "uint8": np.dtype("u1")}
+
+
+def signature(name: str) -> str:
+    """
+    Canonical signature of event name, hashed for its topic0
+    """
+    return f"{name}({','.join(t for _, t, _ in EVENTS[name])})"
+
+
+def dtype(name: str) -> np.dtype:
+    """
+    Structured dtype of decoded logs of event name: the emitting contract,
+    block number, transaction hash and log index followed by the event's
+    args
+    """
+    return np.dtype([
+        ("address", ADDRESS),
+        ("block_number", "<u8"),
+        ("transaction_hash", HASH),
+        ("log_index", "<u4"),
+    ] + [(arg, _FIELD_DTYPES[t]) for arg, t, _ in EVENTS[name]])
+
+
+TOPICS = {keccak(text=signature(name)): name for name in EVENTS}
+DTYPES = {name: dtype(name) for name in EVENTS}
+# (topic count, data length) of each event's logs. Other events with the
+# same topic0, such as an ERC-721 Transfer, have a different layout
+SHAPES = {name: (1 + sum(1 for _, _, i in args if i),
+                 32 * sum(1 for _, _, i in args if not i))
+          for name, args in EVENTS.items()}
+
+
+def topic(name: str) -> str:
+    """
+    topic0 of event name as a hex string, for eth_getLogs filters
+    """
+    return "0x" + keccak(text=signature(name)).hex()
+
+
+def address_topic(address: str) -> str:
+    """
+    An indexed address arg as a hex string topic, for eth_getLogs filters
+    """
+    return "0x" + bytes(12).hex() + _bytes(address).hex()
+
+
+def _bytes(value) -> bytes:
+    # HexBytes and bytes pass through, hex strings are decoded
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value[:2] == "0x" else value)
+    return bytes(value)
+
+
+def _words(buffer: bytes, n: int, words: int) -> np.ndarray:
+    # (n, words, 32) uint8 view of n concatenated logs' data
+    return np.frombuffer(buffer, dtype="u1").reshape(n, words, 32)
+
+
+def _limbs(words: np.ndarray) -> np.ndarray:
+    # (n, 32) big-endian words to (n, 4) little-endian uint64 limbs
+    return words.copy().view(">u8")[:, ::-1].astype("<u8")
+
+
+class _Batch:
+    """
+    Raw parts of the logs of one event, gathered with one pass over the
+    logs
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.data: List[bytes] = []
+        self.topics: List[bytes] = []
+        self.addresses: List[bytes] = []
+        self.hashes: List[bytes] = []
+        self.blocks: List[int] = []
+        self.indices: List[int] = []
+
+    def decode(self) -> np.ndarray:
+        args = EVENTS[self.name]
+        n = len(self.blocks)
+        out = np.zeros(n, dtype=DTYPES[self.name])
+        if n == 0:
+            return out
+
+        out["address"] = np.frombuffer(b"".join(self.addresses),
+                                       dtype="u1").reshape(n, 20)
+        out["block_number"] = self.blocks
+        out["transaction_hash"] = np.frombuffer(b"".join(self.hashes),
+                                                dtype="u1").reshape(n, 32)
+        out["log_index"] = self.indices
+
+        indexed = sum(1 for _, _, i in args if i)
+        topics = _words(b"".join(self.topics), n, indexed) \
+            if indexed > 0 else None
+        data = _words(b"".join(self.data), n, len(args) - indexed)
+        i_topic, i_word = 0, 0
+        for arg, t, is_indexed in args:
+            if is_indexed:
+                word = topics[:, i_topic]
+                i_topic += 1
+            else:
+                word = data[:, i_word]
+                i_word += 1
+            if t == "address":
+                out[arg] = word[:, 12:]
+            elif t == "bool":
+                out[arg] = word[:, 31] != 0
+            elif t == "uint8":
+                out[arg] = word[:, 31]
+            else:
+                out[arg] = _limbs(word)
+        return out
+
+
+def decode(logs: Sequence) -> Dict[str, np.ndarray]:
+    """
+    Decodes raw logs into a structured array per event name, in the
+    order given. Logs of other events, or with the topic0 of an event
+    but not its number of topics and data length, are skipped
+    """
+    batches = {name: _Batch(name) for name in EVENTS}
+    addresses: Dict[str, bytes] = {}
+    for log in logs:
+        topics = log["topics"]
+        name = TOPICS.get(_bytes(topics[0])) if len(topics) > 0 else None
+        if name is None:
+            continue
+        data = _bytes(log["data"])
+        if (len(topics), len(data)) != SHAPES[name]:
+            continue
+        batch = batches[name]
+        batch.data.append(data)
+        for topic in topics[1:]:
+            batch.topics.append(_bytes(topic))
+
+        address = log["address"]
+        raw = addresses.get(address)
+        if raw is None:
+            raw = addresses[address] = _bytes(address)
+        batch.addresses.append(raw)
+        batch.hashes.append(_bytes(log["transactionHash"]))
+        batch.blocks.append(log["blockNumber"])
+        batch.indices.append(log["logIndex"])
+    return {name: batch.decode() for name, batch in batches.items()}
+
+
+def owners(name: str, decoded: np.ndarray) -> np.ndarray:
+    """
+    Owner of the position each decoded log is about, as (n, 20) bytes:
+    the sender for Build and Unwind, the owner for Liquidate
+    """
+    return decoded["owner" if name == "Liquidate" else "sender"]
+
+
+def encode(name: str, address: str, values: Sequence, block_number: int = 0,
+           log_index: int = 0, transaction_hash: bytes = bytes(32)) -> Dict:
+    """
+    Raw log of event name emitted by address with args values, as eth_getLogs
+    returns it. For tests and benchmarks
+    """
+    topics: List[bytes] = [keccak(text=signature(name))]
+    data: List[bytes] = []
+    for (_, t, indexed), value in zip(EVENTS[name], values):
+        if t == "address":
+            word = bytes(12) + _bytes(value)
+        elif t == "int256":
+            word = (value % 2**256).to_bytes(32, "big")
+        else:
+            word = int(value).to_bytes(32, "big")
+        (topics if indexed else data).append(word)
+    return {"address": address, "topics": topics, "data": b"".join(data),
+            "blockNumber": block_number, "transactionHash": transaction_hash,
+            "logIndex": log_index}
+
+
+def address_strings(addresses: np.ndarray) -> Tuple[str, ...]:
+    """
+    0x prefixed lowercase hex strings of (n, 20) address bytes
+    """
+    return tuple("0x" + a.tobytes().hex() for a in addresses)
+
+
+def checksummed(addresses: np.ndarray) -> List[str]:
+    """
+    Checksummed address strings of (n, 20) address bytes, as brownie and
+    web3 return them
+    """
+    cache: Dict[bytes, str] = {}
+    out = []
+    for a in addresses:
+        raw = a.tobytes()
+        if raw not in cache:
+            cache[raw] = to_checksum_address(raw)
+        out.append(cache[raw])
+    return out
+
+
+class Log(NamedTuple):
+    """
+    One decoded log with web3 event attributes, for joins that walk logs
+    one at a time. Addresses are checksummed, integers exact
+    """
+    address: str
+    event: str
+    args: Dict[str, Any]
+    blockNumber: int
+    transactionHash: str
+    logIndex: int
+
+
+def _column(t: str, values: np.ndarray) -> List:
+    if t == "address":
+        return checksummed(values)
+    elif t in ("bool", "uint8"):
+        return values.tolist()
+    return to_ints(values, signed=(t == "int256"))
+
+
+def to_logs(decoded: Dict[str, np.ndarray]) -> List[Log]:
+    """
+    Rows of decoded logs of every event as Log, in (block, log index)
+    order
+    """
+    logs = []
+    for name, arr in decoded.items():
+        args = EVENTS[name]
+        columns = [_column(t, arr[arg]) for arg, t, _ in args]
+        addresses = _column("address", arr["address"])
+        hashes = ["0x" + h.tobytes().hex() for h in arr["transaction_hash"]]
+        for i, (block, index) in enumerate(zip(
+                arr["block_number"].tolist(), arr["log_index"].tolist())):
+            logs.append(Log(addresses[i], name,
+                            {arg: c[i] for (arg, _, _), c
+                             in zip(args, columns)},
+                            block, hashes[i], index))
+    logs.sort(key=lambda log: (log.blockNumber, log.logIndex))
+    return logs
@@ -0,0 +1,213 @@
+import csv
+import re
+import yaml
+
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from scripts.reference.factory import risk_param_errors
+from scripts.reference.validation import deploy_market_errors
+from scripts.reference.risk import Parameters
+
+
+ADDRESS_PATTERN = re.compile(r"^0x[0-9a-fA-F]{40}$")
+ZERO_ADDRESS = "0x" + "00" * 20
+
+
+@dataclass
+class MarketSpec:
+    """
+    Arguments for a single OverlayV1Factory.deployMarket call
+    """
+    name: str
+    feed_factory: str
+    feed: str
+    params: List[int]
+
+    def as_args(self) -> tuple:
+        """
+        Returns (feedFactory, feed, params) in deployMarket argument order
+        """
+        return (self.feed_factory, self.feed, self.params)
+
+    def params_dict(self) -> Dict[str, int]:
+        """
+        Returns risk params keyed by lower camel case name
+        """
+        return {name.key: self.params[int(name)] for name in Parameters}
+
+
+@dataclass
+class FeedState:
+    """
+    On-chain state read by OverlayV1Factory._checkFeed for a spec
+    """
+    market: str
+    feed_factory_supported: bool
+    feed_exists: bool
+
+    def errors(self) -> List[str]:
+        """
+        Returns the deployMarket revert reasons this state would trigger
+        """
+        errors = []
+        if self.market.lower() != ZERO_ADDRESS:
+            errors.append("OVLV1: market already exists")
+        if not self.feed_factory_supported:
+            errors.append("OVLV1: feed factory not supported")
+        if not self.feed_exists:
+            errors.append("OVLV1: feed does not exist")
+        return errors
+
+
+def parse_uint(value: Any) -> int:
+    """
+    Parses an integer risk param value. Accepts ints and numeric strings
+    in scientific notation (e.g. "0.01e18") as long as they are integral
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"invalid uint256: {value!r}")
+    if isinstance(value, int):
+        parsed = value
+    else:
+        try:
+            d = Decimal(str(value).strip().replace("_", ""))
+        except InvalidOperation:
+            raise ValueError(f"invalid uint256: {value!r}")
+        if not d.is_finite() or d != d.to_integral_value():
+            raise ValueError(f"invalid uint256: {value!r}")
+        parsed = int(d)
+
+    if parsed < 0 or parsed >= 2**256:
+        raise ValueError(f"invalid uint256: {value!r}")
+    return parsed
+
+
+def _spec_from_entry(entry: Mapping[str, Any],
+                     defaults: Mapping[str, Any], idx: int) -> MarketSpec:
+    merged = dict(defaults)
+    merged.update(entry.get("params") or {})
+
+    unknown = set(merged) - {name.key for name in Parameters}
+    if unknown:
+        raise ValueError(
+            f"market {idx}: unknown risk params {sorted(unknown)}")
+
+    missing = [name.key for name in Parameters if name.key not in merged]
+    if missing:
+        raise ValueError(f"market {idx}: missing risk params {missing}")
+
+    return MarketSpec(
+        name=str(entry.get("name") or f"market-{idx}"),
+        feed_factory=str(entry.get("feedFactory", "")),
+        feed=str(entry.get("feed", "")),
+        params=[parse_uint(merged[name.key]) for name in Parameters]
+    )
+
+
+def load_yaml(path: Path) -> List[MarketSpec]:
+    """
+    Loads market specs from a yaml file of the form
+
+        defaults:           # optional, shared by every market
+          k: 1220000000000
+          ...
+        markets:
+          - name: ETH/USD
+            feedFactory: "0x..."
+            feed: "0x..."
+            params:         # overrides defaults
+              capNotional: 800000e18
+    """
+    with open(path) as f:
+        doc = yaml.safe_load(f) or {}
+
+    defaults = doc.get("defaults") or {}
+    return [_spec_from_entry(entry, defaults, idx)
+            for idx, entry in enumerate(doc.get("markets") or [])]
+
+
+def load_csv(path: Path) -> List[MarketSpec]:
+    """
+    Loads market specs from a csv file with header
+
+        name,feedFactory,feed,k,lmbda,delta,...,averageBlockTime
+
+    with one market per row
+    """
+    specs = []
+    with open(path, newline="") as f:
+        for idx, row in enumerate(csv.DictReader(f)):
+            row = {k.strip(): v for k, v in row.items() if k is not None}
+            entry = {
+                "name": row.pop("name", None),
+                "feedFactory": row.pop("feedFactory", ""),
+                "feed": row.pop("feed", ""),
+                "params": {k: v for k, v in row.items() if v != ""}
+            }
+            specs.append(_spec_from_entry(entry, {}, idx))
+    return specs
+
+
+def load_specs(path: str) -> List[MarketSpec]:
+    """
+    Loads market specs from a yaml or csv file based on its extension
+    """
+    p = Path(path)
+    if p.suffix.lower() in (".yaml", ".yml"):
+        return load_yaml(p)
+    elif p.suffix.lower() == ".csv":
+        return load_csv(p)
+    raise ValueError(f"unsupported config format: {p.suffix}")
+
+
+def validate_specs(specs: List[MarketSpec],
+                   macro_windows: Optional[Mapping[str, int]] = None,
+                   feed_states: Optional[Mapping[str, FeedState]] = None
+                   ) -> List[str]:
+    """
+    Validates market specs offline. Returns a list of human readable
+    errors for anything that would make deployMarket revert on the
+    factory bounds, on malformed addresses, or on a feed appearing
+    twice in the batch.
+
+    If macro_windows maps (lower case) feed addresses to their macro
+    window, the market initialize checks are run as well. If feed_states
+    maps (lower case) feed addresses to their FeedState, the factory feed
+    checks are run too
+    """
+    errors = []
+    seen = {}
+    for spec in specs:
+        for field in ("feed_factory", "feed"):
+            if not ADDRESS_PATTERN.match(getattr(spec, field)):
+                errors.append(f"{spec.name}: invalid {field} address "
+                              f"{getattr(spec, field)!r}")
+
+        feed = spec.feed.lower()
+        if feed in seen:
+            errors.append(f"{spec.name}: feed {spec.feed} already used by "
+                          f"{seen[feed]}")
+        else:
+            seen[feed] = spec.name
+
+        if feed_states is not None and feed in feed_states:
+            for reason in feed_states[feed].errors():
+                errors.append(f"{spec.name}: {reason}")
+
+        if macro_windows is not None and feed in macro_windows:
+            param_errors = deploy_market_errors(spec.params,
+                                                macro_windows[feed])
+        else:
+            param_errors = risk_param_errors(spec.params)
+
+        for name, reason in param_errors:
+            if name is None:
+                errors.append(f"{spec.name}: {reason}")
+                continue
+            value = spec.params[int(name)]
+            errors.append(f"{spec.name}: {name.key}={value} {reason}")
+
+    return errors
@@ -0,0 +1,183 @@
+"""
+Vectorized valuation of positions across markets.
+
+Positions are valued with NumPy over POSITION_DTYPE arrays (see
+position_book) using the same formulas as Position.sol, in float64 and
+in units of OVL and price rather than 1e18 fixed point. Results agree
+with the exact integer mirror in scripts/reference to float precision
+and are meant for display and risk analysis, not for on chain amounts.
+"""
+import numpy as np
+
+from typing import NamedTuple, Sequence, Tuple
+
+from scripts.reference.market import MarketState
+from scripts.reference.risk import Parameters, get
+from scripts.utils.position_book import to_floats
+
+
+ONE = 1e18
+PRICE_BASE = 1.0001
+
+
+class Columns(NamedTuple):
+    """
+    Float columns of a POSITION_DTYPE array shared by the vectorized
+    calculations. Amounts in OVL for the remaining fraction of position
+    """
+    is_long: np.ndarray
+    alive: np.ndarray  # not liquidated and fraction remaining > 0
+    notional: np.ndarray
+    debt: np.ndarray
+    entry: np.ndarray  # entry price
+    oi_initial: np.ndarray  # notional / mid price at build
+    shares: np.ndarray
+
+    def side_totals(self, state: MarketState) -> Tuple[np.ndarray,
+                                                       np.ndarray]:
+        """
+        Aggregate (oi, oi shares) on each position's side
+        """
+        return (np.where(self.is_long, state.oi_long, state.oi_short) / ONE,
+                np.where(self.is_long, state.oi_long_shares,
+                         state.oi_short_shares) / ONE)
+
+    def oi(self, state: MarketState) -> np.ndarray:
+        """
+        Current oi of each position given market state
+        """
+        oi_total, shares_total = self.side_totals(state)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(shares_total > 0,
+                            self.shares * oi_total / shares_total, 0.)
+
+
+def columns(positions: np.ndarray) -> Columns:
+    """
+    Extracts float columns from a structured array with POSITION_DTYPE
+    """
+    fraction = positions["fraction_remaining"] / 1e4
+    notional = to_floats(positions["notional_initial"]) * fraction / ONE
+    mid_entry = np.power(PRICE_BASE, positions["mid_tick"].astype(float))
+    return Columns(
+        is_long=positions["is_long"].astype(bool),
+        alive=(positions["fraction_remaining"] > 0)
+        & ~positions["liquidated"].astype(bool),
+        notional=notional,
+        debt=to_floats(positions["debt_initial"]) * fraction / ONE,
+        entry=np.power(PRICE_BASE, positions["entry_tick"].astype(float)),
+        oi_initial=notional / mid_entry,
+        shares=to_floats(positions["oi_shares"]) / ONE
+    )
+
+
+class Valuation(NamedTuple):
+    """
+    Per position arrays for one market. Amounts in OVL, prices in feed
+    units. liquidation_price is nan when the position has no open
+    interest left
+    """
+    market: str
+    position_id: np.ndarray
+    is_long: np.ndarray
+    collateral: np.ndarray  # remaining cost = notional - debt
+    notional: np.ndarray  # remaining initial notional
+    value: np.ndarray
+    pnl: np.ndarray  # value - collateral
+    funding: np.ndarray  # notional gained (+) or paid (-) from funding
+    liquidation_price: np.ndarray
+    health: np.ndarray  # value * (1 - liq fee rate) / maintenance margin
+
+    def __len__(self) -> int:
+        return len(self.position_id)
+
+
+def valuation(market: str, state: MarketState, mid_price: int,
+              positions: np.ndarray) -> Valuation:
+    """
+    Values positions, a structured array with POSITION_DTYPE, given the
+    market state after funding and the mid price from the feed
+    """
+    cap_payoff = get(state.params, Parameters.CapPayoff) / ONE
+    mm_fraction = get(state.params,
+                      Parameters.MaintenanceMarginFraction) / ONE
+    liq_fee_rate = get(state.params, Parameters.LiquidationFeeRate) / ONE
+    price = mid_price / ONE
+
+    c = columns(positions)
+    is_long, alive, notional, debt, entry = \
+        c.is_long, c.alive, c.notional, c.debt, c.entry
+
+    # current oi from shares of aggregate oi on side after funding
+    oi = c.oi(state)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        funded = np.where(c.oi_initial > 0, notional * oi / c.oi_initial, 0.)
+
+    # value mirrors Position.value. long payoff capped at capPayoff
+    long_pnl = np.minimum(oi * price, oi * entry * (1 + cap_payoff)) \
+        - oi * entry
+    short_pnl = oi * (entry - price)
+    value = np.maximum(
+        funded - debt + np.where(is_long, long_pnl, short_pnl), 0.)
+    value = np.where(alive, value, 0.)
+    collateral = np.where(alive, notional - debt, 0.)
+
+    # liquidatable when value * (1 - liq fee rate) < maintenance margin
+    margin = notional * mm_fraction
+    threshold = margin / (1 - liq_fee_rate)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        move = (threshold - funded + debt) / oi
+        liquidation_price = np.where(is_long, entry + move, entry - move)
+        liquidation_price = np.where(alive & (oi > 0),
+                                     np.maximum(liquidation_price, 0.),
+                                     np.nan)
+        health = np.where(alive & (margin > 0),
+                          value * (1 - liq_fee_rate) / margin, np.nan)
+
+    return Valuation(
+        market=market,
+        position_id=np.asarray(positions["position_id"]),
+        is_long=is_long,
+        collateral=collateral,
+        notional=np.where(alive, notional, 0.),
+        value=value,
+        pnl=value - collateral,
+        funding=np.where(alive, funded - notional, 0.),
+        liquidation_price=liquidation_price,
+        health=health
+    )
+
+
+class Totals(NamedTuple):
+    """
+    Portfolio totals across markets in OVL
+    """
+    positions: int
+    collateral: float
+    value: float
+    pnl: float
+    funding: float
+    min_health: float
+
+
+def totals(valuations: Sequence[Valuation]) -> Totals:
+    """
+    Aggregates per market valuations into portfolio totals
+    """
+    valuations = [v for v in valuations if len(v) > 0]
+    if len(valuations) == 0:
+        return Totals(0, 0., 0., 0., 0., np.nan)
+
+    def total(name: str) -> float:
+        return float(sum(getattr(v, name).sum() for v in valuations))
+
+    healths = np.concatenate([v.health for v in valuations])
+    return Totals(
+        positions=int(sum((v.notional > 0).sum() for v in valuations)),
+        collateral=total("collateral"),
+        value=total("value"),
+        pnl=total("pnl"),
+        funding=total("funding"),
+        min_health=float(np.nanmin(healths))
+        if np.isfinite(healths).any() else np.nan
+    )
@@ -0,0 +1,286 @@
+"""
+Binary snapshot of a market's full position book.
+
+A book file is one header record followed by one record per position,
+both NumPy structured arrays with fixed little-endian layouts, so a file
+can be memory-mapped read only by any number of worker processes and
+share the same pages with zero copies.
+
+Solidity integers wider than 64 bits (uint96 notional/debt, uint240 oi
+shares, uint256 oi aggregates and params, int192 accumulators) are
+stored exactly as little-endian arrays of uint64 limbs. Signed values
+are stored as two's complement over the limbs. Use `to_ints` to recover
+exact python ints and `to_floats` for vectorized float64 analysis.
+"""
+import numpy as np
+
+from typing import List, NamedTuple, Sequence, Tuple
+
+from scripts.reference.market import MarketState
+from scripts.reference.position import Info
+from scripts.reference.risk import NUM_PARAMETERS
+from scripts.reference.roller import Snapshot
+
+
+MAGIC = b"OVLVBOOK"
+VERSION = 1
+
+
+def limbs(bits: int) -> np.dtype:
+    """
+    Returns the dtype of an integer of the given bit width stored as
+    little-endian uint64 limbs
+    """
+    return np.dtype(("<u8", (-(-bits // 64),)))
+
+
+UINT96 = limbs(96)
+UINT240 = limbs(240)
+UINT256 = limbs(256)
+INT192 = limbs(192)
+
+# raw bytes rather than "S20", which would strip trailing zero bytes
+ADDRESS = np.dtype(("u1", (20,)))
+
+SNAPSHOT_DTYPE = np.dtype([
+    ("timestamp", "<u4"),
+    ("window", "<u4"),
+    ("accumulator", INT192),
+])
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("market", ADDRESS),
+    ("block_number", "<u8"),
+    ("timestamp", "<u8"),  # block timestamp
+    ("count", "<u8"),  # number of position records following header
+    ("params", UINT256, (NUM_PARAMETERS,)),
+    ("oi_long", UINT256),
+    ("oi_short", UINT256),
+    ("oi_long_shares", UINT256),
+    ("oi_short_shares", UINT256),
+    ("timestamp_update_last", "<u8"),
+    ("snapshot_volume_bid", SNAPSHOT_DTYPE),
+    ("snapshot_volume_ask", SNAPSHOT_DTYPE),
+    ("snapshot_minted", SNAPSHOT_DTYPE),
+])
+
+# mirrors Position.Info, keyed by (owner, position_id)
+POSITION_DTYPE = np.dtype([
+    ("owner", ADDRESS),
+    ("position_id", "<u8"),
+    ("notional_initial", UINT96),
+    ("debt_initial", UINT96),
+    ("mid_tick", "<i4"),
+    ("entry_tick", "<i4"),
+    ("is_long", "?"),
+    ("liquidated", "?"),
+    ("oi_shares", UINT240),
+    ("fraction_remaining", "<u2"),
+])
+
+
+def to_limbs(values: Sequence[int], n: int) -> np.ndarray:
+    """
+    Splits ints into an (len(values), n) array of uint64 limbs. Negative
+    values are stored as two's complement mod 2**(64*n)
+    """
+    mod = 2**(64 * n)
+    out = np.zeros((len(values), n), dtype="<u8")
+    for i, value in enumerate(values):
+        value = int(value)
+        if value >= mod or value < -mod // 2:
+            raise ValueError(f"{value} does not fit in {64 * n} bits")
+        value %= mod
+        for j in range(n):
+            out[i, j] = (value >> (64 * j)) & (2**64 - 1)
+    return out
+
+
+def to_ints(arr: np.ndarray, signed: bool = False) -> List[int]:
+    """
+    Recombines an array of uint64 limbs (last axis) into exact ints
+    """
+    arr = np.asarray(arr)
+    n = arr.shape[-1]
+    flat = arr.reshape(-1, n)
+    out = []
+    for row in flat:
+        value = 0
+        for j in range(n - 1, -1, -1):
+            value = (value << 64) | int(row[j])
+        if signed and value >= 2**(64 * n - 1):
+            value -= 2**(64 * n)
+        out.append(value)
+    return out
+
+
+def to_floats(arr: np.ndarray, signed: bool = False) -> np.ndarray:
+    """
+    Vectorized float64 approximation of an array of uint64 limbs (last
+    axis). Relative error is at most float64 epsilon
+    """
+    arr = np.asarray(arr)
+    n = arr.shape[-1]
+    weights = np.float64(2.0) ** (64 * np.arange(n))
+    out = (arr.astype(np.float64) * weights).sum(axis=-1)
+    if signed:
+        # -x = ~x + 1 in two's complement. avoids cancellation from
+        # subtracting 2**(64*n) for small negative values
+        neg = -((~arr).astype(np.float64) * weights).sum(axis=-1) - 1
+        out = np.where(arr[..., -1] >= 2**63, neg, out)
+    return out
+
+
+def _snapshot_record(snap: Snapshot) -> Tuple:
+    return (snap.timestamp, snap.window,
+            to_limbs([snap.accumulator], INT192.shape[0])[0])
+
+
+def _snapshot(record) -> Snapshot:
+    return Snapshot(int(record["timestamp"]), int(record["window"]),
+                    to_ints(record["accumulator"], signed=True)[0])
+
+
+def _uint256(value: int) -> np.ndarray:
+    return to_limbs([value], UINT256.shape[0])[0]
+
+
+def to_array(positions: Sequence[Tuple[str, int, Info]]) -> np.ndarray:
+    """
+    Converts (owner, positionId, Position.Info) tuples to a structured
+    array with POSITION_DTYPE
+    """
+    book = np.zeros(len(positions), dtype=POSITION_DTYPE)
+    if len(positions) > 0:
+        owners, ids, infos = zip(*positions)
+        book["owner"] = [np.frombuffer(bytes.fromhex(owner[2:]), "u1")
+                         for owner in owners]
+        book["position_id"] = ids
+        book["notional_initial"] = to_limbs(
+            [p.notional_initial for p in infos], UINT96.shape[0])
+        book["debt_initial"] = to_limbs(
+            [p.debt_initial for p in infos], UINT96.shape[0])
+        book["mid_tick"] = [p.mid_tick for p in infos]
+        book["entry_tick"] = [p.entry_tick for p in infos]
+        book["is_long"] = [p.is_long for p in infos]
+        book["liquidated"] = [p.liquidated for p in infos]
+        book["oi_shares"] = to_limbs(
+            [p.oi_shares for p in infos], UINT240.shape[0])
+        book["fraction_remaining"] = [p.fraction_remaining for p in infos]
+    return book
+
+
+def write(path: str, market: str, block_number: int, timestamp: int,
+          state: MarketState, snapshots: Tuple[Snapshot, Snapshot, Snapshot],
+          positions: Sequence[Tuple[str, int, Info]]):
+    """
+    Writes the position book of market at block_number to path.
+    snapshots are (snapshotVolumeBid, snapshotVolumeAsk, snapshotMinted)
+    and positions are (owner, positionId, Position.Info) tuples
+    """
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    fill_header(header, market, block_number, timestamp, state, snapshots,
+                len(positions))
+    book = to_array(positions)
+
+    with open(path, "wb") as f:
+        f.write(header.tobytes())
+        f.write(book.tobytes())
+
+
+def fill_header(header: np.ndarray, market: str, block_number: int,
+                timestamp: int, state: MarketState,
+                snapshots: Tuple[Snapshot, Snapshot, Snapshot], count: int):
+    """
+    Fills the HEADER_DTYPE fields other than magic and version of header,
+    a record array whose dtype has at least those fields
+    """
+    header["market"] = np.frombuffer(bytes.fromhex(market[2:]), "u1")
+    header["block_number"] = block_number
+    header["timestamp"] = timestamp
+    header["count"] = count
+    header["params"] = to_limbs(state.params, UINT256.shape[0])
+    header["oi_long"] = _uint256(state.oi_long)
+    header["oi_short"] = _uint256(state.oi_short)
+    header["oi_long_shares"] = _uint256(state.oi_long_shares)
+    header["oi_short_shares"] = _uint256(state.oi_short_shares)
+    header["timestamp_update_last"] = state.timestamp_update_last
+    for name, snap in zip(("snapshot_volume_bid", "snapshot_volume_ask",
+                           "snapshot_minted"), snapshots):
+        header[name] = _snapshot_record(snap)
+
+
+class Book(NamedTuple):
+    """
+    Position book loaded from disk. positions is a memory-mapped
+    structured array with POSITION_DTYPE
+    """
+    header: np.void
+    positions: np.ndarray
+
+    @property
+    def market(self) -> str:
+        return "0x" + self.header["market"].tobytes().hex()
+
+    @property
+    def block_number(self) -> int:
+        return int(self.header["block_number"])
+
+    @property
+    def timestamp(self) -> int:
+        return int(self.header["timestamp"])
+
+    def state(self) -> MarketState:
+        h = self.header
+        return MarketState(to_ints(h["params"]),
+                           to_ints(h["oi_long"])[0],
+                           to_ints(h["oi_short"])[0],
+                           to_ints(h["oi_long_shares"])[0],
+                           to_ints(h["oi_short_shares"])[0],
+                           int(h["timestamp_update_last"]))
+
+    def snapshots(self) -> Tuple[Snapshot, Snapshot, Snapshot]:
+        """
+        Returns (snapshotVolumeBid, snapshotVolumeAsk, snapshotMinted)
+        """
+        return (_snapshot(self.header["snapshot_volume_bid"]),
+                _snapshot(self.header["snapshot_volume_ask"]),
+                _snapshot(self.header["snapshot_minted"]))
+
+    def owner(self, i: int) -> str:
+        return "0x" + self.positions["owner"][i].tobytes().hex()
+
+    def info(self, i: int) -> Info:
+        """
+        Returns the exact Position.Info of the i-th position record
+        """
+        p = self.positions[i]
+        return Info(to_ints(p["notional_initial"])[0],
+                    to_ints(p["debt_initial"])[0],
+                    int(p["mid_tick"]), int(p["entry_tick"]),
+                    bool(p["is_long"]), bool(p["liquidated"]),
+                    to_ints(p["oi_shares"])[0],
+                    int(p["fraction_remaining"]))
+
+
+def load(path: str) -> Book:
+    """
+    Memory-maps the book at path read only
+    """
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header[0]["magic"] != MAGIC:
+        raise ValueError(f"{path} is not a position book")
+    if header[0]["version"] != VERSION:
+        raise ValueError(
+            f"{path} has unsupported version {header[0]['version']}")
+
+    count = int(header[0]["count"])
+    if count == 0:
+        return Book(header[0], np.zeros(0, dtype=POSITION_DTYPE))
+    positions = np.memmap(path, dtype=POSITION_DTYPE, mode="r",
+                          offset=HEADER_DTYPE.itemsize, shape=(count,))
+    return Book(header[0], positions)
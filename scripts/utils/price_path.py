@@ -0,0 +1,94 @@
+"""
+Price and reserve time series to play against OverlayV1FeedMock.
+
+A path is a list of steps, each the price and optionally reserve the
+mock should report from a time offset on. Steps are planned into one
+block per distinct timestamp holding only the setPrice/setReserve calls
+that change the mock's value, so a path plays with as few transactions
+and mined blocks as possible. See feed_driver for playing a plan.
+"""
+import csv
+
+from decimal import Decimal
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+
+class Step(NamedTuple):
+    time: int  # seconds after the start of the path
+    price: int
+    reserve: Optional[int] = None  # unchanged if None
+
+
+class Block(NamedTuple):
+    time: int  # seconds after the start of the path
+    calls: List[Tuple[str, int]]  # (setPrice or setReserve, value)
+
+
+def _scaled(value: str, decimals: int) -> int:
+    # exact decimal string to fixed point integer
+    return int(Decimal(value) * 10**decimals)
+
+
+def from_series(times: Sequence[int], prices: Sequence[int],
+                reserves: Optional[Sequence[int]] = None) -> List[Step]:
+    """
+    Steps from parallel series of time offsets, prices and reserves
+    """
+    if reserves is None:
+        reserves = [None] * len(times)
+    if not len(times) == len(prices) == len(reserves):
+        raise ValueError("series must be the same length")
+    return [Step(int(t), int(p), None if r is None else int(r))
+            for t, p, r in zip(times, prices, reserves)]
+
+
+def load_csv(path: str, decimals: int = 18) -> List[Step]:
+    """
+    Steps from a CSV file with a header and columns time, price and
+    optionally reserve. Prices and reserves are decimal amounts scaled
+    by 10**decimals. Empty reserves are left unchanged
+    """
+    steps = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            reserve = row.get("reserve")
+            steps.append(Step(
+                int(row["time"]),
+                _scaled(row["price"], decimals),
+                _scaled(reserve, decimals) if reserve else None))
+    return steps
+
+
+def plan(steps: Sequence[Step], price: int,
+         reserve: int) -> List[Block]:
+    """
+    Plans steps into blocks given the mock's current price and reserve.
+    Steps at the same time are packed into one block with only the last
+    value of each kind set, and calls that don't change the value are
+    dropped. Steps must be in time order
+    """
+    blocks: List[Block] = []
+    current = {"setPrice": price, "setReserve": reserve}
+    pending = {}
+    time = None
+
+    def flush():
+        # only calls that change the value set by earlier blocks
+        calls = [(m, v) for m, v in pending.items() if v != current[m]]
+        if len(calls) > 0:
+            blocks.append(Block(time, calls))
+        current.update(pending)
+
+    for step in steps:
+        if time is not None and step.time < time:
+            raise ValueError(f"step at {step.time} before {time}")
+        if step.time != time:
+            flush()
+            pending = {}
+            time = step.time
+
+        pending["setPrice"] = step.price
+        if step.reserve is not None:
+            pending["setReserve"] = step.reserve
+    flush()
+    return blocks
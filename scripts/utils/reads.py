@@ -0,0 +1,208 @@
+"""
+Batched reads of factory, market and feed state through brownie multicall
+"""
+import numpy as np
+
+from brownie import OverlayV1Market, interface, multicall, web3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Union
+
+from scripts.reference import position
+from scripts.reference.market import MarketState
+from scripts.reference.oracle import Data
+from scripts.reference.risk import NUM_PARAMETERS
+from scripts.reference.roller import Snapshot
+from scripts.utils.log_decoder import (
+    Log, address_topic, checksummed, decode, to_logs, topic
+)
+from scripts.utils.position_book import to_ints
+
+
+class MarketRead(NamedTuple):
+    """
+    Market state, feed data and cached risk calcs read at one block
+    """
+    market: str
+    state: MarketState
+    data: Data
+    dp_upper_limit: int
+    snapshots: Tuple[Snapshot, Snapshot, Snapshot]  # volume bid/ask, minted
+
+
+def load_markets(factory, from_block=0, to_block=None):
+    """
+    Returns (market, feed) contract pairs for all markets deployed by
+    factory, from its MarketDeployed events
+    """
+    events = factory.events.get_sequence(from_block=from_block,
+                                         to_block=to_block,
+                                         event_type="MarketDeployed")
+    return [(OverlayV1Market.at(e.args.market),
+             interface.IOverlayV1Feed(e.args.feed)) for e in events]
+
+
+def load_logs(address: Union[str, Sequence[str]], topics: Sequence,
+              from_block=0, to_block=None) -> Dict[str, np.ndarray]:
+    """
+    Fetches the raw logs of address (or any of addresses) matching topics
+    with one eth_getLogs and decodes them into columns per event name
+    with log_decoder
+    """
+    logs = web3.eth.get_logs({
+        "address": address,
+        "topics": list(topics),
+        "fromBlock": from_block,
+        "toBlock": to_block if to_block is not None else "latest"
+    })
+    return decode(logs)
+
+
+def load_position_ids(market, from_block=0, owner=None, to_block=None):
+    """
+    Returns (owner, positionId) for every position built on market, from
+    its Build events. Only positions of owner if given
+    """
+    topics = [topic("Build")]
+    if owner is not None:
+        topics.append(address_topic(owner))
+    build = load_logs(market.address, topics, from_block, to_block)["Build"]
+    return list(zip(checksummed(build["sender"]),
+                    to_ints(build["positionId"])))
+
+
+def load_invalidations(factory, markets, from_block=0,
+                       to_block=None) -> List[Log]:
+    """
+    Returns the factory's ParamUpdated and the markets' CacheRiskCalc
+    events, which change the markets' params and dpUpperLimit, for
+    view_cache.ViewCache.observe
+    """
+    logs = to_logs(load_logs(factory.address, [topic("ParamUpdated")],
+                             from_block, to_block))
+    addresses = [market.address for market in markets]
+    if len(addresses) > 0:
+        logs += to_logs(load_logs(addresses, [topic("CacheRiskCalc")],
+                                  from_block, to_block))
+    return logs
+
+
+def _market_calls(market, feed):
+    # must be called within a multicall context
+    return (
+        [market.params(i) for i in range(NUM_PARAMETERS)],
+        market.oiLong(),
+        market.oiShort(),
+        market.oiLongShares(),
+        market.oiShortShares(),
+        market.timestampUpdateLast(),
+        feed.latest(),
+        market.dpUpperLimit(),
+        market.snapshotVolumeBid(),
+        market.snapshotVolumeAsk(),
+        market.snapshotMinted()
+    )
+
+
+def _market_read(address, calls) -> MarketRead:
+    (params, oi_long, oi_short, oi_long_shares, oi_short_shares,
+     timestamp_update_last, latest, dp_upper_limit, *snapshots) = calls
+    return MarketRead(
+        address,
+        MarketState([int(p) for p in params], int(oi_long), int(oi_short),
+                    int(oi_long_shares), int(oi_short_shares),
+                    int(timestamp_update_last)),
+        Data(*latest),
+        int(dp_upper_limit),
+        tuple(Snapshot(*[int(v) for v in snap]) for snap in snapshots)
+    )
+
+
+def read_markets(markets, block_identifier=None,
+                 multicall_address=None) -> List[MarketRead]:
+    """
+    Reads state and feed data for every (market, feed) pair in one
+    multicall
+    """
+    with multicall(address=multicall_address,
+                   block_identifier=block_identifier):
+        reads = [(market.address, _market_calls(market, feed))
+                 for market, feed in markets]
+    return [_market_read(address, calls) for address, calls in reads]
+
+
+def read_markets_with_positions(
+    markets, position_ids, block_identifier=None, multicall_address=None
+) -> List[Tuple[MarketRead, List[position.Info]]]:
+    """
+    Reads state, feed data and the given positions for every (market,
+    feed) pair in one multicall. position_ids[i] are the (owner,
+    positionId) to read on markets[i]
+    """
+    with multicall(address=multicall_address,
+                   block_identifier=block_identifier):
+        reads = [(
+            market.address,
+            _market_calls(market, feed),
+            [market.positions(position.get_key(owner, id))
+             for owner, id in ids]
+        ) for (market, feed), ids in zip(markets, position_ids)]
+    return [(_market_read(address, calls),
+             [position.Info(*pos) for pos in infos])
+            for address, calls, infos in reads]
+
+
+def read_book(market, block_identifier, from_block=0,
+              multicall_address=None
+              ) -> Tuple[MarketRead, List[Tuple[str, int, position.Info]]]:
+    """
+    Reads state, feed data and every position built on market up to
+    block_identifier in one multicall. Returns the market read and
+    (owner, positionId, info) for each position
+    """
+    feed = interface.IOverlayV1Feed(market.feed())
+    ids = load_position_ids(market, from_block, to_block=block_identifier)
+    [(read, infos)] = read_markets_with_positions(
+        [(market, feed)], [ids], block_identifier, multicall_address)
+    return read, [(owner, id, info)
+                  for (owner, id), info in zip(ids, infos)]
+
+
+def read_positions(market, position_ids, block_identifier=None,
+                   multicall_address=None) -> List[position.Info]:
+    """
+    Reads Position.Info for every (owner, positionId) in one multicall
+    """
+    with multicall(address=multicall_address,
+                   block_identifier=block_identifier):
+        reads = [market.positions(position.get_key(owner, id))
+                 for owner, id in position_ids]
+    return [position.Info(*pos) for pos in reads]
+
+
+class FeedRead(NamedTuple):
+    """
+    Feed data with the market's risk params and dpUpperLimit read at one
+    block
+    """
+    block_number: int
+    data: Data
+    params: List[int]
+    dp_upper_limit: int
+
+
+def read_feed_history(market, feed, blocks, multicall_address=None,
+                      workers=8) -> List[FeedRead]:
+    """
+    Reads feed data, params and dpUpperLimit at each of blocks, in one
+    multicall per block with up to workers multicalls in flight
+    """
+    def read(block):
+        with multicall(address=multicall_address, block_identifier=block):
+            calls = ([market.params(i) for i in range(NUM_PARAMETERS)],
+                     market.dpUpperLimit(), feed.latest())
+        params, dp_upper_limit, latest = calls
+        return FeedRead(block, Data(*latest), [int(p) for p in params],
+                        int(dp_upper_limit))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(read, blocks))
@@ -0,0 +1,236 @@
+"""
+Ledger of OVL paid by markets to the factory's fee recipient.
+
+Build and Unwind send the trading fee, and Liquidate the remaining
+margin, to the fee recipient as the last OVL Transfer the market makes
+after emitting the event. The amounts aren't in the market events, so
+each is attributed by pairing a market event with the last Transfer
+from the market that follows it in the same transaction. Flows are
+aggregated into hourly, daily and per market rollups as they are added
+so revenue queries don't rescan logs. The ledger is saved to disk with
+its rollups and the last block scanned, so later scans resume from
+there.
+"""
+import json
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import (
+    Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+)
+
+
+HOUR = 3600
+DAY = 86400
+VERSION = 1
+
+# market event -> kind of revenue the following transfer carries
+KINDS = {"Build": "fee", "Unwind": "fee", "Liquidate": "margin"}
+
+
+class Flow(NamedTuple):
+    market: str
+    event: str  # Build, Unwind or Liquidate
+    owner: str
+    position_id: int
+    block_number: int
+    timestamp: int
+    transaction_hash: str
+    log_index: int  # of the market event
+    recipient: str
+    amount: int
+
+    @property
+    def kind(self) -> str:
+        """
+        "fee" for trading fees, "margin" for liquidated remaining margin
+        """
+        return KINDS[self.event]
+
+
+@dataclass
+class Rollup:
+    fees: int = 0
+    margin: int = 0
+    count: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.fees + self.margin
+
+    def add(self, flow: Flow):
+        if flow.kind == "fee":
+            self.fees += flow.amount
+        else:
+            self.margin += flow.amount
+        self.count += 1
+
+
+def owner(event) -> str:
+    """
+    Owner of the position a market event acts on. Liquidations are
+    attributed to the position owner, not the liquidator
+    """
+    args = event.args
+    return args["owner"] if event.event == "Liquidate" else args["sender"]
+
+
+def spans(market_events: Iterable, transfers: Iterable,
+          event_types: Iterable[str]) -> Iterator[Tuple[Any, List]]:
+    """
+    Yields each market event of event_types with the OVL transfers to or
+    from its market that follow it in the same transaction, up to the
+    market's next event of those types. Both are web3 style event logs
+    (event, args, address, blockNumber, transactionHash, logIndex)
+    """
+    event_types = set(event_types)
+
+    # transfers involving each market by tx, in log order
+    moved = defaultdict(list)
+    for t in transfers:
+        for account in {t.args["from"].lower(), t.args["to"].lower()}:
+            moved[(t.transactionHash, account)].append(t)
+    for logs in moved.values():
+        logs.sort(key=lambda t: t.logIndex)
+
+    # market events by tx, in log order, so a later event in the same tx
+    # bounds the transfers of the one before it
+    actions = defaultdict(list)
+    for e in market_events:
+        if e.event in event_types:
+            actions[(e.transactionHash, e.address.lower())].append(e)
+
+    for key, events in actions.items():
+        events.sort(key=lambda e: e.logIndex)
+        logs = moved.get(key, [])
+        for i, e in enumerate(events):
+            end = events[i + 1].logIndex if i + 1 < len(events) else None
+            yield e, [t for t in logs if t.logIndex > e.logIndex
+                      and (end is None or t.logIndex < end)]
+
+
+def attribute(market_events: Iterable, transfers: Iterable,
+              timestamps: Dict[int, int]) -> List[Flow]:
+    """
+    Pairs market Build, Unwind and Liquidate events with the OVL
+    Transfer carrying their fee or remaining margin. transfers are the
+    OVL token's, or only those from the markets to the fee recipient.
+    timestamps maps block number to block timestamp
+    """
+    flows = []
+    for e, span in spans(market_events, transfers, KINDS):
+        sent = [t for t in span
+                if t.args["from"].lower() == e.address.lower()]
+        if len(sent) == 0:
+            continue
+        t = sent[-1]
+        flows.append(Flow(
+            market=e.address,
+            event=e.event,
+            owner=owner(e),
+            position_id=int(e.args["positionId"]),
+            block_number=e.blockNumber,
+            timestamp=timestamps[e.blockNumber],
+            transaction_hash=e.transactionHash,
+            log_index=e.logIndex,
+            recipient=t.args["to"],
+            amount=int(t.args["value"])
+        ))
+    flows.sort(key=lambda f: (f.block_number, f.log_index))
+    return flows
+
+
+class Ledger:
+    """
+    Revenue flows with rollups maintained on add. Rollups are keyed by
+    (market, period start) for "hour" and "day", and by market for
+    "market". last_block is the last block scanned for flows
+    """
+
+    def __init__(self):
+        self.flows: List[Flow] = []
+        self.hour: Dict[Tuple[str, int], Rollup] = defaultdict(Rollup)
+        self.day: Dict[Tuple[str, int], Rollup] = defaultdict(Rollup)
+        self.market: Dict[str, Rollup] = defaultdict(Rollup)
+        self.last_block = -1
+
+    def add(self, flows: Iterable[Flow], to_block: Optional[int] = None):
+        """
+        Adds flows, which must be after any already added. to_block is
+        the last block scanned for them, if past the last flow
+        """
+        for flow in flows:
+            self.flows.append(flow)
+            self.hour[(flow.market, flow.timestamp // HOUR * HOUR)].add(flow)
+            self.day[(flow.market, flow.timestamp // DAY * DAY)].add(flow)
+            self.market[flow.market].add(flow)
+            self.last_block = max(self.last_block, flow.block_number)
+        if to_block is not None:
+            self.last_block = max(self.last_block, to_block)
+
+    def revenue(self, period: str = "day", market: Optional[str] = None,
+                start: int = 0, end: Optional[int] = None) -> Rollup:
+        """
+        Revenue summed over the "hour" or "day" rollups with period start
+        in [start, end), for market or all markets
+        """
+        rollups = {"hour": self.hour, "day": self.day}[period]
+        total = Rollup()
+        for (m, t), r in rollups.items():
+            if market is not None and m != market:
+                continue
+            if t < start or (end is not None and t >= end):
+                continue
+            total.fees += r.fees
+            total.margin += r.margin
+            total.count += r.count
+        return total
+
+    def rows(self, period: str = "day") -> List[Tuple]:
+        """
+        (market, period start, fees, margin, count) for the "hour" or
+        "day" rollups, or (market, fees, margin, count) for "market",
+        sorted
+        """
+        if period == "market":
+            return sorted((m, r.fees, r.margin, r.count)
+                          for m, r in self.market.items())
+        rollups = {"hour": self.hour, "day": self.day}[period]
+        return sorted((m, t, r.fees, r.margin, r.count)
+                      for (m, t), r in rollups.items())
+
+    def save(self, path: str):
+        """
+        Saves flows, rollups and the last block scanned to path as JSON
+        """
+        with open(path, "w") as f:
+            json.dump({
+                "version": VERSION,
+                "last_block": self.last_block,
+                "flows": [list(flow) for flow in self.flows],
+                "hour": self.rows("hour"),
+                "day": self.rows("day"),
+                "market": self.rows("market")
+            }, f)
+
+
+def load(path: str) -> Ledger:
+    """
+    Loads a ledger saved with Ledger.save
+    """
+    with open(path) as f:
+        saved = json.load(f)
+    if saved.get("version") != VERSION:
+        raise ValueError(
+            f"{path} has unsupported version {saved.get('version')}")
+
+    ledger = Ledger()
+    ledger.flows = [Flow(*flow) for flow in saved["flows"]]
+    for market, start, fees, margin, count in saved["hour"]:
+        ledger.hour[(market, start)] = Rollup(fees, margin, count)
+    for market, start, fees, margin, count in saved["day"]:
+        ledger.day[(market, start)] = Rollup(fees, margin, count)
+    for market, fees, margin, count in saved["market"]:
+        ledger.market[market] = Rollup(fees, margin, count)
+    ledger.last_block = saved["last_block"]
+    return ledger
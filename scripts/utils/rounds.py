@@ -0,0 +1,108 @@
+"""
+Chainlink round histories for bulk loading into AggregatorMock.
+
+AggregatorMock.setRounds writes whole arrays of rounds with explicit
+updatedAt timestamps, so a multi-day history loads in a few
+transactions instead of a setData and chain mine per round. Histories
+are generated synthetically, as a geometric Brownian motion reported
+like a Chainlink aggregator (on a deviation threshold or heartbeat), or
+read from CSV.
+"""
+import csv
+import numpy as np
+
+from decimal import Decimal
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+
+# AggregatorMock.decimals()
+DECIMALS = 8
+
+# rounds per setRounds transaction. ~3 storage writes per round
+BATCH_SIZE = 200
+
+
+class Round(NamedTuple):
+    round_id: int
+    answer: int  # price with DECIMALS decimals
+    updated_at: int
+
+
+def synthetic(start: int, end: int, price: float, volatility: float,
+              interval: int = 60, deviation: float = 0.005,
+              heartbeat: int = 3600, seed: Optional[int] = None,
+              first_round_id: int = 1) -> List[Round]:
+    """
+    Rounds between start and end timestamps for a price following a
+    geometric Brownian motion with annualized volatility, sampled every
+    interval seconds. Like a Chainlink aggregator, a round is reported
+    when the price deviates from the last answer by more than deviation
+    or heartbeat seconds have passed. The first sample is always
+    reported
+    """
+    rng = np.random.default_rng(seed)
+    times = np.arange(start, end + 1, interval)
+    sigma = volatility * np.sqrt(interval / (365 * 86400))
+    shocks = rng.normal(-sigma**2 / 2, sigma, len(times))
+    shocks[0] = 0.
+    prices = price * np.exp(np.cumsum(shocks))
+
+    rounds = []
+    last_price, last_time = None, None
+    for t, p in zip(times, prices):
+        if last_price is not None and t - last_time < heartbeat \
+                and abs(p / last_price - 1) <= deviation:
+            continue
+        last_price, last_time = p, t
+        rounds.append(Round(first_round_id + len(rounds),
+                            int(round(p * 10**DECIMALS)), int(t)))
+    return rounds
+
+
+def load_csv(path: str, first_round_id: int = 1) -> List[Round]:
+    """
+    Rounds from a CSV file with a header and columns updated_at and
+    answer, a decimal price. Rows must be in time order
+    """
+    rounds = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            rounds.append(Round(
+                first_round_id + len(rounds),
+                int(Decimal(row["answer"]) * 10**DECIMALS),
+                int(row["updated_at"])))
+    return rounds
+
+
+def shift(rounds: Sequence[Round], end: int) -> List[Round]:
+    """
+    Shifts rounds in time so the last is updated at end, e.g. the
+    current block timestamp
+    """
+    if len(rounds) == 0:
+        return []
+    dt = end - rounds[-1].updated_at
+    return [r._replace(updated_at=r.updated_at + dt) for r in rounds]
+
+
+def batches(rounds: Sequence[Round], size: int = BATCH_SIZE
+            ) -> Iterator[Tuple[List[int], List[int], List[int]]]:
+    """
+    (round ids, answers, updated ats) arrays for setRounds, size rounds
+    at a time
+    """
+    for i in range(0, len(rounds), size):
+        chunk = rounds[i:i + size]
+        yield ([r.round_id for r in chunk], [r.answer for r in chunk],
+               [r.updated_at for r in chunk])
+
+
+def load(aggregator, rounds: Sequence[Round], account,
+         size: int = BATCH_SIZE) -> List:
+    """
+    Writes rounds to an AggregatorMock with setRounds, size rounds per
+    transaction. Returns the transactions
+    """
+    return [aggregator.setRounds(ids, answers, updated_ats,
+                                 {"from": account})
+            for ids, answers, updated_ats in batches(rounds, size)]
@@ -0,0 +1,53 @@
+"""
+Seeds checkpoints (see checkpoint) into markets on a local chain by
+writing storage directly, so an incident can be reproduced without
+replaying the transactions that led to it.
+"""
+from brownie import chain, web3
+from typing import Dict
+
+from scripts.utils.checkpoint import Checkpoint, storage
+
+
+SET_STORAGE_METHODS = ("anvil_setStorageAt", "hardhat_setStorageAt",
+                       "evm_setAccountStorageAt")
+
+
+def set_storage(address: str, slot: int, value: int):
+    """
+    Sets a storage slot of the contract at address on the development
+    node. anvil and hardhat use *_setStorageAt, ganache
+    evm_setAccountStorageAt
+    """
+    params = [address, hex(slot), "0x" + value.to_bytes(32, "big").hex()]
+    for method in SET_STORAGE_METHODS:
+        response = web3.provider.make_request(method, params)
+        if "error" not in response:
+            return
+    raise ValueError(f"node does not support setting storage: {response}")
+
+
+def seed(market, checkpoint: Checkpoint, feed_mock=None,
+         account=None) -> Dict[int, int]:
+    """
+    Overwrites the storage of market, an OverlayV1Market, with the
+    checkpoint and returns the slots written. Timestamps are shifted to
+    the latest block so funding and rolling windows resume with the same
+    elapsed time as at the checkpoint.
+
+    The feed is immutable in the market, so its data can't be seeded
+    through market storage. If feed_mock, an OverlayV1FeedMock, is given
+    its price and reserve are set from the checkpoint's data from account.
+    The mock reports one price for every window, so drift between the
+    micro and macro prices is not reproduced
+    """
+    slots = storage(checkpoint, chain[-1].timestamp)
+    for slot, value in slots.items():
+        set_storage(market.address, slot, value)
+
+    if feed_mock is not None:
+        data = checkpoint.data()
+        feed_mock.setPrice(data.price_over_micro_window, {"from": account})
+        feed_mock.setReserve(data.reserve_over_micro_window,
+                             {"from": account})
+    return slots
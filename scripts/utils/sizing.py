@@ -0,0 +1,200 @@
+"""
+Maximum buildable position size from one read of market state.
+
+Whether build() succeeds is monotone in size: a larger notional uses
+more of the oi caps, registers more volume so gets a worse entry price
+from impact, and so moves closer to being liquidatable at build. The
+largest size is found by bisection on the exact build() mirror, with
+the search bracketed by closed-form bounds from the caps, the impact
+exponent limit and the build-time liquidation check.
+"""
+from math import log
+from typing import Optional, Tuple
+
+from scripts.reference import fixed_point as fp
+from scripts.reference.errors import Revert
+from scripts.reference.market import (
+    MAX_NATURAL_EXPONENT, build, cap_notional_adjusted_for_bounds,
+    cap_oi_adjusted_for_circuit_breaker, data_is_valid, mid_from_feed,
+    oi_from_notional
+)
+from scripts.reference.risk import Parameters, get
+from scripts.reference.roller import cumulative, transform
+from scripts.utils.impact import Market, TOLERANCE, bisect_max, bracket_max
+
+
+ONE = 10**18
+
+
+def can_build(market: Market, collateral: int, leverage: int,
+              is_long: bool) -> bool:
+    """
+    Whether build(collateral, leverage, is_long) would succeed, ignoring
+    the trader's price limit
+    """
+    try:
+        build(*market, collateral, leverage, is_long)
+    except (Revert, ZeroDivisionError):
+        return False
+    return True
+
+
+def _cap_oi_room(market: Market, is_long: bool) -> Tuple[int, int, int]:
+    # (oi left under caps on side, cap oi for volume, mid price)
+    state = market.state.pay_funding(market.timestamp)
+    params = state.params
+    mid_price = mid_from_feed(market.data)
+    cap_oi = oi_from_notional(
+        cap_notional_adjusted_for_bounds(
+            params, market.data, get(params, Parameters.CapNotional)),
+        mid_price)
+    cap_oi_circuited = cap_oi_adjusted_for_circuit_breaker(
+        params, market.snapshots[2], market.timestamp, cap_oi)
+    room = max(cap_oi_circuited - state.oi_on_side(is_long), 0)
+    return room, cap_oi, mid_price
+
+
+def _volume_before(market: Market, is_long: bool) -> float:
+    # rolling volume on side decayed to timestamp, as a fraction of cap
+    snapshot = market.snapshots[1] if is_long else market.snapshots[0]
+    decayed = transform(snapshot, market.timestamp,
+                        market.data.micro_window, 0)
+    return cumulative(decayed) / 1e18
+
+
+def _max_notional(market: Market, leverage: int,
+                  is_long: bool) -> Tuple[int, Optional[float]]:
+    """
+    Returns an exact upper bound on notional from the oi caps and the
+    impact exponent limit, and a float estimate of the largest notional
+    not liquidatable at build given the entry price impact
+    """
+    params = market.state.params
+    data = market.data
+    room, cap_oi, mid_price = _cap_oi_room(market, is_long)
+
+    # oi = notional / mid <= room
+    bound = fp.mul_up(room + 1, mid_price) + 1
+
+    delta = get(params, Parameters.Delta) / 1e18
+    lmbda = get(params, Parameters.Lmbda) / 1e18
+    volume = _volume_before(market, is_long)
+    cap = cap_oi / 1e18
+    mid = mid_price / 1e18
+    if lmbda == 0 or cap == 0:
+        return bound, None
+
+    # pow = delta + lmbda * (volume + oi / cap) < MAX_NATURAL_EXPONENT
+    max_volume = (MAX_NATURAL_EXPONENT / 1e18 - delta) / lmbda - volume
+    bound = min(bound, int(max(max_volume, 0.) * cap * mid * 1e18
+                           * (1 + TOLERANCE)) + 1)
+
+    # value at mid after build is notional * (1/L - (entry/mid - 1)) for
+    # longs and notional * (1/L - (1 - entry/mid)) for shorts. not
+    # liquidatable while value * (1 - liq fee rate) >= notional * mmf
+    lev = leverage / 1e18
+    mmf = get(params, Parameters.MaintenanceMarginFraction) / 1e18
+    lfr = get(params, Parameters.LiquidationFeeRate) / 1e18
+    margin = 1 / lev - mmf / (1 - lfr)
+    if is_long:
+        worst = max(data.price_over_micro_window,
+                    data.price_over_macro_window) / 1e18
+        if 1 + margin <= 0:
+            return bound, 0.
+        max_pow = log((1 + margin) * mid / worst)
+    else:
+        worst = min(data.price_over_micro_window,
+                    data.price_over_macro_window) / 1e18
+        if 1 - margin <= 0:
+            # bid can't fall far enough to liquidate at build
+            return bound, None
+        max_pow = -log((1 - margin) * mid / worst)
+
+    max_oi = ((max_pow - delta) / lmbda - volume) * cap
+    return bound, max(max_oi, 0.) * mid * 1e18
+
+
+def _estimate_leverage(market: Market, collateral: int, is_long: bool,
+                       hi: int) -> Optional[float]:
+    # largest leverage with collateral * leverage under the closed-form
+    # estimate of max notional at that leverage, by float bisection
+    def fits(leverage: float) -> bool:
+        _, estimate = _max_notional(market, int(leverage), is_long)
+        return estimate is None or collateral * leverage / 1e18 <= estimate
+
+    lo, up = float(ONE), float(hi)
+    if not fits(lo):
+        return None
+    for _ in range(64):
+        mid = (lo + up) / 2
+        if fits(mid):
+            lo = mid
+        else:
+            up = mid
+    return lo
+
+
+def max_collateral(market: Market, leverage: int, is_long: bool) -> int:
+    """
+    Largest collateral that can be built at leverage on side. Zero if no
+    position can be built
+    """
+    params = market.state.params
+    min_collateral = get(params, Parameters.MinCollateral)
+    if not data_is_valid(market.data, market.dp_upper_limit):
+        return 0
+
+    def ok(collateral: int) -> bool:
+        return can_build(market, collateral, leverage, is_long)
+
+    if not ok(min_collateral):
+        return 0
+
+    bound, estimate = _max_notional(market, leverage, is_long)
+    hi = max(fp.div_up(bound, leverage) + 1, min_collateral)
+    if ok(hi):
+        return hi
+
+    if estimate is not None:
+        estimate = estimate / leverage * 1e18
+    lo, hi = bracket_max(ok, min_collateral, hi, estimate)
+    return bisect_max(ok, lo, hi)
+
+
+def max_leverage(market: Market, collateral: int, is_long: bool) -> int:
+    """
+    Largest leverage that collateral can be built at on side. Zero if no
+    position can be built
+    """
+    params = market.state.params
+    cap_leverage = get(params, Parameters.CapLeverage)
+    if not data_is_valid(market.data, market.dp_upper_limit):
+        return 0
+
+    def ok(leverage: int) -> bool:
+        return can_build(market, collateral, leverage, is_long)
+
+    if not ok(ONE):
+        return 0
+
+    # caps and impact limit bound notional regardless of leverage
+    bound, _ = _max_notional(market, ONE, is_long)
+    hi = min(cap_leverage, fp.div_up(bound, collateral) + 1)
+    if ok(hi):
+        return hi
+
+    lo, hi = bracket_max(ok, ONE, hi,
+                         _estimate_leverage(market, collateral, is_long, hi))
+    return bisect_max(ok, lo, hi)
+
+
+def max_size(market: Market, is_long: bool, leverage: int = None,
+             collateral: int = None) -> int:
+    """
+    Max collateral at leverage, or max leverage at collateral
+    """
+    if (leverage is None) == (collateral is None):
+        raise ValueError("pass exactly one of leverage or collateral")
+    if leverage is not None:
+        return max_collateral(market, leverage, is_long)
+    return max_leverage(market, collateral, is_long)
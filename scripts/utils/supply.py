@@ -0,0 +1,252 @@
+"""
+Ledger of OVL minted and burned by markets.
+
+Unwind mints value - cost when a position is in profit and burns the
+loss otherwise. Liquidate burns the loss plus the insurance margin.
+Each is an OVL Transfer from or to the zero address following the
+market event, and the signed amount is registered in the market's
+snapshotMinted Roller that drives the circuit breaker. Replaying the
+events through the exact Roller mirror reproduces snapshotMinted so the
+on chain value can be checked against the logs. Each event is replayed
+with the circuitBreakerWindow in effect at its block, so ParamUpdated
+changes to the window are recorded in the ledger. The ledger is saved
+to disk with the last block scanned, so later scans resume from there.
+"""
+import json
+
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from scripts.reference.roller import Snapshot, cumulative, transform
+from scripts.utils.revenue import DAY, HOUR, owner, spans
+
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+EVENTS = ("Unwind", "Liquidate")
+VERSION = 2
+
+
+class MintBurn(NamedTuple):
+    market: str
+    event: str  # Unwind or Liquidate
+    owner: str
+    position_id: int
+    block_number: int
+    timestamp: int
+    transaction_hash: str
+    log_index: int  # of the market event
+    minted: int  # net minted (+) or burned (-) from Transfer logs
+    expected: int  # mint arg of the market event
+
+    @property
+    def matches(self) -> bool:
+        """
+        Whether the transfers agree with the amount the market registered
+        """
+        return self.minted == self.expected
+
+
+def reconcile(market_events: Iterable, transfers: Iterable,
+              timestamps: Dict[int, int]) -> List[MintBurn]:
+    """
+    Joins market Unwind and Liquidate events with the OVL mint and burn
+    transfers that follow them. See revenue.spans for the log format.
+    timestamps maps block number to block timestamp
+    """
+    records = []
+    for e, span in spans(market_events, transfers, EVENTS):
+        market = e.address.lower()
+        minted = 0
+        for t in span:
+            frm, to = t.args["from"].lower(), t.args["to"].lower()
+            if frm == ZERO_ADDRESS and to == market:
+                minted += int(t.args["value"])
+            elif frm == market and to == ZERO_ADDRESS:
+                minted -= int(t.args["value"])
+        records.append(MintBurn(
+            market=e.address,
+            event=e.event,
+            owner=owner(e),
+            position_id=int(e.args["positionId"]),
+            block_number=e.blockNumber,
+            timestamp=timestamps[e.blockNumber],
+            transaction_hash=e.transactionHash,
+            log_index=e.logIndex,
+            minted=minted,
+            expected=int(e.args["mint"])
+        ))
+    # chain order, which the Roller replay depends on
+    records.sort(key=lambda r: (r.block_number, r.log_index))
+    return records
+
+
+@dataclass
+class Supply:
+    """
+    Per market totals and rolling minted, maintained on add
+    """
+    minted: int = 0  # total minted
+    burned: int = 0  # total burned, positive
+    snapshot: Snapshot = Snapshot(0, 0, 0)  # replayed snapshotMinted
+    # net after each record, for lookups by time
+    timestamps: List[int] = field(default_factory=list)
+    nets: List[int] = field(default_factory=list)
+
+    @property
+    def net(self) -> int:
+        return self.minted - self.burned
+
+
+class SupplyLedger:
+    """
+    Mint and burn records with totals, net inflation over time and the
+    replayed snapshotMinted for each market. window is the market's
+    circuitBreakerWindow, by market address, or a single value for all,
+    until changed with set_window. Hourly and daily net minted are keyed
+    by (market, period start). last_block is the last block scanned for
+    records
+    """
+
+    def __init__(self, window=None):
+        self.window = window
+        # (block number, log index, window) each time a market's window
+        # was set, in chain order
+        self.windows: Dict[str, List[Tuple[int, int, int]]] = \
+            defaultdict(list)
+        self.records: List[MintBurn] = []
+        self.markets: Dict[str, Supply] = defaultdict(Supply)
+        self.hour: Dict[Tuple[str, int], int] = defaultdict(int)
+        self.day: Dict[Tuple[str, int], int] = defaultdict(int)
+        self.last_block = -1
+
+    def set_window(self, market: str, window: int, block_number: int = -1,
+                   log_index: int = 0):
+        """
+        Sets market's circuitBreakerWindow from the log at block_number
+        and log_index on, as a ParamUpdated there does. Must be called in
+        chain order, before adding the records that follow it
+        """
+        self.windows[market].append((block_number, log_index, window))
+
+    def _window(self, market: str, block_number: Optional[int] = None,
+                log_index: int = 0) -> int:
+        # window in effect at the log at block_number and log_index, or
+        # the latest if not given
+        windows = self.windows.get(market, [])
+        i = len(windows) if block_number is None else bisect_right(
+            windows, (block_number, log_index, float("inf")))
+        if i > 0:
+            return windows[i - 1][2]
+        return self.window[market] if isinstance(self.window, dict) \
+            else self.window
+
+    def add(self, records: Iterable[MintBurn],
+            to_block: Optional[int] = None):
+        """
+        Adds records, which must be in chain order and after any already
+        added. to_block is the last block scanned for them, if past the
+        last record
+        """
+        for r in records:
+            self.records.append(r)
+            s = self.markets[r.market]
+            if r.minted >= 0:
+                s.minted += r.minted
+            else:
+                s.burned -= r.minted
+            s.timestamps.append(r.timestamp)
+            s.nets.append(s.net)
+
+            # market registers the event's mint amount in snapshotMinted
+            s.snapshot = transform(
+                s.snapshot, r.timestamp,
+                self._window(r.market, r.block_number, r.log_index),
+                r.expected)
+            self.hour[(r.market, r.timestamp // HOUR * HOUR)] += r.minted
+            self.day[(r.market, r.timestamp // DAY * DAY)] += r.minted
+            self.last_block = max(self.last_block, r.block_number)
+        if to_block is not None:
+            self.last_block = max(self.last_block, to_block)
+
+    def rolling(self, market: str, timestamp: int) -> int:
+        """
+        Rolling minted at timestamp as the market's circuit breaker sees
+        it: snapshotMinted decayed to timestamp
+        """
+        return cumulative(transform(self.markets[market].snapshot, timestamp,
+                                    self._window(market), 0))
+
+    def net_at(self, market: str, timestamp: int) -> int:
+        """
+        Net OVL minted by market up to and including timestamp
+        """
+        s = self.markets[market]
+        i = bisect_right(s.timestamps, timestamp)
+        return s.nets[i - 1] if i > 0 else 0
+
+    def mismatches(self) -> List[MintBurn]:
+        """
+        Records whose transfers disagree with the registered amount
+        """
+        return [r for r in self.records if not r.matches]
+
+    def compare(self, market: str, snapshot: Snapshot,
+                timestamp: Optional[int] = None) -> Tuple[int, int]:
+        """
+        (replayed, on chain) rolling minted for market, both decayed to
+        timestamp, given the on chain snapshotMinted
+        """
+        if timestamp is None:
+            timestamp = snapshot.timestamp
+        on_chain = cumulative(transform(snapshot, timestamp,
+                                        self._window(market), 0))
+        return self.rolling(market, timestamp), on_chain
+
+    def save(self, path: str):
+        """
+        Saves records, per market totals, rollups and the last block
+        scanned to path as JSON
+        """
+        with open(path, "w") as f:
+            json.dump({
+                "version": VERSION,
+                "last_block": self.last_block,
+                "window": self.window,
+                "windows": [[m, [list(w) for w in windows]]
+                            for m, windows in sorted(self.windows.items())],
+                "records": [list(r) for r in self.records],
+                "markets": [[m, s.minted, s.burned, list(s.snapshot),
+                             s.timestamps, s.nets]
+                            for m, s in sorted(self.markets.items())],
+                "hour": [[m, t, net]
+                         for (m, t), net in sorted(self.hour.items())],
+                "day": [[m, t, net]
+                        for (m, t), net in sorted(self.day.items())]
+            }, f)
+
+
+def load(path: str) -> SupplyLedger:
+    """
+    Loads a ledger saved with SupplyLedger.save
+    """
+    with open(path) as f:
+        saved = json.load(f)
+    if saved.get("version") != VERSION:
+        raise ValueError(
+            f"{path} has unsupported version {saved.get('version')}")
+
+    ledger = SupplyLedger(saved["window"])
+    for m, windows in saved["windows"]:
+        ledger.windows[m] = [tuple(w) for w in windows]
+    ledger.records = [MintBurn(*r) for r in saved["records"]]
+    for m, minted, burned, snapshot, timestamps, nets in saved["markets"]:
+        ledger.markets[m] = Supply(minted, burned, Snapshot(*snapshot),
+                                   timestamps, nets)
+    for m, t, net in saved["hour"]:
+        ledger.hour[(m, t)] = net
+    for m, t, net in saved["day"]:
+        ledger.day[(m, t)] = net
+    ledger.last_block = saved["last_block"]
+    return ledger
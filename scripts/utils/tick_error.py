@@ -0,0 +1,144 @@
+"""
+Quantization error from storing position prices as ticks.
+
+Positions store midTick and entryTick, so PnL is calculated from
+tickToPrice(priceToTick(price)) rather than the price at build.
+priceToTick truncates toward zero, so prices above one round down to
+the tick below and prices below one round up, by at most one 1bp tick.
+
+Tick math here is exact and vectorized. priceToTick is computed from a
+float64 log, and only samples whose float tick is within TICK_MARGIN of
+an integer fall back to the exact integer mirror in scripts/reference.
+tickToPrice is evaluated exactly once per distinct tick. Prices are 18
+decimal fixed point values, taken as the integers int(price).
+"""
+import numpy as np
+
+from math import log
+from typing import Dict, NamedTuple
+
+from scripts.reference import tick
+from scripts.reference.tick import MAX_TICK_256, MIN_TICK_256
+
+
+ONE = 1e18
+LOG_PRICE_BASE = log(1.0001)
+MIN_TICK = MIN_TICK_256 // 10**18
+MAX_TICK = MAX_TICK_256 // 10**18
+
+# float64 log error is ~1e-10 ticks at the largest ticks, and logDown's
+# rounding less, so anything farther from an integer truncates the same
+TICK_MARGIN = 1e-6
+
+
+def price_to_tick(prices) -> np.ndarray:
+    """
+    Mirrors Tick.priceToTick for every price (18 decimals). Raises Revert
+    if any is out of tick bounds
+    """
+    prices = np.asarray(prices)
+    estimate = np.log(prices.astype(float) / ONE) / LOG_PRICE_BASE
+    ticks = np.trunc(estimate).astype(np.int64)
+
+    exact = (np.abs(estimate - np.round(estimate)) < TICK_MARGIN) \
+        | (estimate <= MIN_TICK + 1) | (estimate >= MAX_TICK - 1)
+    for i in np.flatnonzero(exact):
+        ticks[i] = tick.price_to_tick(int(prices[i]))
+    return ticks
+
+
+def tick_to_price(ticks) -> np.ndarray:
+    """
+    Mirrors Tick.tickToPrice for every tick. Returns float64 prices in
+    feed units, each the exact price rounded once to float64
+    """
+    unique, inverse = np.unique(np.asarray(ticks, dtype=np.int64),
+                                return_inverse=True)
+    prices = np.array([tick.tick_to_price(int(t)) / ONE for t in unique])
+    return prices[inverse].reshape(np.shape(ticks))
+
+
+def round_trip(prices) -> np.ndarray:
+    """
+    Prices (18 decimals) after the priceToTick and tickToPrice round trip
+    positions store them through, in feed units
+    """
+    return tick_to_price(price_to_tick(prices))
+
+
+class Bias(NamedTuple):
+    """
+    Quantization bias over a set of builds. Relative errors in bps of the
+    price at build, PnL in OVL as stored less as if prices were exact
+    """
+    count: int
+    entry_error_mean: float  # bps
+    entry_error_max: float  # bps, largest in magnitude
+    mid_error_mean: float  # bps
+    pnl_bias_mean: float
+    pnl_bias_total: float
+    pnl_bias_max: float  # largest in magnitude
+
+
+def _bias(entry_error: np.ndarray, mid_error: np.ndarray,
+          pnl_bias: np.ndarray) -> Bias:
+    if len(pnl_bias) == 0:
+        return Bias(0, 0., 0., 0., 0., 0., 0.)
+    return Bias(
+        count=len(pnl_bias),
+        entry_error_mean=float(entry_error.mean()),
+        entry_error_max=float(entry_error[np.argmax(np.abs(entry_error))]),
+        mid_error_mean=float(mid_error.mean()),
+        pnl_bias_mean=float(pnl_bias.mean()),
+        pnl_bias_total=float(pnl_bias.sum()),
+        pnl_bias_max=float(pnl_bias[np.argmax(np.abs(pnl_bias))])
+    )
+
+
+def analyze(is_long, notional, mid, entry, exit) -> Dict[str, Bias]:
+    """
+    Replays the tick round trip for builds with notional (OVL), mid and
+    entry prices at build (18 decimals), valued at exit prices (18
+    decimals). Returns the bias for "long", "short" and "all" builds.
+
+    Stored PnL uses oi = notional / tickToPrice(midTick) and the entry
+    price tickToPrice(entryTick), as Position.value does. The long payoff
+    cap and funding are ignored since neither depends on the ticks
+    """
+    is_long = np.asarray(is_long, dtype=bool)
+    notional = np.asarray(notional, dtype=float)
+    mid_exact = np.asarray(mid).astype(float) / ONE
+    entry_exact = np.asarray(entry).astype(float) / ONE
+    exit_ = np.asarray(exit).astype(float) / ONE
+    mid_stored = round_trip(mid)
+    entry_stored = round_trip(entry)
+
+    direction = np.where(is_long, 1., -1.)
+    pnl_exact = notional / mid_exact * (exit_ - entry_exact) * direction
+    pnl_stored = notional / mid_stored * (exit_ - entry_stored) * direction
+    pnl_bias = pnl_stored - pnl_exact
+
+    entry_error = (entry_stored / entry_exact - 1) * 1e4
+    mid_error = (mid_stored / mid_exact - 1) * 1e4
+    return {
+        name: _bias(entry_error[mask], mid_error[mask], pnl_bias[mask])
+        for name, mask in (("long", is_long), ("short", ~is_long),
+                           ("all", np.ones_like(is_long)))
+    }
+
+
+def synthetic(n: int, price: float, volatility: float, delta: float,
+              notional: float = 1000., seed: int = 0):
+    """
+    Returns (is_long, notional, mid, entry, exit) for n random builds
+    around price (feed units), with mid and exit prices lognormal with
+    volatility and entry at the mid plus or minus the static spread
+    delta. Prices are 18 decimal floats
+    """
+    rng = np.random.default_rng(seed)
+    is_long = rng.random(n) < 0.5
+    mid = price * np.exp(volatility * rng.standard_normal(n))
+    entry = mid * np.exp(np.where(is_long, delta, -delta))
+    exit_ = mid * np.exp(volatility * rng.standard_normal(n))
+    return (is_long, np.full(n, notional), np.floor(mid * ONE),
+            np.floor(entry * ONE), np.floor(exit_ * ONE))
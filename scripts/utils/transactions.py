@@ -0,0 +1,283 @@
+import rlp
+import threading
+import time
+
+from brownie import web3
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from eth_utils import keccak, to_bytes, to_checksum_address
+from typing import Any, List, Optional
+
+
+# step statuses
+QUEUED = "queued"
+SENT = "sent"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def contract_address(sender: str, nonce: int) -> str:
+    """
+    Returns the address of the contract created by sender with the
+    given nonce, i.e. keccak(rlp([sender, nonce]))[12:]
+    """
+    encoded = rlp.encode([to_bytes(hexstr=sender), nonce])
+    return to_checksum_address(keccak(encoded)[12:])
+
+
+class NonceManager:
+    """
+    Hands out sequential nonces for an account locally, so transactions
+    can be broadcast back to back without waiting on each receipt
+    """
+
+    def __init__(self, account):
+        self.account = account
+        self._lock = threading.Lock()
+        self.sync()
+
+    def sync(self):
+        """
+        Resets the next nonce to the account's pending transaction count.
+        Use after a transaction fails to broadcast so no gap is left
+        """
+        with self._lock:
+            self._next = web3.eth.get_transaction_count(
+                self.account.address, "pending")
+
+    def next(self) -> int:
+        """
+        Returns the next unused nonce and reserves it
+        """
+        with self._lock:
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+
+@dataclass
+class Step:
+    """
+    A transaction queued on a PipelinedSender. Either a contract deploy
+    (container set) or a contract call (target and method set)
+    """
+    name: str
+    args: tuple
+    after: List["Step"]
+    container: Any = None
+    target: Any = None
+    method: Optional[str] = None
+    gas_limit: Optional[int] = None
+    status: str = QUEUED
+    nonce: Optional[int] = None
+    tx: Any = None
+    contract: Any = None
+    error: Optional[str] = None
+    warning: Optional[str] = None
+    sent_at: Optional[float] = None
+    confirmed_at: Optional[float] = None
+    predicted: Optional[str] = None
+
+    @property
+    def address(self) -> str:
+        """
+        Address of the deployed contract. Known as soon as the deploy is
+        sent, so later steps can reference it without waiting on it
+        """
+        if self.container is None:
+            raise AttributeError(f"{self.name} is not a deploy step")
+        if self.nonce is None:
+            raise AttributeError(f"{self.name} has not been sent")
+        return self.contract.address if self.contract is not None \
+            else self.predicted
+
+    @property
+    def gas_used(self) -> int:
+        return self.tx.gas_used if self.tx is not None and \
+            self.status in (CONFIRMED, FAILED) else 0
+
+
+class PipelinedSender:
+    """
+    Sends transactions from one account with locally assigned nonces.
+
+    Every step whose dependencies have confirmed is broadcast at once and
+    its receipt is tracked in the background, so only the ordering that
+    actually matters is waited on. A step depends on the steps listed in
+    `after` and on any deploy step it is called on. Deploy steps passed
+    as arguments only need to have been sent, since their address is
+    known from the sender and nonce. Steps whose dependencies fail are
+    skipped and never broadcast.
+    """
+
+    def __init__(self, account, required_confs: int = 1,
+                 publish_source: bool = False):
+        self.account = account
+        self.required_confs = required_confs
+        self.publish_source = publish_source
+        self.steps: List[Step] = []
+        self.rounds = 0
+        self.elapsed = 0.0
+
+    def deploy(self, container, *args, after=(), name=None,
+               gas_limit=None) -> Step:
+        """
+        Queues a deploy of the given brownie ContractContainer
+        """
+        step = Step(name=name or container._name, args=args,
+                    after=list(after), container=container,
+                    gas_limit=gas_limit)
+        return self._queue(step)
+
+    def transact(self, target, method: str, *args, after=(), name=None,
+                 gas_limit=None) -> Step:
+        """
+        Queues a call to method on target, which is either a brownie
+        Contract or a deploy Step queued on this sender
+        """
+        after = list(after)
+        if isinstance(target, Step) and target not in after:
+            after.append(target)
+        target_name = target.name if isinstance(target, Step) \
+            else getattr(target, "_name", str(target))
+        step = Step(name=name or f"{target_name}.{method}", args=args,
+                    after=after, target=target, method=method,
+                    gas_limit=gas_limit)
+        return self._queue(step)
+
+    def _deps(self, step: Step) -> List[Step]:
+        return step.after + [a for a in step.args if isinstance(a, Step)]
+
+    def _queue(self, step: Step) -> Step:
+        for dep in self._deps(step):
+            if dep not in self.steps:
+                raise ValueError(f"{step.name} depends on unknown step")
+        self.steps.append(step)
+        return step
+
+    def _ready(self, step: Step) -> Optional[bool]:
+        """
+        Returns True if step can be sent, False if it must keep waiting
+        and None if a dependency failed so it never can
+        """
+        deps = self._deps(step)
+        if any(d.status in (FAILED, SKIPPED) for d in deps):
+            return None
+        if any(d.status != CONFIRMED for d in step.after):
+            return False
+        return all(d.status in (SENT, CONFIRMED) for d in deps)
+
+    def _resolve(self, arg):
+        return arg.address if isinstance(arg, Step) else arg
+
+    def _broadcast(self, step: Step, nonces: NonceManager):
+        args = [self._resolve(arg) for arg in step.args]
+        params = {"from": self.account, "required_confs": 0}
+        if step.gas_limit is not None:
+            params["gas_limit"] = step.gas_limit
+
+        step.nonce = nonces.next()
+        params["nonce"] = step.nonce
+        try:
+            if step.container is not None:
+                step.predicted = contract_address(
+                    self.account.address, step.nonce)
+                step.tx = step.container.deploy(*args, params)
+            else:
+                target = step.target.contract \
+                    if isinstance(step.target, Step) else step.target
+                step.tx = getattr(target, step.method)(*args, params)
+        except Exception as e:
+            # tx never left so free up its nonce for the next step
+            nonces.sync()
+            step.nonce = None
+            step.status = FAILED
+            step.error = str(e)
+            return False
+
+        step.status = SENT
+        step.sent_at = time.time()
+        return True
+
+    def _confirm(self, step: Step):
+        step.tx.wait(self.required_confs)
+        step.confirmed_at = time.time()
+        if step.tx.status != 1:
+            step.status = FAILED
+            step.error = "reverted"
+            return
+
+        if step.container is not None:
+            step.contract = step.container.at(step.tx.contract_address)
+        step.status = CONFIRMED
+
+        # the contract is live whether or not its source verifies, so a
+        # verification error must not fail the step or skip dependents
+        if step.container is not None and self.publish_source:
+            try:
+                step.container.publish_source(step.contract)
+            except Exception as e:
+                step.warning = f"source not verified: {e}"
+
+    def run(self, raise_on_failure: bool = True) -> List[Step]:
+        """
+        Sends all queued steps, respecting dependencies, and blocks until
+        every sent step has a receipt
+        """
+        start = time.time()
+        nonces = NonceManager(self.account)
+        with ThreadPoolExecutor() as pool:
+            pending = {}
+            while True:
+                sent = False
+                for step in self.steps:
+                    if step.status != QUEUED:
+                        continue
+                    ready = self._ready(step)
+                    if ready is None:
+                        step.status = SKIPPED
+                    elif ready and self._broadcast(step, nonces):
+                        pending[pool.submit(self._confirm, step)] = step
+                        sent = True
+                self.rounds += int(sent)
+
+                if len(pending) == 0:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = pending.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        step.status = FAILED
+                        step.error = str(e)
+
+        self.elapsed = time.time() - start
+        failed = [s for s in self.steps if s.status in (FAILED, SKIPPED)]
+        if raise_on_failure and len(failed) > 0:
+            raise RuntimeError("steps not confirmed: " + ", ".join(
+                f"{s.name} ({s.status}: {s.error})" for s in failed))
+        return self.steps
+
+    @property
+    def gas_used(self) -> int:
+        return sum(step.gas_used for step in self.steps)
+
+    def summary(self) -> List[str]:
+        """
+        Returns human readable lines with each step's outcome and the
+        total gas used and wall time taken
+        """
+        lines = []
+        for step in self.steps:
+            block = step.tx.block_number if step.tx is not None else None
+            line = f"{step.name}: {step.status} nonce={step.nonce} " \
+                f"block={block} gas={step.gas_used}"
+            if step.warning is not None:
+                line += f" ({step.warning})"
+            lines.append(line)
+        lines.append(f"total gas used: {self.gas_used}")
+        lines.append(f"wall time: {self.elapsed:.2f}s "
+                     f"over {self.rounds} rounds")
+        return lines
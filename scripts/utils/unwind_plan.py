@@ -0,0 +1,156 @@
+"""
+Splits a large unwind into slices spaced in time to trade price impact
+against price risk.
+
+An unwind's exit price is e**(-delta - lmbda * volume) off the bid (or
+e**(+...) off the ask for shorts), with volume the side's Roller volume
+including the unwind itself. Volume decays linearly to zero over the
+micro window through Roller.transform. Smaller slices spaced further
+apart see less volume, but leave the rest of the target exposed to the
+price for longer.
+
+Each candidate schedule is simulated with the exact reference unwind, so
+the Roller, impact, funding and 1bps fraction truncation match the
+contract. Price is held at the current feed data and other traders'
+volume is ignored. Schedules are scored as
+
+    proceeds - risk_aversion * sum(exposure**2 * volatility**2 * dt)
+             - gas_cost * slices
+
+where proceeds are the value less trading fees of every slice in OVL
+and exposure is the notional of the target not yet unwound.
+"""
+from typing import List, NamedTuple, Optional, Sequence
+
+from scripts.reference import position
+from scripts.reference.errors import Revert
+from scripts.reference.market import mid_from_feed, unwind
+from scripts.reference.position import Info
+from scripts.utils.impact import Market
+
+
+ONE = 10**18
+BPS = 10**14  # unwind keeps 4 decimals of the fraction given
+INTERVALS = (0., 0.125, 0.25, 0.5, 1.)  # fractions of the micro window
+
+
+class Slice(NamedTuple):
+    """
+    One unwind in a plan. fraction is the argument to unwind(), a fraction
+    of what remains of the position at the time
+    """
+    time: int  # seconds after the plan's start
+    fraction: int
+    price: int
+    value: int
+    trading_fee: int
+
+
+class Plan(NamedTuple):
+    """
+    Simulated schedule of unwinds and its score. Amounts in OVL
+    """
+    slices: List[Slice]
+    interval: int  # seconds between slices
+    proceeds: float  # value less trading fees
+    risk: float  # variance of exposure, OVL**2
+    score: float
+
+    @property
+    def average_price(self) -> float:
+        """
+        Value weighted exit price in feed units
+        """
+        value = sum(s.value for s in self.slices)
+        return sum(s.value * s.price for s in self.slices) / value / 1e18 \
+            if value > 0 else 0.
+
+
+def _target(fraction_remaining: int, fraction: int) -> int:
+    # fraction remaining (4 decimals) that unwinding fraction of the
+    # position in one go would remove
+    fraction -= fraction % BPS
+    return fraction_remaining - fraction_remaining * (ONE - fraction) // ONE
+
+
+def _slice_fraction(fraction_remaining: int, to_go: int,
+                    slices_left: int) -> int:
+    # unwind() fraction removing an equal share of to_go from the
+    # remaining position. the last slice lands exactly on the target if
+    # a 1bps fraction can, else rounds up past it
+    if slices_left == 1:
+        down = to_go * ONE // fraction_remaining // BPS * BPS
+        after = fraction_remaining * (ONE - down) // ONE
+        return down if after == fraction_remaining - to_go \
+            else min(down + BPS, ONE)
+    share = to_go // slices_left
+    return min(max(share * ONE // fraction_remaining // BPS * BPS, BPS), ONE)
+
+
+def simulate(market: Market, pos: Info, fraction: int, count: int,
+             interval: int, volatility: float = 0.,
+             risk_aversion: float = 0., gas_cost: float = 0.) -> Plan:
+    """
+    Simulates unwinding fraction of pos in count slices interval seconds
+    apart, starting at market.timestamp. volatility is per sqrt(second)
+    as a fraction of price. Raises Revert if any slice would revert
+    """
+    state, snapshots = market.state, market.snapshots
+    mid = mid_from_feed(market.data) / 1e18
+    slices, risk = [], 0.
+
+    to_go = _target(pos.fraction_remaining, fraction)
+    for i in range(count):
+        if to_go <= 0 or not position.exists(pos):
+            break
+        timestamp = market.timestamp + i * interval
+        if i > 0:
+            # variance of the target still to go over the last interval
+            funded = state.pay_funding(timestamp)
+            oi = position.oi_current(
+                pos, ONE, funded.oi_on_side(pos.is_long),
+                funded.oi_shares_on_side(pos.is_long)) / 1e18
+            exposure = oi * mid * to_go / pos.fraction_remaining
+            risk += exposure**2 * volatility**2 * interval
+
+        arg = _slice_fraction(pos.fraction_remaining, to_go, count - i)
+        u = unwind(state, snapshots, market.data, market.dp_upper_limit,
+                   timestamp, pos, arg)
+        to_go -= pos.fraction_remaining - u.position.fraction_remaining
+        slices.append(Slice(i * interval, u.fraction, u.price, u.value,
+                            u.trading_fee))
+        state, snapshots, pos = u.state, u.snapshots, u.position
+
+    proceeds = sum(s.value - s.trading_fee for s in slices) / 1e18
+    score = proceeds - risk_aversion * risk - gas_cost * len(slices)
+    return Plan(slices, interval, proceeds, risk, score)
+
+
+def plan(market: Market, pos: Info, fraction: int = ONE,
+         volatility: float = 0., risk_aversion: float = 0.,
+         gas_cost: float = 0., max_slices: int = 10,
+         intervals: Optional[Sequence[int]] = None) -> Plan:
+    """
+    Best scoring schedule to unwind fraction of pos, from 1 to max_slices
+    equal slices at each of intervals seconds apart, by default fractions
+    of the micro window. Raises Revert if even a single unwind of the
+    whole fraction would revert
+    """
+    if intervals is None:
+        window = market.data.micro_window
+        intervals = sorted({int(window * f) for f in INTERVALS})
+
+    best = simulate(market, pos, fraction, 1, 0, volatility,
+                    risk_aversion, gas_cost)
+    for count in range(2, max_slices + 1):
+        for interval in intervals:
+            try:
+                candidate = simulate(market, pos, fraction, count,
+                                     int(interval), volatility,
+                                     risk_aversion, gas_cost)
+            except Revert:
+                # e.g. liquidatable partway through the schedule
+                continue
+            if candidate.score > best.score:
+                best = candidate
+    return best
@@ -0,0 +1,129 @@
+"""
+Keeper side scheduling of OverlayV1Market.update() calls.
+
+update() pays the funding accrued since the market's last interaction
+in one step. Poking every market every block wastes gas on steps of a
+few wei, while leaving a market alone lets the pending step grow, and
+once 2 * k * elapsed reaches MAX_NATURAL_EXPONENT the funding factor
+drops straight to zero and the whole imbalance is paid at once. Each
+market is scored by the OVL value of its pending funding step, priced
+at the keeper's error_price, less the estimated gas cost, and the best
+pokes are chosen within a global gas budget per block.
+"""
+from typing import Iterable, List, NamedTuple, Optional
+
+from scripts.reference.market import (
+    MAX_NATURAL_EXPONENT, MarketState, data_is_valid
+)
+from scripts.reference.oracle import Data
+from scripts.reference.risk import Parameters, get
+from scripts.utils.liquidations import GasCurve
+
+
+ONE = 10**18
+
+# update() gas used when no measurements are available yet
+DEFAULT_UPDATE_GAS = 80000
+
+# fraction of the time to funding factor saturation after which a poke
+# is forced regardless of cost
+SATURATION_MARGIN = 0.5
+
+
+class Poke(NamedTuple):
+    market: str
+    elapsed: int  # seconds since the market's last update
+    step: int  # OVL notional of funding paid if updated now
+    gas: int  # estimated gas for update()
+    score: int  # step * error_price - gas * gas_price in native wei
+    forced: bool  # must be poked regardless of score
+
+
+def funding_step(state: MarketState, mid_price: int, timestamp: int) -> int:
+    """
+    OVL notional at mid price of the oi funding would move from the
+    overweight to the underweight side if the market were updated at
+    timestamp
+    """
+    paid = state.pay_funding(timestamp)
+    moved = abs(state.oi_long - paid.oi_long) \
+        + abs(state.oi_short - paid.oi_short)
+    return moved * mid_price // ONE // 2
+
+
+def saturation_time(state: MarketState) -> Optional[int]:
+    """
+    Seconds after the last update at which the funding factor saturates
+    to zero. None if k is zero
+    """
+    k = get(state.params, Parameters.K)
+    if k == 0:
+        return None
+    return MAX_NATURAL_EXPONENT // (2 * k)
+
+
+class UpdateScheduler:
+    """
+    Chooses which markets to update() each block. error_price is the
+    native wei the keeper will spend to settle 1 OVL (1e18) of pending
+    funding. Pokes are forced once elapsed exceeds max_interval or the
+    margin before funding factor saturation
+    """
+
+    def __init__(self, gas_price: int, error_price: int, gas_budget: int,
+                 max_interval: Optional[int] = None,
+                 gas_curve: Optional[GasCurve] = None):
+        self.gas_price = gas_price  # wei per gas
+        self.error_price = error_price  # native wei per 1e18 OVL
+        self.gas_budget = gas_budget  # max gas across pokes per block
+        self.max_interval = max_interval
+        self.gas_curve = gas_curve or GasCurve(default=DEFAULT_UPDATE_GAS)
+
+    def poke(self, market: str, state: MarketState, data: Data,
+             dp_upper_limit: int, mid_price: int,
+             timestamp: int) -> Optional[Poke]:
+        """
+        Scores updating market at timestamp. None if update() would
+        revert on invalid feed data or the market was updated this block
+        """
+        elapsed = timestamp - state.timestamp_update_last
+        if elapsed <= 0 or not data_is_valid(data, dp_upper_limit):
+            return None
+
+        step = funding_step(state, mid_price, timestamp)
+        gas = self.gas_curve.estimate(elapsed)
+        score = step * self.error_price // ONE - gas * self.gas_price
+
+        limits = [self.max_interval] if self.max_interval is not None \
+            else []
+        saturation = saturation_time(state)
+        if saturation is not None:
+            limits.append(int(saturation * SATURATION_MARGIN))
+        forced = any(elapsed >= limit for limit in limits)
+        return Poke(market, elapsed, step, gas, score, forced)
+
+    def schedule(self, pokes: Iterable[Optional[Poke]]) -> List[Poke]:
+        """
+        Forced pokes first, longest elapsed first, then pokes worth their
+        gas, highest score first, while within the gas budget
+        """
+        pokes = [p for p in pokes if p is not None]
+        forced = sorted((p for p in pokes if p.forced),
+                        key=lambda p: -p.elapsed)
+        optional = sorted((p for p in pokes if not p.forced and p.score > 0),
+                          key=lambda p: -p.score)
+
+        chosen = []
+        gas = 0
+        for p in forced + optional:
+            if gas + p.gas > self.gas_budget:
+                continue
+            chosen.append(p)
+            gas += p.gas
+        return chosen
+
+    def record(self, poke: Poke, gas_used: int):
+        """
+        Feeds back the gas used by a confirmed update()
+        """
+        self.gas_curve.add(poke.elapsed, gas_used)
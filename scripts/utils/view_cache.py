@@ -0,0 +1,198 @@
+"""
+Memoized view calls to markets, factories and feeds.
+
+Results are keyed on (block, address, selector, args), so every read of
+the same view at the same block after the first is served from memory.
+Entries older than max_age blocks behind the latest block seen are
+evicted. Two kinds of view outlive their block:
+
+- immutables (feed, ovl, factory and the feed windows) never change so
+  are cached permanently
+- params and dpUpperLimit only change with a ParamUpdated event from the
+  factory or a CacheRiskCalc event from the market, so are cached from
+  the block they were read at until one of those events is observed for
+  the market
+
+Hit and miss counters per view show how many RPC calls were saved.
+"""
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+IMMUTABLE = frozenset(("feed", "ovl", "factory", "microWindow",
+                       "macroWindow"))
+STICKY = frozenset(("params", "dpUpperLimit"))
+
+# events that change a market's sticky views, with the arg naming the
+# market if not emitted by it
+INVALIDATING_EVENTS = {"ParamUpdated": "market", "CacheRiskCalc": None}
+
+Key = Tuple[str, str, Tuple]  # (address, selector, args)
+
+
+def _hashable(value: Any) -> Any:
+    # struct and array args come as lists, possibly nested
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+def _key(address: str, selector: str, args: Tuple) -> Key:
+    return (address.lower(), selector, _hashable(args))
+
+
+class ViewCache:
+    """
+    Cache of view call results. Call advance(block) as blocks arrive to
+    evict entries older than max_age blocks, and observe(event) for
+    every event of the watched factories and markets up to that block
+    before reading at it
+    """
+
+    def __init__(self, max_age: int = 2):
+        self.max_age = max_age
+        self.latest: Optional[int] = None
+        self._blocks: "OrderedDict[int, Dict[Key, Any]]" = OrderedDict()
+        self._immutable: Dict[Key, Any] = {}
+        self._sticky: Dict[Key, Tuple[int, Any]] = {}
+        self._invalidated: Dict[str, int] = {}  # address -> last event block
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def advance(self, block: int):
+        """
+        Moves the latest block forward and evicts entries more than
+        max_age blocks behind it
+        """
+        if self.latest is None or block > self.latest:
+            self.latest = block
+        oldest = self.latest - self.max_age
+        while len(self._blocks) > 0 and next(iter(self._blocks)) < oldest:
+            self._blocks.popitem(last=False)
+
+    def invalidate(self, address: str, block: int):
+        """
+        Drops the sticky views of the market at address as of block
+        """
+        address = address.lower()
+        self._invalidated[address] = max(
+            block, self._invalidated.get(address, block))
+        for key in [k for k in self._sticky if k[0] == address]:
+            del self._sticky[key]
+
+    def observe(self, event) -> bool:
+        """
+        Invalidates sticky views if event, a decoded log with event,
+        address, args and block_number (or blockNumber), changes them.
+        Returns whether it did
+        """
+        name = getattr(event, "event", None)
+        if name not in INVALIDATING_EVENTS:
+            return False
+        arg = INVALIDATING_EVENTS[name]
+        address = event.address if arg is None else event.args[arg]
+        block = getattr(event, "block_number", None)
+        if block is None:
+            block = event.blockNumber
+        self.invalidate(address, block)
+        return True
+
+    def _lookup(self, name: str, block: int, key: Key) -> Tuple[bool, Any]:
+        if name in IMMUTABLE and key in self._immutable:
+            return True, self._immutable[key]
+        if name in STICKY and key in self._sticky:
+            read_at, value = self._sticky[key]
+            if read_at <= block:
+                return True, value
+        entries = self._blocks.get(block)
+        if entries is not None and key in entries:
+            return True, entries[key]
+        return False, None
+
+    def _store(self, name: str, block: int, key: Key, value: Any):
+        if name in IMMUTABLE:
+            self._immutable[key] = value
+        elif name in STICKY and block >= self._invalidated.get(key[0], 0):
+            self._sticky[key] = (block, value)
+        elif self.latest is None or block >= self.latest - self.max_age:
+            if block not in self._blocks:
+                self._blocks[block] = {}
+                if next(iter(self._blocks)) > block:
+                    # keep blocks in order for eviction from the front
+                    self._blocks = OrderedDict(sorted(self._blocks.items()))
+            self._blocks[block][key] = value
+
+    def get(self, block: int, address: str, name: str, selector: str,
+            args: Tuple, fetch: Callable[[], Any]) -> Any:
+        """
+        Returns the cached result of view name (selector) on address with
+        args at block, calling fetch() on a miss
+        """
+        key = _key(address, selector, args)
+        hit, value = self._lookup(name, block, key)
+        if hit:
+            self.hits[name] += 1
+            return value
+        self.misses[name] += 1
+        value = fetch()
+        self._store(name, block, key, value)
+        return value
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of calls served from the cache
+        """
+        hits = sum(self.hits.values())
+        total = hits + sum(self.misses.values())
+        return hits / total if total > 0 else 0.
+
+    def stats(self) -> Dict[str, Tuple[int, int]]:
+        """
+        (hits, misses) per view name, i.e. RPC calls saved and made
+        """
+        return {name: (self.hits[name], self.misses[name])
+                for name in sorted(set(self.hits) | set(self.misses))}
+
+    def report(self) -> str:
+        """
+        Hit rate and the hits and misses of each view, one per line
+        """
+        return "\n".join(
+            [f"View calls served from cache: {self.hit_rate:.1%}"]
+            + [f"{name}: {hits} hits, {misses} misses"
+               for name, (hits, misses) in self.stats().items()])
+
+
+class CachedContract:
+    """
+    Wraps a brownie contract so view calls go through cache. Calls
+    without a block_identifier are cached at the cache's latest block and
+    made as given, so within a brownie multicall they are batched at its
+    block. Advance the cache to the block being read first
+    """
+
+    def __init__(self, contract, cache: ViewCache):
+        self._contract = contract
+        self._cache = cache
+        self.address = contract.address
+
+    def __getattr__(self, name: str):
+        method = getattr(self._contract, name)
+        abi = getattr(method, "abi", None)
+        if abi is None or abi.get("stateMutability") not in ("view",
+                                                             "pure"):
+            return method
+        selector = method.signature
+
+        def call(*args: Any, block_identifier: Optional[int] = None):
+            if block_identifier is not None:
+                block = block_identifier
+                kwargs = {"block_identifier": block_identifier}
+            else:
+                block, kwargs = self._cache.latest, {}
+            if block is None:
+                raise ValueError("cache has no latest block, call advance")
+            return self._cache.get(block, self.address, name, selector,
+                                   args, lambda: method(*args, **kwargs))
+        return call
@@ -0,0 +1,96 @@
+"""
+Planning of OverlayV1Market.emergencyWithdraw() calls after shutdown.
+
+Once a market is shut down each position owner withdraws the position's
+remaining cost (notional - debt), capped at the market's OVL balance at
+the time of the call. If the balance doesn't cover everything owed, the
+withdrawals submitted first are paid in full and the rest get whatever
+is left, so the order of submission decides who is made whole.
+"""
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from scripts.reference import position
+from scripts.reference.position import Info
+
+
+ONE = 10**18
+
+
+class Withdrawal(NamedTuple):
+    owner: str
+    position_id: int
+    cost: int  # owed to owner = Position.cost(ONE)
+    amount: int  # paid when submitted in plan order. < cost if short
+
+
+class Plan(NamedTuple):
+    """
+    Withdrawals in submission order, with the market's OVL balance
+    before any are made
+    """
+    balance: int
+    withdrawals: List[Withdrawal]
+
+    @property
+    def owed(self) -> int:
+        return sum(w.cost for w in self.withdrawals)
+
+    @property
+    def shortfall(self) -> int:
+        """
+        OVL owed in excess of the market's balance
+        """
+        return max(self.owed - self.balance, 0)
+
+    @property
+    def remaining(self) -> int:
+        """
+        OVL left in the market once every withdrawal is made
+        """
+        return max(self.balance - self.owed, 0)
+
+    def by_owner(self) -> Dict[str, List[Withdrawal]]:
+        """
+        Withdrawals grouped by owner, since only the owner of a position
+        can withdraw it. Each owner's withdrawals keep plan order
+        """
+        owners = defaultdict(list)
+        for w in self.withdrawals:
+            owners[w.owner].append(w)
+        return dict(owners)
+
+
+def largest_first(owner: str, id: int, cost: int) -> Tuple:
+    """
+    Default priority: most OVL recovered per transaction first
+    """
+    return (-cost, owner.lower(), id)
+
+
+def plan(position_ids: Sequence[Tuple[str, int]], positions: Sequence[Info],
+         balance: int,
+         priority: Callable[[str, int, int], Tuple] = largest_first) -> Plan:
+    """
+    Plans emergency withdrawals for positions, the Position.Info read for
+    each (owner, positionId), given the market's OVL balance. Closed and
+    liquidated positions and positions with nothing to withdraw are left
+    out. Mirrors the amounts in OverlayV1Market.emergencyWithdraw
+    """
+    owed = []
+    for (owner, id), pos in zip(position_ids, positions):
+        if not position.exists(pos):
+            continue
+        cost = position.cost(pos, ONE)
+        if cost == 0:
+            continue
+        owed.append((owner, id, cost))
+    owed.sort(key=lambda o: priority(*o))
+
+    withdrawals = []
+    left = balance
+    for owner, id, cost in owed:
+        amount = min(left, cost)
+        left -= amount
+        withdrawals.append(Withdrawal(owner, id, cost, amount))
+    return Plan(balance, withdrawals)
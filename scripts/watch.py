@@ -0,0 +1,73 @@
+import asyncio
+import click
+
+from brownie import OverlayV1Factory, network, web3
+
+from scripts.create import FACTORY
+from scripts.utils.engine import Engine, poll_blocks
+from scripts.utils.position_book import to_array
+from scripts.utils.reads import (
+    load_invalidations, load_markets, load_position_ids,
+    read_markets_with_positions
+)
+from scripts.utils.view_cache import CachedContract, ViewCache
+
+
+def main(from_block=0, funding_tolerance=1e-6, multicall_address=None):
+    """
+    Watches every market deployed by the factory, recomputing quotes,
+    funding projections and position valuations only when their inputs
+    changed since the last block. Prints derived values as they change.
+    View calls go through a cache whose hit rate is printed on exit.
+
+    Run with `brownie run watch main [from_block]`.
+    """
+    click.echo(f"You are using the '{network.show_active()}' network")
+    factory = OverlayV1Factory.at(FACTORY)
+    cache = ViewCache()
+    markets = [(CachedContract(market, cache), CachedContract(feed, cache))
+               for market, feed in load_markets(factory, int(from_block))]
+    ids = [[] for _ in markets]
+    scanned = [int(from_block) - 1]
+
+    def read(block):
+        cache.advance(block.number)
+        for event in load_invalidations(factory, [m for m, _ in markets],
+                                        scanned[0] + 1, block.number):
+            cache.observe(event)
+
+        # only scan for positions built since the last block read
+        for (market, _), market_ids in zip(markets, ids):
+            market_ids += load_position_ids(market, scanned[0] + 1,
+                                            to_block=block.number)
+        scanned[0] = block.number
+
+        reads = read_markets_with_positions(markets, ids, block.number,
+                                            multicall_address)
+        return {read.market: {
+            "data": read.data,
+            "dp_upper_limit": read.dp_upper_limit,
+            "state": read.state,
+            "snapshots": read.snapshots,
+            "positions": to_array([(o, i, info) for (o, i), info
+                                   in zip(market_ids, infos)]),
+            "timestamp": block.timestamp
+        } for (read, infos), market_ids in zip(reads, ids)}
+
+    def on_change(block, market, graph, changed):
+        for name in changed:
+            if name in ("valid", "quotes", "funding_rate", "liquidatable"):
+                click.echo(f"[{block.number}] {market} {name}: "
+                           f"{graph[name]}")
+
+    async def blocks_read(block):
+        # reads are blocking rpc calls. run off the event loop
+        return await asyncio.to_thread(read, block)
+
+    engine = Engine(blocks_read, on_change, float(funding_tolerance))
+    click.echo(f"Watching {len(markets)} markets")
+    try:
+        asyncio.run(engine.run(poll_blocks(web3)))
+    finally:
+        click.echo(f"Skipped {engine.hit_rate:.1%} of recomputations")
+        click.echo(cache.report())
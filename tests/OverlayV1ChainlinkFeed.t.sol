@@ -62,4 +62,25 @@ contract MarketTest is Test {
         vm.expectRevert();
         feed.setHeartbeat(60 minutes);
     }
+
+    function testSetRounds() public {
+        uint80[] memory roundIds = new uint80[](3);
+        int256[] memory answers = new int256[](3);
+        uint256[] memory updatedAts = new uint256[](3);
+        for (uint256 i = 0; i < 3; i++) {
+            roundIds[i] = uint80(i + 1);
+            answers[i] = int256(100 + i);
+            updatedAts[i] = block.timestamp - 2 hours + i * 1 hours;
+        }
+        aggregator.setRounds(roundIds, answers, updatedAts);
+
+        (uint80 roundId, int256 answer,, uint256 updatedAt,) = aggregator.latestRoundData();
+        assertEq(roundId, 3);
+        assertEq(answer, 102);
+        assertEq(updatedAt, block.timestamp);
+
+        // micro window is entirely the latest round
+        skip(15 minutes);
+        assertEq(feed.latest().priceOverMicroWindow, 102e18 / 1e8);
+    }
 }
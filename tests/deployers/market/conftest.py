@@ -29,17 +29,17 @@ def rando(accounts):
 
 @pytest.fixture(scope="module")
 def minter_role():
-    yield web3.solidityKeccak(['string'], ["MINTER"])
+    yield web3.solidity_keccak(['string'], ["MINTER"])
 
 
 @pytest.fixture(scope="module")
 def burner_role():
-    yield web3.solidityKeccak(['string'], ["BURNER"])
+    yield web3.solidity_keccak(['string'], ["BURNER"])
 
 
 @pytest.fixture(scope="module")
 def governor_role():
-    yield web3.solidityKeccak(['string'], ["GOVERNOR"])
+    yield web3.solidity_keccak(['string'], ["GOVERNOR"])
 
 
 @pytest.fixture(scope="module", params=[88888888])
@@ -27,7 +27,7 @@ def rando(accounts):
 
 @pytest.fixture(scope="module")
 def minter_role():
-    yield web3.solidityKeccak(['string'], ["MINTER"])
+    yield web3.solidity_keccak(['string'], ["MINTER"])
 
 
 @pytest.fixture(scope="module")
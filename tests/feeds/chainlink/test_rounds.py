@@ -0,0 +1,46 @@
+import brownie
+
+from brownie import chain
+from pytest import approx
+
+from scripts.utils.rounds import load, shift, synthetic
+
+
+def test_set_rounds(mock_aggregator, gov):
+    mock_aggregator.setRounds([1, 2, 3], [10e8, 11e8, 12e8],
+                              [100, 200, 300], {"from": gov})
+    assert mock_aggregator.latestRoundId() == 3
+    assert mock_aggregator.getRoundData(2) == (2, 11e8, 200, 200, 2)
+    assert mock_aggregator.latestRoundData() == (3, 12e8, 300, 300, 3)
+
+
+def test_set_rounds_reverts_on_length_mismatch(mock_aggregator, gov):
+    with brownie.reverts("AggregatorMock: length mismatch"):
+        mock_aggregator.setRounds([1, 2], [10e8], [100, 200],
+                                  {"from": gov})
+
+
+def test_latest_from_bulk_history(mock_aggregator, chainlink_feed, gov):
+    # two days of history loaded in a few txs, ending at the next block
+    now = chain.time()
+    rounds = shift(synthetic(0, 2 * 86400, 2000., 0.8, seed=7), now)
+    txs = load(mock_aggregator, rounds, gov)
+    assert len(txs) < 10
+
+    chain.mine(timestamp=now + 60)
+    data = chainlink_feed.latest()
+    timestamp = data[0]
+
+    # time weighted average of answers over the trailing window
+    def average(window):
+        total, end = 0, timestamp
+        for r in reversed(rounds):
+            start = max(r.updated_at, timestamp - window)
+            total += (end - start) * r.answer
+            end = start
+            if start == timestamp - window:
+                break
+        return total * 10**10 / window
+
+    assert data[3] == approx(average(600))
+    assert data[4] == approx(average(3600))
@@ -0,0 +1,34 @@
+from brownie import chain
+
+from scripts.utils.feed_driver import FeedDriver
+from scripts.utils.price_path import from_series
+
+
+def test_play_packs_calls_per_block(feed, rando):
+    price = feed.price()
+    reserve = feed.reserve()
+    driver = FeedDriver(feed, rando)
+    start = driver.start
+
+    steps = from_series([0, 60, 120, 180],
+                        [price * 2, price * 2, price * 3, price],
+                        [reserve * 2, None, reserve * 3, None])
+    seen = []
+
+    def on_block(block, number):
+        # feed reports the step's values from the block it was mined in
+        data = feed.latest()
+        seen.append((number, chain[number].timestamp, data[3], data[6]))
+
+    numbers = driver.play(steps, on_block)
+
+    # one block per changed step, not one per call
+    assert len(numbers) == 3
+    assert numbers == list(range(numbers[0], numbers[0] + 3))
+    assert [s[1] - start for s in seen] == [0, 120, 180]
+    assert [(s[2], s[3]) for s in seen] == [
+        (price * 2, reserve * 2),
+        (price * 3, reserve * 3),
+        (price, reserve * 3),
+    ]
+    assert len(chain[numbers[0]].transactions) == 2
@@ -23,9 +23,9 @@ def rando(accounts):
 
 
 @pytest.fixture(scope="module")
-def create_cast(alice):
+def create_cast(alice, deploy):
     def create_cast():
-        cast = alice.deploy(CastMock)
+        cast = deploy(CastMock, alice)
         return cast
     yield create_cast
 
@@ -0,0 +1,166 @@
+import os
+import pytest
+
+from brownie.exceptions import VirtualMachineError
+
+from scripts.reference.errors import Revert
+from scripts.reference.mocks import MOCKS
+from scripts.utils.abi import abi_type, in_range, normalize
+
+
+# backend the library mocks run on:
+#   "brownie" deploys them to the development node
+#   "evm" executes them in an in-process EVM, no RPC round trip per call
+#   "reference" calls the Python reference implementations instead
+#   "parity" deploys to the node and asserts every call returns, or
+#   reverts, the same as the reference implementations
+BACKEND = os.environ.get("LIBRARY_BACKEND", "brownie")
+
+# errors the reference implementations raise where the contracts panic
+PANICS = (ValueError, IndexError, KeyError, ZeroDivisionError,
+          OverflowError)
+
+
+def _virtual_machine_error(reason):
+    # brownie.reverts only catches VirtualMachineError itself, which is
+    # built from a node's error response, so set its fields directly
+    err = VirtualMachineError.__new__(VirtualMachineError)
+    err.txid = ""
+    err.source = ""
+    err.revert_type = "revert"
+    err.pc = None
+    err.revert_msg = reason
+    err.dev_revert_msg = None
+    err.message = "revert" if reason is None else f"revert: {reason}"
+    Exception.__init__(err, err.message)
+    return err
+
+
+class InProcessMock:
+    """
+    Mock deployed to the in-process EVM, raising reverts as brownie does
+    """
+
+    def __init__(self, contract):
+        self._contract = contract
+        self.address = contract.address
+
+    def __getattr__(self, name):
+        fn = getattr(self._contract, name)
+
+        def call(*args):
+            try:
+                return fn(*args)
+            except Revert as e:
+                raise _virtual_machine_error(e.reason) from None
+        return call
+
+
+class ReferenceMock:
+    """
+    Reference implementation of a mock called with the mock's ABI: args
+    are coerced as brownie would, and errors and results out of range of
+    the output type are raised as reverts, as the contract would panic
+    """
+
+    def __init__(self, reference, abi):
+        self._reference = reference
+        self._abi = {i["name"]: i for i in abi if i.get("type") == "function"}
+
+    def __getattr__(self, name):
+        fn = getattr(self._reference, name)
+        abi = self._abi[name]
+        inputs = [abi_type(i) for i in abi["inputs"]]
+        outputs = [abi_type(o) for o in abi["outputs"]]
+
+        def call(*args):
+            if len(args) == len(inputs) + 1 and isinstance(args[-1], dict):
+                args = args[:-1]  # tx params
+            args = [normalize(t, a) for t, a in zip(inputs, args)]
+            try:
+                result = fn(*args)
+            except Revert as e:
+                raise _virtual_machine_error(e.reason) from None
+            except PANICS:
+                raise _virtual_machine_error(None) from None
+            if len(outputs) == 1 and not in_range(outputs[0], result):
+                raise _virtual_machine_error(None)
+            return result
+        return call
+
+
+class ParityMock:
+    """
+    Calls a deployed mock and its reference, asserting they agree.
+    Returns the deployed mock's result
+    """
+
+    def __init__(self, mock, reference):
+        self._mock = mock
+        self._reference = reference
+        self.address = mock.address
+
+    def __getattr__(self, name):
+        mock_fn = getattr(self._mock, name)
+        reference_fn = getattr(self._reference, name)
+
+        def call(*args):
+            try:
+                expect = reference_fn(*args)
+            except VirtualMachineError as e:
+                expect = e
+            try:
+                actual = mock_fn(*args)
+            except VirtualMachineError as e:
+                assert isinstance(expect, VirtualMachineError), \
+                    f"{name}{args} reverted ({e.revert_msg}) on chain " \
+                    f"but returned {expect} in reference"
+                if e.revert_msg is not None and expect.revert_msg is not None:
+                    assert e.revert_msg == expect.revert_msg, \
+                        f"{name}{args} revert reasons differ"
+                raise
+            assert not isinstance(expect, VirtualMachineError), \
+                f"{name}{args} returned {actual} on chain but reverted " \
+                f"({expect.revert_msg}) in reference"
+            if not isinstance(actual, dict):
+                # transactions return receipts, only views are compared
+                assert _comparable(actual) == _comparable(expect), \
+                    f"{name}{args} returned {actual} on chain but " \
+                    f"{expect} in reference"
+            return actual
+        return call
+
+
+def _comparable(value):
+    # brownie return values and reference NamedTuples as plain tuples
+    if isinstance(value, (list, tuple)):
+        return tuple(_comparable(v) for v in value)
+    return value
+
+
+@pytest.fixture(scope="session")
+def deploy():
+    """
+    Deploys a mock contract container from account to the backend
+    """
+    if BACKEND == "brownie":
+        def deploy(container, account):
+            return account.deploy(container)
+    elif BACKEND == "evm":
+        from scripts.utils.evm import EVM
+        evm = EVM()
+
+        def deploy(container, account):
+            return InProcessMock(evm.deploy(container.abi,
+                                            container.bytecode))
+    elif BACKEND == "reference":
+        def deploy(container, account):
+            return ReferenceMock(MOCKS[container._name](), container.abi)
+    elif BACKEND == "parity":
+        def deploy(container, account):
+            return ParityMock(
+                account.deploy(container),
+                ReferenceMock(MOCKS[container._name](), container.abi))
+    else:
+        raise ValueError(f"unknown LIBRARY_BACKEND {BACKEND}")
+    yield deploy
@@ -23,9 +23,9 @@ def rando(accounts):
 
 
 @pytest.fixture(scope="module")
-def create_fixed_cast(alice):
+def create_fixed_cast(alice, deploy):
     def create_fixed_cast():
-        fixed_cast = alice.deploy(FixedCastMock)
+        fixed_cast = deploy(FixedCastMock, alice)
         return fixed_cast
     yield create_fixed_cast
 
@@ -23,9 +23,9 @@ def rando(accounts):
 
 
 @pytest.fixture(scope="module")
-def create_fixed_point(alice):
+def create_fixed_point(alice, deploy):
     def create_fixed_point():
-        fixed_point = alice.deploy(FixedPointMock)
+        fixed_point = deploy(FixedPointMock, alice)
         return fixed_point
     yield create_fixed_point
 
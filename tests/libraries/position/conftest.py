@@ -23,9 +23,9 @@ def rando(accounts):
 
 
 @pytest.fixture(scope="module")
-def create_position(alice):
+def create_position(alice, deploy):
     def create_position():
-        position = alice.deploy(PositionMock)
+        position = deploy(PositionMock, alice)
         return position
     yield create_position
 
@@ -23,9 +23,9 @@ def rando(accounts):
 
 
 @pytest.fixture(scope="module")
-def create_risk(alice):
+def create_risk(alice, deploy):
     def create_risk():
-        risk = alice.deploy(RiskMock)
+        risk = deploy(RiskMock, alice)
         return risk
     yield create_risk
 
@@ -23,9 +23,9 @@ def rando(accounts):
 
 
 @pytest.fixture(scope="module")
-def create_roller(alice):
+def create_roller(alice, deploy):
     def create_roller():
-        roller = alice.deploy(RollerMock)
+        roller = deploy(RollerMock, alice)
         return roller
     yield create_roller
 
@@ -23,9 +23,9 @@ def rando(accounts):
 
 
 @pytest.fixture(scope="module")
-def create_tick_mock(alice):
+def create_tick_mock(alice, deploy):
     def create_tick_mock():
-        tick_mock = alice.deploy(TickMock)
+        tick_mock = deploy(TickMock, alice)
         return tick_mock
     yield create_tick_mock
 
@@ -0,0 +1,39 @@
+from brownie import chain
+
+from scripts.reference.market import MarketState
+from scripts.reference.oracle import Data
+from scripts.reference.position import Info, get_key
+from scripts.reference.roller import Snapshot
+from scripts.utils import checkpoint
+from scripts.utils.seeding import seed
+
+
+def test_seed_checkpoint(mock_market, mock_feed, gov, alice, tmp_path):
+    params = [mock_market.params(i) for i in range(15)]
+    params[0] = 2 * params[0]
+    state = MarketState(params, 3 * 10**18, 10**18, 3 * 10**18, 10**18,
+                        1000)
+    snapshots = (Snapshot(900, 600, 10**17), Snapshot(0, 0, 0),
+                 Snapshot(950, 2592000, -5 * 10**18))
+    data = Data(1000, 600, 1800, 2 * 10**18, 2 * 10**18, 2 * 10**18,
+                10**24, True)
+    pos = Info(10**18, 5 * 10**17, -10, -12, True, False, 3 * 10**18, 10000)
+    path = str(tmp_path / "market.ckpt")
+    checkpoint.write(path, mock_market.address, 1, 1000, state, snapshots,
+                     data, 10**18 + 1, [(alice.address, 4, pos)])
+
+    seed(mock_market, checkpoint.load(path), mock_feed, gov)
+    shift = chain[-1].timestamp - 1000
+
+    # getters read back the checkpoint
+    assert [mock_market.params(i) for i in range(15)] == params
+    assert mock_market.oiLong() == state.oi_long
+    assert mock_market.oiShortShares() == state.oi_short_shares
+    assert mock_market.timestampUpdateLast() == 1000 + shift
+    assert mock_market.dpUpperLimit() == 10**18 + 1
+    assert mock_market.snapshotVolumeBid() == (900 + shift, 600, 10**17)
+    assert mock_market.snapshotVolumeAsk() == (0, 0, 0)
+    assert mock_market.snapshotMinted() == (950 + shift, 2592000,
+                                            -5 * 10**18)
+    assert mock_market.positions(get_key(alice.address, 4)) == tuple(pos)
+    assert mock_feed.price() == data.price_over_micro_window
@@ -42,7 +42,7 @@ def get_position_key(owner: str, id: int) -> HexBytes:
     Returns the position key to retrieve an individual position
     from positions mapping
     """
-    return web3.solidityKeccak(['address', 'uint256'], [owner, id])
+    return web3.solidity_keccak(['address', 'uint256'], [owner, id])
 
 
 def mid_from_feed(data: Any) -> float:
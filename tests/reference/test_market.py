@@ -0,0 +1,107 @@
+import pytest
+
+from math import exp
+from pytest import approx
+
+from scripts.reference.errors import Revert
+from scripts.reference.market import (
+    MarketState, ask, back_run_bound, bid, build,
+    cap_notional_adjusted_for_bounds, cap_oi_adjusted_for_circuit_breaker,
+    circuit_breaker, dp_upper_limit, front_run_bound, register_volume, unwind
+)
+from scripts.reference.oracle import Data
+from scripts.reference.roller import Snapshot
+from utils.helpers import PARAMS
+
+
+DATA = Data(1643583611, 600, 3600, 2000000000000000000000,
+            2010000000000000000000, 2000000000000000000000,
+            400000000000000000000000, True)
+
+
+def test_bid_ask():
+    volume = 100000000000000000  # 10% of cap
+    expect_bid = 2000 * exp(-0.0025 - 0.1)
+    expect_ask = 2010 * exp(0.0025 + 0.1)
+    assert bid(PARAMS, DATA, volume) / 1e18 == approx(expect_bid)
+    assert ask(PARAMS, DATA, volume) / 1e18 == approx(expect_ask)
+    assert bid(PARAMS, DATA, volume) <= bid(PARAMS, DATA, 0)
+    assert ask(PARAMS, DATA, volume) >= ask(PARAMS, DATA, 0)
+
+
+def test_cap_notional_adjusted_for_bounds():
+    cap = PARAMS[4]
+    assert front_run_bound(PARAMS, DATA) == DATA.reserve_over_micro_window
+
+    # 3600s / 12ms blocks * 2 * delta
+    expect = 400000 * 3600 / 0.012 * 2 * 0.0025
+    assert back_run_bound(PARAMS, DATA) / 1e18 == approx(expect)
+
+    assert cap_notional_adjusted_for_bounds(PARAMS, DATA, cap) \
+        == front_run_bound(PARAMS, DATA)
+    assert cap_notional_adjusted_for_bounds(
+        PARAMS, DATA._replace(has_reserve=False), cap) == cap
+
+
+def test_circuit_breaker():
+    cap = 10**24
+    target = PARAMS[7]
+    assert circuit_breaker(PARAMS, Snapshot(0, 0, target), cap) == cap
+    assert circuit_breaker(PARAMS, Snapshot(0, 0, 2 * target), cap) == 0
+    assert circuit_breaker(PARAMS, Snapshot(0, 0, 3 * target // 2), cap) \
+        == cap // 2
+
+    # minted decays linearly over the window
+    window = PARAMS[6]
+    snapshot = Snapshot(0, window, 3 * target)
+    assert cap_oi_adjusted_for_circuit_breaker(
+        PARAMS, snapshot, window // 3, cap) == 0
+    assert cap_oi_adjusted_for_circuit_breaker(
+        PARAMS, snapshot, window // 2, cap) == approx(cap // 2, rel=1e-6)
+    assert cap_oi_adjusted_for_circuit_breaker(
+        PARAMS, snapshot, window, cap) == cap
+
+
+def test_register_volume():
+    cap = 10**20
+    snapshot = register_volume(Snapshot(0, 0, 0), DATA, 100, cap // 10, cap)
+    assert snapshot == Snapshot(100, DATA.micro_window, 10**17)
+
+    # half the micro window later half the volume remains
+    snapshot = register_volume(snapshot, DATA, 400, cap // 10, cap)
+    assert snapshot.accumulator == 10**17 // 2 + 10**17
+
+
+def test_build_unwind_round_trip():
+    state = MarketState(PARAMS, 0, 0, 0, 0, 0)
+    snapshots = (Snapshot(0, 0, 0),) * 3
+    upper = dp_upper_limit(PARAMS[13], 3600)
+    built = build(state, snapshots, DATA, upper, 1000, 10**20, 2 * 10**18,
+                  True)
+    assert built.state.oi_long == built.oi
+    assert built.state.oi_long_shares == built.position.oi_shares
+    assert built.trading_fee == 2 * 10**20 * PARAMS[11] // 10**18
+
+    with pytest.raises(Revert, match="OVLV1:lev>max"):
+        build(state, snapshots, DATA, upper, 1000, 10**20, 6 * 10**18, True)
+    with pytest.raises(Revert, match="OVLV1:slippage>max"):
+        build(state, snapshots, DATA, upper, 1000, 10**20, 2 * 10**18,
+              True, built.price - 1)
+
+    # unwind half then the rest. fraction truncated to 1bps
+    half = unwind(built.state, built.snapshots, DATA, upper, 1000,
+                  built.position, 5 * 10**17 + 12345)
+    assert half.fraction == 5 * 10**17
+    assert half.position.fraction_remaining == 5000
+    rest = unwind(half.state, half.snapshots, DATA, upper, 1000,
+                  half.position, 10**18)
+    assert rest.position.fraction_remaining == 0
+    assert rest.position.oi_shares == 0
+    assert rest.state.oi_long_shares == 0
+    assert rest.state.oi_long == 0
+
+    # exits at the bid after paying the spread both ways
+    assert half.value + rest.value < 10**20
+    with pytest.raises(Revert, match="OVLV1:!position"):
+        unwind(rest.state, rest.snapshots, DATA, upper, 1000,
+               rest.position, 10**18)
@@ -0,0 +1,48 @@
+import pytest
+
+from scripts.reference.mocks import MOCKS, PositionMock, RiskMock, RollerMock
+from scripts.reference.position import Info, get_key
+from scripts.reference.risk import NUM_PARAMETERS, Parameters
+from scripts.reference.roller import Snapshot
+
+
+def test_mocks_named_after_contracts():
+    assert set(MOCKS) == {"CastMock", "FixedCastMock", "FixedPointMock",
+                          "TickMock", "RollerMock", "RiskMock",
+                          "PositionMock"}
+
+
+def test_roller_mock_takes_tuple():
+    mock = RollerMock()
+    actual = mock.transform((1000, 1000, 200000000000000000), 2000, 600,
+                            500000000000000000)
+    assert actual == Snapshot(2000, 600, 500000000000000000)
+    assert mock.cumulative((1000, 1000, 42)) == 42
+
+
+def test_risk_mock_set_and_get():
+    mock = RiskMock()
+    mock.set(Parameters.K, 1220000000000)
+    assert mock.get(Parameters.K) == 1220000000000
+    assert mock.params(int(Parameters.K)) == 1220000000000
+    assert mock.getEnumFromUint(1) == int(Parameters(1))
+
+
+def test_risk_mock_reverts_when_invalid_enum():
+    mock = RiskMock()
+    with pytest.raises(ValueError):
+        mock.getEnumFromUint(NUM_PARAMETERS)
+    with pytest.raises(ValueError):
+        mock.get(NUM_PARAMETERS)
+
+
+def test_position_mock_set_and_get():
+    mock = PositionMock()
+    owner = "0x" + "11" * 20
+    pos = (10**18, 0, 0, 0, True, False, 10**18, 10000)
+    mock.set(owner, 1, pos)
+
+    assert mock.get(owner, 1) == Info(*pos)
+    assert mock.positions(get_key(owner, 1)) == Info(*pos)
+    assert mock.get(owner, 2) == Info(0, 0, 0, 0, False, False, 0, 0)
+    assert mock.exists(pos)
@@ -0,0 +1,39 @@
+from scripts.reference.cast import INT192_MAX, UINT32_MAX
+from scripts.reference.roller import Snapshot, transform
+
+
+def test_transform_when_last_window_passed():
+    snap = Snapshot(1000, 1000, 200000000000000000)
+    actual = transform(snap, 2000, 600, 500000000000000000)
+    assert actual == Snapshot(2000, 600, 500000000000000000)
+
+
+def test_transform_decays_linearly():
+    snap = Snapshot(1000, 1000, 200000000000000000)
+    actual = transform(snap, 1250, 600, 500000000000000000)
+
+    # 3/4 of the last accumulator remains
+    decayed = 150000000000000000
+    assert actual.accumulator == decayed + 500000000000000000
+    assert actual.window == (decayed * 750 + 500000000000000000 * 600) \
+        // (decayed + 500000000000000000)
+
+
+def test_transform_rounds_toward_zero():
+    snap = Snapshot(0, 3, -10)
+    actual = transform(snap, 1, 3, 0)
+
+    # -10 * 2 / 3 = -6.67 truncates to -6
+    assert actual.accumulator == -6
+
+
+def test_transform_when_accumulator_now_zero():
+    snap = Snapshot(0, 1000, 100)
+    actual = transform(snap, 500, 600, -50)
+    assert actual == Snapshot(500, 600, 0)
+
+
+def test_transform_bounds_and_wraps():
+    snap = Snapshot(2**32 - 10, 100, 0)
+    actual = transform(snap, 2**32 + 10, 2**40, 2**200)
+    assert actual == Snapshot(10, UINT32_MAX, INT192_MAX)
@@ -0,0 +1,93 @@
+from decimal import Decimal
+from pytest import approx
+
+from scripts.reference.market import dp_upper_limit, max_leverage
+from scripts.reference.risk import Parameters
+from scripts.reference.validation import (
+    cached_risk_calcs, deploy_market_errors, filter_valid, is_valid,
+    set_risk_param_errors
+)
+from utils.helpers import PARAMS as DEFAULT_PARAMS
+
+
+# params used for markets deployed in tests/factories/market/conftest.py
+PARAMS = list(DEFAULT_PARAMS)
+PARAMS[Parameters.CapLeverage] = 2000000000000000000
+PARAMS[Parameters.AverageBlockTime] = 250
+MACRO_WINDOW = 3600
+
+
+def with_param(name, value):
+    params = list(PARAMS)
+    params[name] = value
+    return params
+
+
+def test_deploy_market_errors_when_valid():
+    assert deploy_market_errors(PARAMS, MACRO_WINDOW) == []
+    assert is_valid(PARAMS, MACRO_WINDOW)
+
+
+def test_deploy_market_errors_reports_all_factory_bounds():
+    params = with_param(Parameters.K, 4000000000001)
+    params[Parameters.AverageBlockTime] = 99
+    expect = [(Parameters.K, "OVLV1: param out of bounds"),
+              (Parameters.AverageBlockTime, "OVLV1: param out of bounds")]
+    assert deploy_market_errors(params, MACRO_WINDOW) == expect
+
+
+def test_deploy_market_errors_when_max_lev_immediately_liquidatable():
+    # max leverage given delta, mm and liq fee rate is ~ 1/(0.005+0.0101)
+    cap = max_leverage(PARAMS[Parameters.Delta],
+                       PARAMS[Parameters.MaintenanceMarginFraction],
+                       PARAMS[Parameters.LiquidationFeeRate])
+    assert int(cap) == approx(1e18 / (0.005 + 0.01 / 0.99))
+
+    # 67x is within factory bounds but exceeds max leverage
+    params = with_param(Parameters.CapLeverage, 67 * 10**18)
+    expect = [(None, "OVLV1: max lev immediately liquidatable")]
+    assert deploy_market_errors(params, MACRO_WINDOW) == expect
+
+    params = with_param(Parameters.CapLeverage, cap)
+    assert deploy_market_errors(params, MACRO_WINDOW) == []
+
+
+def test_deploy_market_errors_when_price_drift_exceeds_max_exp():
+    # 1 bps/s over 200000s macro window hits MAX_NATURAL_EXPONENT = 20
+    params = with_param(Parameters.PriceDriftUpperLimit, 10**14)
+    expect = [(None, "OVLV1: price drift exceeds max exp")]
+    assert deploy_market_errors(params, 200000) == expect
+    assert deploy_market_errors(params, 199999) == []
+
+
+def test_set_risk_param_errors():
+    name = Parameters.Delta
+    assert set_risk_param_errors(PARAMS, name, 200 * 10**14,
+                                 MACRO_WINDOW) == []
+
+    params = with_param(Parameters.CapLeverage, 20 * 10**18)
+    expect = [(name, "OVLV1: max lev immediately liquidatable")]
+    assert set_risk_param_errors(params, name, 200 * 10**14,
+                                 MACRO_WINDOW) == expect
+
+    expect = [(name, "OVLV1: param out of bounds")]
+    assert set_risk_param_errors(PARAMS, name, 201 * 10**14,
+                                 MACRO_WINDOW) == expect
+
+
+def test_filter_valid():
+    sweep = [with_param(Parameters.CapLeverage, lev * 10**18)
+             for lev in range(1, 100)]
+    valid = filter_valid(sweep, MACRO_WINDOW)
+    assert [p[Parameters.CapLeverage] // 10**18 for p in valid] \
+        == list(range(1, 67))
+
+
+def test_dp_upper_limit():
+    pdul = PARAMS[Parameters.PriceDriftUpperLimit]
+    expect = int((Decimal(pdul * MACRO_WINDOW) / Decimal(1e18)).exp()
+                 * Decimal(1e18))
+    actual = dp_upper_limit(pdul, MACRO_WINDOW)
+    assert expect == approx(actual)
+    assert expect <= actual  # check round up error added
+    assert cached_risk_calcs(PARAMS, MACRO_WINDOW) == {"dpUpperLimit": actual}
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+
+# market risk params shared by the pure python tests of scripts/
+PARAMS = [
+    1220000000000,  # k
+    1000000000000000000,  # lmbda
+    2500000000000000,  # delta
+    5000000000000000000,  # capPayoff
+    800000000000000000000000,  # capNotional
+    5000000000000000000,  # capLeverage
+    2592000,  # circuitBreakerWindow
+    66670000000000000000000,  # circuitBreakerMintTarget
+    10000000000000000,  # maintenanceMarginFraction
+    100000000000000000,  # maintenanceMarginBurnRate
+    10000000000000000,  # liquidationFeeRate
+    750000000000000,  # tradingFeeRate
+    100000000000000,  # minCollateral
+    10000000000000,  # priceDriftUpperLimit
+    12  # averageBlockTime
+]
+
+OVL = "0xa000000000000000000000000000000000000000"
+
+
+def log(address, event, args, block, tx, index):
+    """
+    Decoded event log with the web3 attributes the ledgers join on
+    """
+    return SimpleNamespace(address=address, event=event, args=args,
+                           blockNumber=block, transactionHash=tx,
+                           logIndex=index)
+
+
+def transfer(frm, to, value, block, tx, index):
+    """
+    OVL Transfer log
+    """
+    return log(OVL, "Transfer", {"from": frm, "to": to, "value": value},
+               block, tx, index)
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from scripts.reference.market import MarketState
+from scripts.reference.oracle import Data
+from scripts.reference.position import Info, get_key
+from scripts.reference.roller import Snapshot
+from scripts.utils import checkpoint, position_book
+from scripts.utils.checkpoint import (
+    SLOT_OI_LONG, SLOT_PARAMS, SLOT_SNAPSHOT_MINTED, SLOT_SNAPSHOT_VOLUME_ASK,
+    SLOT_TIMESTAMP_UPDATE_LAST, SLOT_TOTAL_POSITIONS, pack_position,
+    pack_snapshot, position_slot, storage
+)
+from .helpers import PARAMS
+
+
+MARKET = "0x8cc9a4a3a2a9cc6b4c0b3d2ee2b1b3f1f1e6d000"
+OWNER = "0x1000000000000000000000000000000000000000"
+STATE = MarketState(PARAMS, 2**100, 3 * 10**18, 2**100 + 1, 10**18, 990)
+SNAPSHOTS = (Snapshot(900, 600, 10**18), Snapshot(0, 0, 0),
+             Snapshot(950, 2592000, -5 * 10**18))
+DATA = Data(1000, 600, 3600, 2000 * 10**18, 1990 * 10**18,
+            1900 * 10**18, 2**200, True)
+POSITIONS = [
+    (OWNER, 0, Info(2**96 - 1, 10**18, -10, -12, True, False,
+                    2**239, 10000)),
+    (MARKET, 7, Info(10**18, 0, 75000, 75010, False, True, 0, 0)),
+]
+
+
+@pytest.fixture
+def ckpt(tmp_path):
+    path = str(tmp_path / "market.ckpt")
+    checkpoint.write(path, MARKET, 123, 1000, STATE, SNAPSHOTS, DATA,
+                     10**18 + 1, POSITIONS)
+    return checkpoint.load(path)
+
+
+def test_write_and_load(ckpt):
+    assert ckpt.version == checkpoint.VERSION
+    assert isinstance(ckpt.positions, np.memmap)
+    assert ckpt.market == MARKET
+    assert ckpt.block_number == 123
+    assert ckpt.state() == STATE
+    assert ckpt.snapshots() == SNAPSHOTS
+    assert ckpt.data() == DATA
+    assert ckpt.dp_upper_limit == 10**18 + 1
+    assert ckpt.infos() == POSITIONS
+
+    market = ckpt.to_market()
+    assert market.state == STATE
+    assert market.data == DATA
+    assert market.timestamp == 1000
+    assert ckpt.to_market(1060).timestamp == 1060
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = str(tmp_path / "market.book")
+    position_book.write(path, MARKET, 1, 1, STATE, SNAPSHOTS, [])
+    with pytest.raises(ValueError):
+        checkpoint.load(path)
+
+    path = tmp_path / "future.ckpt"
+    path.write_bytes(checkpoint.MAGIC + (99).to_bytes(4, "little"))
+    with pytest.raises(ValueError, match="unsupported version"):
+        checkpoint.load(str(path))
+
+
+def test_pack_snapshot():
+    word = pack_snapshot(Snapshot(1, 2, -1))
+    assert word & (2**32 - 1) == 1
+    assert (word >> 32) & (2**32 - 1) == 2
+    assert word >> 64 == 2**192 - 1
+
+
+def test_pack_position():
+    info = POSITIONS[0][2]
+    first, second = pack_position(info)
+    assert first & (2**96 - 1) == info.notional_initial
+    assert (first >> 96) & (2**96 - 1) == info.debt_initial
+    assert (first >> 192) & (2**24 - 1) == 2**24 - 10
+    assert (first >> 216) & (2**24 - 1) == 2**24 - 12
+    assert first >> 240 == 1
+    assert second == 2**239 | (10000 << 240)
+    assert max(first, second) < 2**256
+
+
+def test_storage_shifts_timestamps(ckpt):
+    slots = storage(ckpt, 5000)
+    assert [slots[SLOT_PARAMS + i] for i in range(15)] == PARAMS
+    assert slots[SLOT_OI_LONG] == 2**100
+    assert slots[SLOT_TIMESTAMP_UPDATE_LAST] == 4990
+    assert slots[SLOT_SNAPSHOT_MINTED] == pack_snapshot(
+        Snapshot(4950, 2592000, -5 * 10**18))
+    assert slots[SLOT_TOTAL_POSITIONS] == 8
+
+    slot = position_slot(get_key(MARKET, 7))
+    assert (slots[slot], slots[slot + 1]) == pack_position(POSITIONS[1][2])
+    assert storage(ckpt)[SLOT_TIMESTAMP_UPDATE_LAST] == 990
+
+    # unused snapshot stays zero
+    assert slots[SLOT_SNAPSHOT_VOLUME_ASK] == 0
@@ -0,0 +1,88 @@
+from math import exp
+from pytest import approx
+
+from scripts.reference.market import data_is_valid, dp_upper_limit
+from scripts.reference.oracle import Data
+from scripts.utils.drift import DriftMonitor
+
+
+MACRO_WINDOW = 3600
+PRICE_DRIFT_UPPER_LIMIT = 100000000000000  # 1 bps/s
+DP_UPPER_LIMIT = dp_upper_limit(PRICE_DRIFT_UPPER_LIMIT, MACRO_WINDOW)
+PRICE_AGO = 2562676671798193257266
+
+
+def feed_data(timestamp, pow):
+    """
+    Returns feed data with price_now / price_ago = e**pow
+    """
+    price_now = int(PRICE_AGO * exp(pow))
+    return Data(timestamp, 600, MACRO_WINDOW, price_now, price_now,
+                PRICE_AGO, 4677792160494647834844974, True)
+
+
+def test_data_is_valid():
+    tol = 1e-04
+    bound = PRICE_DRIFT_UPPER_LIMIT * MACRO_WINDOW / 1e18
+    assert data_is_valid(feed_data(0, bound * (1 - tol)), DP_UPPER_LIMIT)
+    assert not data_is_valid(feed_data(0, bound * (1 + tol)), DP_UPPER_LIMIT)
+    assert data_is_valid(feed_data(0, -bound * (1 - tol)), DP_UPPER_LIMIT)
+    assert not data_is_valid(feed_data(0, -bound * (1 + tol)),
+                             DP_UPPER_LIMIT)
+
+    # not valid when either price is zero
+    data = feed_data(0, 0)._replace(price_over_macro_window=0)
+    assert not data_is_valid(data, DP_UPPER_LIMIT)
+
+
+def test_update_projects_seconds_to_breach():
+    monitor = DriftMonitor(window=10)
+    bound = PRICE_DRIFT_UPPER_LIMIT * MACRO_WINDOW / 1e18
+
+    # ln(dp) increasing at 1% of the bound per second
+    rate = bound / 100
+    for t in range(10):
+        state = monitor.update("market", feed_data(t, rate * t),
+                               DP_UPPER_LIMIT)
+
+    assert state.is_valid
+    assert state.slope == approx(rate, rel=1e-3)
+    assert state.utilization == approx(0.09, rel=1e-3)
+    assert state.seconds_to_breach == approx(91, rel=1e-2)
+    assert state.alert(horizon=100)
+    assert not state.alert(horizon=60)
+
+
+def test_update_when_trending_toward_lower_bound():
+    monitor = DriftMonitor(window=10)
+    bound = PRICE_DRIFT_UPPER_LIMIT * MACRO_WINDOW / 1e18
+
+    rate = -bound / 500
+    for t in range(0, 100, 10):
+        state = monitor.update("market", feed_data(t, rate * t),
+                               DP_UPPER_LIMIT)
+
+    # after 90s at -0.2% of bound per second, 18% of bound used
+    assert state.is_valid
+    assert state.utilization == approx(-0.18, rel=1e-3)
+    assert state.seconds_to_breach == approx(410, rel=1e-2)
+
+
+def test_update_when_data_invalid():
+    monitor = DriftMonitor(window=10)
+    bound = PRICE_DRIFT_UPPER_LIMIT * MACRO_WINDOW / 1e18
+
+    state = monitor.update("market", feed_data(0, -bound * 1.01),
+                           DP_UPPER_LIMIT)
+    assert state.is_valid is False
+    assert state.alert(horizon=0)
+
+
+def test_update_when_flat():
+    monitor = DriftMonitor()
+    for t in range(5):
+        state = monitor.update("market", feed_data(t, 0.01),
+                               DP_UPPER_LIMIT)
+    assert state.slope == approx(0.0, abs=1e-12)
+    assert state.is_valid
+    assert not state.alert(horizon=10**9)
@@ -0,0 +1,111 @@
+import asyncio
+
+from scripts.reference.market import MarketState, dp_upper_limit
+from scripts.reference.oracle import Data
+from scripts.reference.position import Info
+from scripts.reference.roller import Snapshot
+from scripts.reference.tick import price_to_tick
+from scripts.utils.engine import Engine, Graph, market_graph
+from scripts.utils.position_book import to_array
+from .helpers import PARAMS
+
+
+MARKET = "0x8cc9a4a3a2a9cc6b4c0b3d2ee2b1b3f1f1e6d000"
+OWNER = "0x1000000000000000000000000000000000000000"
+PRICE = 2000000000000000000000  # 2000
+
+
+def test_graph_recomputes_only_changed():
+    calls = []
+    g = Graph()
+    g.source("a")
+    g.source("b")
+    g.node("c", lambda a: calls.append("c") or a % 2, ["a"])
+    g.node("d", lambda c, b: calls.append("d") or c + b, ["c", "b"])
+
+    # not computed until all inputs are set
+    g.set("a", 1)
+    assert g.recompute() == ["c"]
+    g.set("b", 10)
+    assert g.recompute() == ["d"]
+    assert g["d"] == 11
+
+    # unchanged source skips everything
+    assert not g.set("a", 1)
+    calls.clear()
+    assert g.recompute() == []
+    assert calls == []
+
+    # c recomputed to an equal value doesn't dirty d
+    assert g.set("a", 3)
+    assert g.recompute() == []
+    assert calls == ["c"]
+
+    assert g.set("a", 4)
+    assert g.recompute() == ["c", "d"]
+    assert g["d"] == 10
+
+
+def sources(timestamp, price=PRICE, positions=None):
+    tick = price_to_tick(PRICE)
+    oi = 5 * 10**18 * 10**18 // PRICE
+    if positions is None:
+        positions = [(OWNER, 0, Info(5 * 10**18, 4 * 10**18, tick, tick,
+                                     True, False, oi, 10000))]
+    return {
+        "data": Data(timestamp, 600, 3600, price, price, PRICE,
+                     10**24, True),
+        "dp_upper_limit": dp_upper_limit(PARAMS[13], 3600),
+        "state": MarketState(PARAMS, oi, oi // 2, oi, oi // 2, 0),
+        "snapshots": (Snapshot(0, 600, 10**17), Snapshot(0, 600, 0),
+                      Snapshot(0, 0, 0)),
+        "positions": to_array(positions),
+        "timestamp": timestamp
+    }
+
+
+def test_market_graph_skips_revaluation():
+    g = market_graph(MARKET, funding_tolerance=1e-4)
+    for name, value in sources(12).items():
+        g.set(name, value)
+    changed = g.recompute()
+    assert "valuation" in changed
+    assert g["liquidatable"] == []
+    assert g["valid"]
+
+    # next block: only timestamp moved. funding moves oi ~1e-5 in 12s,
+    # less than the tolerance so positions aren't revalued. bid volume
+    # decays
+    computed = g.computed
+    for name, value in sources(24).items():
+        g.set(name, value)
+    changed = g.recompute()
+    assert "valuation" not in changed
+    assert "quotes" in changed
+    # feed timestamp moved so valid and mid recompute, to the same values
+    assert g.computed - computed == 5  # valid, mid, volumes, quotes, funding
+
+    # price drops 19%: 5x long becomes liquidatable
+    for name, value in sources(36, PRICE * 81 // 100).items():
+        g.set(name, value)
+    changed = g.recompute()
+    assert "valuation" in changed
+    assert g["liquidatable"] == [0]
+
+
+def test_engine_run():
+    changes = []
+
+    async def read(block):
+        return {MARKET: sources(block)}
+
+    async def blocks():
+        for block in (12, 24, 36):
+            yield block
+
+    engine = Engine(read, lambda block, market, graph, changed:
+                    changes.append((block, changed)))
+    asyncio.run(engine.run(blocks()))
+
+    assert [block for block, _ in changes] == [12, 24, 36]
+    assert 0 < engine.hit_rate < 1
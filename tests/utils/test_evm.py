@@ -0,0 +1,94 @@
+import pytest
+
+from eth_abi import encode
+
+from scripts.reference.errors import Revert
+from scripts.utils.abi import abi_type
+from scripts.utils.evm import EVM
+
+
+def initcode(runtime: bytes) -> bytes:
+    # copies runtime, which follows this 12 byte header, to memory and
+    # returns it as the deployed code
+    n = len(runtime)
+    return bytes([0x61, n >> 8, n & 0xff, 0x80, 0x60, 12, 0x60, 0, 0x39,
+                  0x60, 0, 0xf3]) + runtime
+
+
+# returns calldata after the selector, so any function whose outputs
+# have the same types as its inputs returns its args
+ECHO = bytes.fromhex("600436038060046000376000f3")
+
+
+def reverting(data: bytes) -> bytes:
+    # reverts with data, which follows this 15 byte header
+    n = len(data)
+    return bytes([0x61, n >> 8, n & 0xff, 0x61, 0, 15, 0x60, 0, 0x39,
+                  0x61, n >> 8, n & 0xff, 0x60, 0, 0xfd]) + data
+
+
+def fn(name, inputs, mutability="pure"):
+    return {"type": "function", "name": name, "inputs": inputs,
+            "outputs": inputs, "stateMutability": mutability}
+
+
+SNAPSHOT = {"name": "snap", "type": "tuple", "components": [
+    {"name": "timestamp", "type": "uint32"},
+    {"name": "window", "type": "uint32"},
+    {"name": "accumulator", "type": "int192"},
+]}
+ABI = [
+    fn("one", [{"name": "x", "type": "uint256"}]),
+    fn("two", [{"name": "x", "type": "int256"},
+               {"name": "owner", "type": "address"}]),
+    fn("snapshot", [SNAPSHOT]),
+    fn("set", [{"name": "x", "type": "uint256"}], "nonpayable"),
+]
+
+
+@pytest.fixture(scope="module")
+def evm():
+    yield EVM()
+
+
+def test_abi_type():
+    assert abi_type(SNAPSHOT) == "(uint32,uint32,int192)"
+    assert abi_type(dict(SNAPSHOT, type="tuple[]")) \
+        == "(uint32,uint32,int192)[]"
+
+
+def test_call(evm):
+    echo = evm.deploy(ABI, "0x" + initcode(ECHO).hex())
+    assert echo.one(42) == 42
+    assert echo.one(10e8) == 10**9
+    owner = evm.accounts[1]
+    assert echo.two(-5, owner) == (-5, owner.lower())
+    assert echo.snapshot((1, 2, -3)) == (1, 2, -3)
+    assert echo.snapshot((1, 2, -3), {"from": owner}) == (1, 2, -3)
+    with pytest.raises(TypeError):
+        echo.one(1, 2)
+
+
+def test_transact(evm):
+    echo = evm.deploy(ABI, initcode(ECHO).hex())
+    receipt = echo.set(1, {"from": evm.accounts[2]})
+    assert receipt["status"] == 1
+    assert receipt["from"] == evm.accounts[2]
+
+
+def test_revert(evm):
+    error = bytes.fromhex("08c379a0") + encode(["string"], ["OVLV1: boom"])
+    with_reason = evm.deploy(ABI, initcode(reverting(error)).hex())
+    with pytest.raises(Revert) as e:
+        with_reason.one(1)
+    assert e.value.reason == "OVLV1: boom"
+    with pytest.raises(Revert):
+        with_reason.set(1)
+
+    # panics and bare reverts have no reason
+    panic = bytes.fromhex("4e487b71") + encode(["uint256"], [0x21])
+    for data in (panic, b""):
+        bare = evm.deploy(ABI, initcode(reverting(data)).hex())
+        with pytest.raises(Revert) as e:
+            bare.one(1)
+        assert e.value.reason is None
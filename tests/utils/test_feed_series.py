@@ -0,0 +1,105 @@
+import numpy as np
+
+from pytest import approx
+
+from scripts.reference import market
+from scripts.reference.market import dp_upper_limit
+from scripts.reference.oracle import Data
+from scripts.reference.risk import Parameters, get, set
+from scripts.utils import feed_series
+from scripts.utils.feed_series import (
+    capacity, concat, from_data, params_from_reads
+)
+from .helpers import PARAMS
+
+
+PRICE = 2000000000000000000000  # 2000
+DP_UPPER_LIMIT = dp_upper_limit(get(PARAMS, Parameters.PriceDriftUpperLimit),
+                                3600)
+SAMPLES = [
+    Data(1000, 600, 3600, PRICE, PRICE, PRICE, 10**24, True),
+    Data(1060, 600, 3600, PRICE * 101 // 100, PRICE, PRICE * 99 // 100,
+         10**23, True),
+    Data(1120, 600, 3600, PRICE, PRICE * 2, PRICE, 10**26, True),
+    Data(1180, 600, 3600, PRICE, PRICE, 0, 0, False),
+]
+
+
+def test_capacity_matches_reference():
+    actual = capacity(from_data(SAMPLES), PARAMS, DP_UPPER_LIMIT)
+    assert len(actual) == len(SAMPLES)
+
+    cap = get(PARAMS, Parameters.CapNotional)
+    for i, data in enumerate(SAMPLES):
+        mid = market.mid_from_feed(data)
+        notional = market.cap_notional_adjusted_for_bounds(PARAMS, data, cap)
+        assert actual.mid[i] == approx(mid / 1e18)
+        assert actual.bid[i] == approx(market.bid(PARAMS, data, 0) / 1e18)
+        assert actual.ask[i] == approx(market.ask(PARAMS, data, 0) / 1e18)
+        assert actual.front_run_bound[i] == approx(
+            market.front_run_bound(PARAMS, data) / 1e18)
+        assert actual.back_run_bound[i] == approx(
+            market.back_run_bound(PARAMS, data) / 1e18)
+        assert actual.cap_notional[i] == approx(notional / 1e18)
+        assert actual.cap_oi[i] == approx(
+            market.oi_from_notional(notional, mid) / 1e18)
+        assert actual.is_valid[i] == market.data_is_valid(data,
+                                                          DP_UPPER_LIMIT)
+
+    assert actual.is_valid.tolist() == [True, True, False, False]
+
+    # capped by capNotional, the front run bound and without a reserve
+    assert actual.cap_notional[0] == cap / 1e18
+    assert actual.cap_notional[1] == actual.front_run_bound[1]
+    assert actual.cap_notional[3] == cap / 1e18
+
+
+def test_capacity_with_params_per_sample():
+    # lmbda and dpUpperLimit raised after the second sample
+    updated = list(PARAMS)
+    set(updated, Parameters.Lmbda, 2 * get(PARAMS, Parameters.Lmbda))
+    history = params_from_reads([1120, 0], [updated, PARAMS],
+                                [2 * DP_UPPER_LIMIT, DP_UPPER_LIMIT])
+    assert history.timestamp.tolist() == [0, 1120]
+
+    series = from_data(SAMPLES)
+    params, limits = history.at(series.timestamp)
+    expect = [(PARAMS, DP_UPPER_LIMIT)] * 2 \
+        + [(updated, 2 * DP_UPPER_LIMIT)] * 2
+    assert limits.tolist() == [float(limit) for _, limit in expect]
+    actual = capacity(series, params, limits)
+    for i, (data, (p, limit)) in enumerate(zip(SAMPLES, expect)):
+        assert actual.front_run_bound[i] == approx(
+            market.front_run_bound(p, data) / 1e18)
+        assert actual.is_valid[i] == market.data_is_valid(data, limit)
+
+    # before the first sample uses the first
+    assert history.at(np.array([-1]))[1].tolist() == [float(DP_UPPER_LIMIT)]
+
+
+def test_concat_sorts_and_keeps_last():
+    first = from_data(SAMPLES[2:] + SAMPLES[:1])
+    replaced = SAMPLES[1]._replace(reserve_over_micro_window=5 * 10**23)
+    merged = concat([first, from_data([SAMPLES[1], replaced])])
+    assert merged.timestamp.tolist() == [1000, 1060, 1120, 1180]
+    assert merged.reserve_over_micro_window[1] == 5e5
+
+    # duplicates within one batch keep the last too
+    assert from_data([SAMPLES[1], replaced]).reserve_over_micro_window \
+        .tolist() == [5e5]
+
+
+def test_save_and_load(tmp_path):
+    series = from_data(SAMPLES)
+    path = str(tmp_path / "feed.npz")
+    series.save(path)
+    loaded = feed_series.load(path)
+    for expect, actual in zip(series, loaded):
+        assert np.array_equal(expect, actual)
+
+    assert len(from_data([])) == 0
+
+    history = params_from_reads([0, 60], [PARAMS] * 2, [DP_UPPER_LIMIT] * 2)
+    history.save(path)
+    for expect, actual in zip(history, feed_series.load_params(path)):
+        assert np.array_equal(expect, actual)
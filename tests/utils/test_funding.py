@@ -0,0 +1,104 @@
+import numpy as np
+
+from pytest import approx
+
+from scripts.reference import position
+from scripts.reference.market import MarketState
+from scripts.reference.position import Info
+from scripts.reference.tick import price_to_tick, tick_to_price
+from scripts.utils.funding import (
+    liquidation_times, oi_after_funding, time_to_oi
+)
+from scripts.utils.position_book import to_array
+from .helpers import PARAMS
+
+
+OWNER = "0x1000000000000000000000000000000000000000"
+PRICE = 2000000000000000000000  # 2000
+
+
+def book(params=PARAMS):
+    """
+    Returns a short heavy market state and positions built at PRICE
+    """
+    tick = price_to_tick(PRICE)
+    infos = []
+    for is_long, leverage, collateral in [
+        (True, 1, 1), (True, 5, 2), (False, 5, 10), (False, 3, 10),
+        (False, 1, 4)
+    ]:
+        notional = leverage * collateral * 10**18
+        oi = notional * 10**18 // tick_to_price(tick)
+        infos.append(Info(notional, notional - collateral * 10**18,
+                          tick, tick, is_long, False, oi, 10000))
+
+    shares_long = sum(p.oi_shares for p in infos if p.is_long)
+    shares_short = sum(p.oi_shares for p in infos if not p.is_long)
+    state = MarketState(params, shares_long, shares_short, shares_long,
+                        shares_short, 0)
+    return state, infos
+
+
+def liquidatable(state, p, timestamp, price):
+    state = state.pay_funding(timestamp)
+    return position.liquidatable(
+        p, state.oi_on_side(p.is_long), state.oi_shares_on_side(p.is_long),
+        price, PARAMS[3], PARAMS[8], PARAMS[10])
+
+
+def test_time_to_oi_inverts_oi_after_funding():
+    k = 1e-6
+    t = np.array([0., 1e3, 1e5, 1e6])
+    over, under = oi_after_funding(10., 2., k, t)
+    assert over * under == approx(np.full(4, 20.))
+    assert time_to_oi(10., 2., k, over) == approx(t, abs=1e-3)
+
+    # already below target or target under sqrt of the invariant
+    assert time_to_oi(10., 2., k, [11., 4., 1.]).tolist() \
+        == [0, np.inf, np.inf]
+    assert time_to_oi(10., 2., 0., 5.) == np.inf
+
+
+def test_liquidation_times_match_reference():
+    state, infos = book()
+    prices = [PRICE * 105 // 100, PRICE * 110 // 100, PRICE * 115 // 100]
+    times = liquidation_times(
+        state, to_array([(OWNER, i, p) for i, p in enumerate(infos)]),
+        prices)
+    assert times.shape == (3, 5)
+
+    finite = 0
+    for j, price in enumerate(prices):
+        for i, p in enumerate(infos):
+            t = times[j, i]
+            if p.is_long:
+                # underweight longs receive funding so never liquidate
+                # from it alone
+                assert t in (0, np.inf)
+
+            if t == np.inf:
+                assert not liquidatable(state, p, 10**8, price)
+            elif t == 0:
+                assert liquidatable(state, p, 0, price)
+            else:
+                finite += 1
+                assert not liquidatable(state, p, int(t * 0.999), price)
+                assert liquidatable(state, p, int(t * 1.001) + 1, price)
+    assert finite > 0
+
+
+def test_liquidation_times_dead_positions():
+    state, infos = book()
+    positions = [(OWNER, 0, infos[2]._replace(liquidated=True)),
+                 (OWNER, 1, infos[2]._replace(fraction_remaining=0))]
+    times = liquidation_times(state, to_array(positions), [PRICE])
+    assert np.isnan(times).all()
+
+
+def test_liquidation_times_without_funding():
+    params = [0] + PARAMS[1:]
+    state, infos = book(params)
+    times = liquidation_times(
+        state, to_array([(OWNER, i, p) for i, p in enumerate(infos)]),
+        [PRICE * 110 // 100])
+    assert set(times[0].tolist()) <= {0, np.inf}
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from scripts.reference.market import (
+    MarketState, build, dp_upper_limit, mid_from_feed
+)
+from scripts.reference.oracle import Data
+from scripts.reference.roller import Snapshot
+from scripts.utils.impact import (
+    Market, impact_curve, max_build_notional, max_build_oi,
+    max_unwind_fraction, price, slippage
+)
+from .helpers import PARAMS
+
+
+DATA = Data(1000, 600, 3600, 2000000000000000000000,
+            2010000000000000000000, 2000000000000000000000,
+            1000000000000000000000000, True)
+EMPTY = (Snapshot(0, 0, 0),) * 3
+
+
+def market(snapshots=EMPTY):
+    return Market(MarketState(PARAMS, 0, 0, 0, 0, 0), snapshots, DATA,
+                  dp_upper_limit(PARAMS[13], 3600), 1000)
+
+
+@pytest.mark.parametrize("is_long", [True, False])
+@pytest.mark.parametrize("slippage_", [0.0075, 0.01, 0.1])
+def test_max_build_oi(is_long, slippage_):
+    m = market()
+    mid = mid_from_feed(DATA)
+    limit = int(mid * (1 + slippage_)) if is_long \
+        else int(mid * (1 - slippage_))
+    oi = max_build_oi(m, is_long, limit)
+    assert oi > 0
+
+    # exactly on the boundary of the slippage check
+    within = price(m, oi, is_long)
+    beyond = price(m, oi + 1, is_long)
+    assert within <= limit if is_long else within >= limit
+    assert beyond > limit if is_long else beyond < limit
+
+
+def test_max_build_oi_with_recent_volume():
+    limit = mid_from_feed(DATA) * 101 // 100
+    fresh = max_build_oi(market(), True, limit)
+    recent = max_build_oi(
+        market((EMPTY[0], Snapshot(1000, 600, 10**15), EMPTY[2])), True,
+        limit)
+    decayed = max_build_oi(
+        market((EMPTY[0], Snapshot(400, 600, 10**15), EMPTY[2])), True,
+        limit)
+    assert recent < fresh
+    assert decayed == fresh
+
+
+def test_max_build_oi_when_spread_exceeds_limit():
+    # limit tighter than the static spread delta
+    assert max_build_oi(market(), True, mid_from_feed(DATA)) == 0
+    assert max_build_oi(market(), False, mid_from_feed(DATA)) == 0
+
+
+def test_max_build_notional_passes_build_slippage_check():
+    m = market()
+    limit = mid_from_feed(DATA) * 101 // 100
+    notional = max_build_notional(m, True, limit)
+    built = build(*m, notional, 10**18, True, limit)
+    assert built.oi == max_build_oi(m, True, limit)
+    assert built.price <= limit
+
+
+def test_max_unwind_fraction():
+    m = market()
+    built = build(*m, 100000 * 10**18, 10**18, True)
+    after = Market(built.state, built.snapshots, DATA, m.dp_upper_limit,
+                   m.timestamp + 600)
+
+    # long unwinds on the bid
+    limit = mid_from_feed(DATA) * 995 // 1000
+    fraction = max_unwind_fraction(after, built.position, limit)
+    assert 0 < fraction < 10**18
+    assert fraction % 10**14 == 0
+
+
+def test_impact_curve():
+    m = market()
+    notionals = np.array([0, 10**21, 10**22, 10**23], dtype=float)
+    asks = impact_curve(m, True, notionals)
+    bids = impact_curve(m, False, notionals)
+    assert np.all(np.diff(asks) > 0)
+    assert np.all(np.diff(bids) < 0)
+
+    # agrees with exact ask and bid
+    mid = mid_from_feed(DATA)
+    for notional, a, b in zip(notionals, asks, bids):
+        oi = int(notional) * 10**18 // mid
+        assert a == pytest.approx(price(m, oi, True) / 1e18, rel=1e-9)
+        assert b == pytest.approx(price(m, oi, False) / 1e18, rel=1e-9)
+
+    assert slippage(m, True, [0.])[0] == pytest.approx(
+        2010 / 2005 * np.exp(0.0025) - 1)
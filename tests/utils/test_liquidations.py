@@ -0,0 +1,91 @@
+from scripts.reference.market import MarketState
+from scripts.reference.position import Info
+from scripts.reference.tick import price_to_tick
+from scripts.utils.liquidations import (
+    DEFAULT_LIQUIDATE_GAS, GasCurve, Liquidation, LiquidationQueue,
+    liquidation
+)
+from .helpers import PARAMS
+
+
+PRICE = 2000000000000000000000  # 2000
+
+
+def build(is_long, leverage=5):
+    """
+    Returns a position of 1 OVL collateral built at PRICE, alone on its
+    side so its shares are the whole side's oi
+    """
+    notional = leverage * 10**18
+    tick = price_to_tick(PRICE)
+    oi = notional * 10**18 // PRICE
+    pos = Info(notional, notional - 10**18, tick, tick, is_long, False,
+               oi, 10000)
+    state = MarketState(PARAMS, oi if is_long else 0, 0 if is_long else oi,
+                        oi if is_long else 0, 0 if is_long else oi, 0)
+    return pos, state
+
+
+def test_liquidation_when_not_liquidatable():
+    pos, state = build(True)
+    liq = liquidation(pos, state, PRICE)
+    assert not liq.liquidatable
+    assert liq.reward == 0
+    assert liq.shortfall < 0
+
+
+def test_liquidation_when_liquidatable():
+    pos, state = build(True)
+
+    # 5x long loses 19% on a 19% drop ... value = 1 - 5 * 0.19 = 0.05
+    # below maintenance margin of 5 * 0.01 + fee
+    price = PRICE * 81 // 100
+    liq = liquidation(pos, state, price)
+    assert liq.liquidatable
+    assert liq.reward == liq.value // 100
+    assert liq.shortfall > 0
+
+    # short at the same price is in profit
+    pos, state = build(False)
+    liq = liquidation(pos, state, price)
+    assert not liq.liquidatable
+
+
+def test_gas_curve_estimate():
+    curve = GasCurve(buckets=(0, 60, 3600))
+    assert curve.estimate(100) == DEFAULT_LIQUIDATE_GAS
+
+    curve.add(0, 100000)
+    curve.add(0, 110000)
+    curve.add(0, 120000)
+    curve.add(3600, 200000)
+    curve.add(86400, 200000)
+
+    # below and above measured buckets take the nearest median
+    assert curve.estimate(0) == 110000
+    assert curve.estimate(100000) == 200000
+
+    # linear between bucket medians
+    assert curve.estimate(1800) == 155000
+
+
+def test_queue_orders_by_profit_then_shortfall():
+    curve = GasCurve()
+    curve.add(0, 100000)
+    queue = LiquidationQueue(gas_price=10**9, ovl_price=10**18,
+                             gas_curve=curve)
+
+    # gas cost of 1e14 wei at 1 gwei
+    assert queue.score(10**15, 0) == (10**15 - 10**14, 100000)
+
+    queue.push("m", "a", 0, Liquidation(True, 0, 10**15, 1), 0)
+    queue.push("m", "b", 1, Liquidation(True, 0, 10**16, 1), 0)
+    queue.push("m", "c", 2, Liquidation(True, 0, 10**15, 5), 0)
+    queue.push("m", "d", 3, Liquidation(True, 0, 10**13, 5), 0)
+    assert queue.push("m", "e", 4, Liquidation(False, 0, 0, -1), 0) is None
+    assert len(queue) == 4
+
+    # unprofitable d is left in the queue
+    actual = [c.owner for c in queue.profitable()]
+    assert actual == ["b", "c", "a"]
+    assert queue.peek().owner == "d"
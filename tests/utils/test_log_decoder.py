@@ -0,0 +1,127 @@
+import numpy as np
+
+from eth_abi import decode as abi_decode
+from eth_utils import to_checksum_address
+from hexbytes import HexBytes
+
+from scripts.utils.log_decoder import (
+    TOPICS, address_strings, address_topic, decode, encode, owners,
+    signature, to_logs, topic
+)
+from scripts.utils.position_book import to_floats, to_ints
+
+
+MARKET = "0x8cc9a4a3a2a9cc6b4c0b3d2ee2b1b3f1f1e6d000"
+OWNER = "0x1000000000000000000000000000000000000000"
+SENDER = "0x20000000000000000000000000000000000000ff"
+
+
+def test_topics():
+    assert signature("Build") == \
+        "Build(address,uint256,uint256,uint256,bool,uint256,uint256,uint256)"
+    assert set(TOPICS.values()) == {"Build", "Unwind", "Liquidate",
+                                    "CacheRiskCalc", "Transfer",
+                                    "ParamUpdated"}
+    assert signature("ParamUpdated") == \
+        "ParamUpdated(address,address,uint8,uint256)"
+    assert topic("Transfer") == "0x" + \
+        "ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+    assert address_topic(SENDER) == "0x" + "00" * 12 + SENDER[2:]
+
+
+def test_decode():
+    builds = [(OWNER, i, 10**18 * i, 2**200 + i, i % 2 == 0, 2000 * 10**18,
+               2**255 + i, 3 * i) for i in range(5)]
+    unwinds = [(OWNER, 1, 5 * 10**17, -10**18, 1990 * 10**18, 0, 0),
+               (SENDER, 2, 10**18, 2**250, 2010 * 10**18, 1, 2)]
+    liquidates = [(SENDER, OWNER, 3, -2**255, 1, 2, 3)]
+    logs = [encode("Build", MARKET, v, 100 + i, i)
+            for i, v in enumerate(builds)]
+    logs += [encode("Unwind", MARKET, v, 200, 7) for v in unwinds]
+    logs += [encode("Liquidate", OWNER, v, 300, 1) for v in liquidates]
+
+    # web3 returns HexBytes, and other events of the market are skipped
+    logs[0] = dict(logs[0], topics=[HexBytes(t) for t in logs[0]["topics"]],
+                   data=HexBytes(logs[0]["data"]))
+    logs.append({"address": MARKET, "topics": [bytes(32)], "data": b"",
+                 "blockNumber": 1, "logIndex": 0})
+    # as are logs with an event's topic0 but not its layout, such as an
+    # ERC-721 Transfer with the token id indexed, and anonymous logs
+    erc721 = encode("Transfer", OWNER, (MARKET, SENDER, 7))
+    logs.append(dict(erc721, topics=erc721["topics"] + [bytes(32)],
+                     data=b""))
+    logs.append(dict(erc721, topics=[]))
+    decoded = decode(logs)
+
+    build = decoded["Build"]
+    assert len(build) == 5
+    assert address_strings(build["address"]) == (MARKET,) * 5
+    assert address_strings(build["sender"]) == (OWNER,) * 5
+    assert build["block_number"].tolist() == [100, 101, 102, 103, 104]
+    assert build["isLong"].tolist() == [True, False, True, False, True]
+    for arg, j in (("positionId", 1), ("oi", 2), ("debt", 3), ("price", 5),
+                   ("oiAfterBuild", 6), ("oiSharesAfterBuild", 7)):
+        assert to_ints(build[arg]) == [v[j] for v in builds]
+    assert to_floats(build["oi"]).tolist() == [1e18 * i for i in range(5)]
+
+    assert len(decoded["Transfer"]) == 0
+
+    unwind = decoded["Unwind"]
+    assert to_ints(unwind["mint"], signed=True) == [-10**18, 2**250]
+    assert address_strings(owners("Unwind", unwind)) == (OWNER, SENDER)
+
+    liquidate = decoded["Liquidate"]
+    assert address_strings(liquidate["address"]) == (OWNER,)
+    assert address_strings(owners("Liquidate", liquidate)) == (OWNER,)
+    assert to_ints(liquidate["mint"], signed=True) == [-2**255]
+
+
+def test_to_logs():
+    logs = [
+        encode("Unwind", MARKET, (OWNER, 1, 10**18, -5, 2000, 0, 0), 2, 3,
+               b"\x02" * 32),
+        encode("Transfer", OWNER, (MARKET, SENDER, 7), 2, 4, b"\x02" * 32),
+        encode("Build", MARKET, (SENDER, 0, 1, 2, True, 3, 4, 5), 1, 9,
+               b"\x01" * 32),
+        encode("ParamUpdated", OWNER, (SENDER, MARKET, 13, 10**14), 3, 0),
+    ]
+    build, unwind, transfer, updated = to_logs(decode(logs))
+    assert (build.event, build.blockNumber, build.logIndex) == \
+        ("Build", 1, 9)
+    assert build.address == to_checksum_address(MARKET)
+    assert build.transactionHash == "0x" + "01" * 32
+    assert build.args == {"sender": to_checksum_address(SENDER),
+                          "positionId": 0, "oi": 1, "debt": 2,
+                          "isLong": True, "price": 3, "oiAfterBuild": 4,
+                          "oiSharesAfterBuild": 5}
+    assert (unwind.event, unwind.args["mint"]) == ("Unwind", -5)
+    assert transfer.address == to_checksum_address(OWNER)
+    assert transfer.args == {"from": to_checksum_address(MARKET),
+                             "to": to_checksum_address(SENDER), "value": 7}
+    assert updated.args == {"user": to_checksum_address(SENDER),
+                            "market": to_checksum_address(MARKET),
+                            "name": 13, "value": 10**14}
+
+
+def test_decode_agrees_with_eth_abi():
+    rng = np.random.default_rng(0)
+    values = [(OWNER, int(rng.integers(2**62)), *[
+        int.from_bytes(rng.bytes(32), "big") for _ in range(2)],
+        bool(rng.integers(2)), *[int.from_bytes(rng.bytes(32), "big")
+                                 for _ in range(3)]) for _ in range(20)]
+    logs = [encode("Build", MARKET, v) for v in values]
+    build = decode(logs)["Build"]
+    for i, log in enumerate(logs):
+        expect = abi_decode(["uint256", "uint256", "uint256", "bool",
+                             "uint256", "uint256", "uint256"], log["data"])
+        actual = (to_ints(build["positionId"][i])[0],
+                  to_ints(build["oi"][i])[0], to_ints(build["debt"][i])[0],
+                  bool(build["isLong"][i]), to_ints(build["price"][i])[0],
+                  to_ints(build["oiAfterBuild"][i])[0],
+                  to_ints(build["oiSharesAfterBuild"][i])[0])
+        assert actual == expect
+
+
+def test_decode_empty():
+    decoded = decode([])
+    assert all(len(v) == 0 for v in decoded.values())
@@ -0,0 +1,125 @@
+import pytest
+
+from scripts.reference.risk import Parameters
+from scripts.utils.market_config import (
+    FeedState, load_specs, parse_uint, validate_specs
+)
+
+
+FEED_FACTORY = "0x" + "11" * 20
+FEED_ONE = "0x" + "22" * 20
+FEED_TWO = "0x" + "33" * 20
+
+PARAMS = {
+    "k": 1220000000000,
+    "lmbda": 1000000000000000000,
+    "delta": 2500000000000000,
+    "capPayoff": 5000000000000000000,
+    "capNotional": 800000000000000000000000,
+    "capLeverage": 5000000000000000000,
+    "circuitBreakerWindow": 2592000,
+    "circuitBreakerMintTarget": 66670000000000000000000,
+    "maintenanceMarginFraction": 100000000000000000,
+    "maintenanceMarginBurnRate": 100000000000000000,
+    "liquidationFeeRate": 10000000000000000,
+    "tradingFeeRate": 750000000000000,
+    "minCollateral": 100000000000000,
+    "priceDriftUpperLimit": 100000000000000,
+    "averageBlockTime": 250
+}
+
+
+def test_parse_uint():
+    assert parse_uint(250) == 250
+    assert parse_uint("0.01e18") == 10000000000000000
+    assert parse_uint("88_888_888e18") == 88888888 * 10**18
+    assert parse_uint(1e18) == 10**18
+
+    for value in ["0.5", "-1", "abc", True, 2**256]:
+        with pytest.raises(ValueError):
+            parse_uint(value)
+
+
+def test_load_yaml_merges_defaults(tmp_path):
+    path = tmp_path / "markets.yaml"
+    path.write_text(
+        "defaults:\n"
+        + "".join(f"  {k}: {v}\n" for k, v in PARAMS.items())
+        + "markets:\n"
+        + f"  - name: one\n    feedFactory: '{FEED_FACTORY}'\n"
+        + f"    feed: '{FEED_ONE}'\n"
+        + f"  - name: two\n    feedFactory: '{FEED_FACTORY}'\n"
+        + f"    feed: '{FEED_TWO}'\n"
+        + "    params:\n      capLeverage: '3e18'\n"
+    )
+    specs = load_specs(str(path))
+    assert [s.name for s in specs] == ["one", "two"]
+    assert specs[0].params == list(PARAMS.values())
+    assert specs[1].params[Parameters.CapLeverage] == 3 * 10**18
+    assert specs[1].as_args() == (FEED_FACTORY, FEED_TWO, specs[1].params)
+    assert validate_specs(specs) == []
+
+
+def test_load_csv(tmp_path):
+    path = tmp_path / "markets.csv"
+    header = ["name", "feedFactory", "feed"] + list(PARAMS.keys())
+    row = ["one", FEED_FACTORY, FEED_ONE] + [str(v) for v in PARAMS.values()]
+    path.write_text(",".join(header) + "\n" + ",".join(row) + "\n")
+
+    specs = load_specs(str(path))
+    assert len(specs) == 1
+    assert specs[0].params_dict() == PARAMS
+
+
+def test_load_reverts_when_missing_param(tmp_path):
+    path = tmp_path / "markets.yaml"
+    path.write_text(
+        f"markets:\n  - feedFactory: '{FEED_FACTORY}'\n"
+        f"    feed: '{FEED_ONE}'\n    params:\n      k: 0\n")
+    with pytest.raises(ValueError, match="missing risk params"):
+        load_specs(str(path))
+
+
+def test_validate_specs_flags_bounds_duplicates_and_addresses(tmp_path):
+    path = tmp_path / "markets.yaml"
+    path.write_text(
+        "defaults:\n"
+        + "".join(f"  {k}: {v}\n" for k, v in PARAMS.items())
+        + "markets:\n"
+        + f"  - name: one\n    feedFactory: '{FEED_FACTORY}'\n"
+        + f"    feed: '{FEED_ONE}'\n"
+        + "    params:\n      capLeverage: '100e18'\n"
+        + "  - name: two\n    feedFactory: '0x1234'\n"
+        + f"    feed: '{FEED_ONE}'\n"
+    )
+    errors = validate_specs(load_specs(str(path)))
+    assert errors == [
+        "one: capLeverage=100000000000000000000 OVLV1: param out of bounds",
+        "two: invalid feed_factory address '0x1234'",
+        "two: feed " + FEED_ONE + " already used by one",
+    ]
+
+
+def test_validate_specs_flags_factory_feed_checks(tmp_path):
+    path = tmp_path / "markets.yaml"
+    path.write_text(
+        "defaults:\n"
+        + "".join(f"  {k}: {v}\n" for k, v in PARAMS.items())
+        + "markets:\n"
+        + f"  - name: one\n    feedFactory: '{FEED_FACTORY}'\n"
+        + f"    feed: '{FEED_ONE}'\n"
+        + f"  - name: two\n    feedFactory: '{FEED_FACTORY}'\n"
+        + f"    feed: '{FEED_TWO}'\n"
+    )
+    specs = load_specs(str(path))
+    feed_states = {
+        FEED_ONE: FeedState("0x" + "00" * 20, True, True),
+        FEED_TWO: FeedState("0x" + "44" * 20, False, False),
+    }
+    assert validate_specs(specs, feed_states={
+        FEED_ONE: feed_states[FEED_ONE]}) == []
+    assert validate_specs(specs, feed_states=feed_states) == [
+        "two: OVLV1: market already exists",
+        "two: OVLV1: feed factory not supported",
+        "two: OVLV1: feed does not exist",
+    ]
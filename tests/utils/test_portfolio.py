@@ -0,0 +1,120 @@
+import numpy as np
+
+from pytest import approx
+
+from scripts.reference import position
+from scripts.reference.market import MarketState
+from scripts.reference.position import Info
+from scripts.reference.tick import price_to_tick, tick_to_price
+from scripts.utils.portfolio import totals, valuation
+from scripts.utils.position_book import to_array
+from .helpers import PARAMS
+
+
+MARKET = "0x8cc9a4a3a2a9cc6b4c0b3d2ee2b1b3f1f1e6d000"
+OWNER = "0x1000000000000000000000000000000000000000"
+PRICE = 2000000000000000000000  # 2000
+
+
+def book():
+    """
+    Returns a market state and positions on both sides built near PRICE.
+    Longs have paid funding to shorts since build (oi < shares)
+    """
+    tick = price_to_tick(PRICE)
+    infos = []
+    for i, (is_long, leverage, collateral) in enumerate([
+        (True, 1, 1), (True, 5, 2), (False, 3, 10), (False, 1, 4),
+        (True, 2, 3)
+    ]):
+        notional = leverage * collateral * 10**18
+        oi = notional * 10**18 // tick_to_price(tick)
+        fraction_remaining = 10000
+        if i == 4:
+            # half unwound
+            oi //= 2
+            fraction_remaining = 5000
+        infos.append(Info(notional, notional - collateral * 10**18,
+                          tick, tick + (10 if is_long else -10), is_long,
+                          False, oi, fraction_remaining))
+
+    shares_long = sum(p.oi_shares for p in infos if p.is_long)
+    shares_short = sum(p.oi_shares for p in infos if not p.is_long)
+    state = MarketState(PARAMS, shares_long * 99 // 100,
+                        shares_short * 101 // 100, shares_long,
+                        shares_short, 0)
+    return state, infos
+
+
+def test_valuation_matches_reference():
+    state, infos = book()
+    cap_payoff, mmf, lfr = PARAMS[3], PARAMS[8], PARAMS[10]
+    for price in [PRICE * 7 // 10, PRICE * 95 // 100, PRICE,
+                  PRICE * 11 // 10, PRICE * 10]:
+        v = valuation(MARKET, state, price,
+                      to_array([(OWNER, i, p) for i, p in enumerate(infos)]))
+        for i, p in enumerate(infos):
+            oi_total = state.oi_on_side(p.is_long)
+            shares_total = state.oi_shares_on_side(p.is_long)
+            expect_value = position.value(
+                p, 10**18, oi_total, shares_total, price, cap_payoff)
+            expect_cost = position.cost(p, 10**18)
+            assert v.value[i] == approx(expect_value / 1e18, abs=1e-9)
+            assert v.collateral[i] == approx(expect_cost / 1e18)
+            assert v.pnl[i] == approx((expect_value - expect_cost) / 1e18,
+                                      abs=1e-9)
+
+            # health below one iff liquidatable
+            expect_liquidatable = position.liquidatable(
+                p, oi_total, shares_total, price, cap_payoff, mmf, lfr)
+            assert (v.health[i] < 1) == expect_liquidatable
+
+
+def test_liquidation_price_is_threshold():
+    state, infos = book()
+    cap_payoff, mmf, lfr = PARAMS[3], PARAMS[8], PARAMS[10]
+    v = valuation(MARKET, state, PRICE,
+                  to_array([(OWNER, i, p) for i, p in enumerate(infos)]))
+    for i, p in enumerate(infos):
+        oi_total = state.oi_on_side(p.is_long)
+        shares_total = state.oi_shares_on_side(p.is_long)
+        liq_price = v.liquidation_price[i]
+        if liq_price == 0:
+            # 1x short can't be liquidated by price moving down
+            assert not p.is_long
+            continue
+
+        # liquidatable just past liq price but not just before
+        worse, better = (0.999, 1.001) if p.is_long else (1.001, 0.999)
+        assert position.liquidatable(
+            p, oi_total, shares_total, int(liq_price * worse * 1e18),
+            cap_payoff, mmf, lfr)
+        assert not position.liquidatable(
+            p, oi_total, shares_total, int(liq_price * better * 1e18),
+            cap_payoff, mmf, lfr)
+
+
+def test_funding_and_totals():
+    state, infos = book()
+    positions = [(OWNER, i, p) for i, p in enumerate(infos)]
+
+    # liquidated and unwound positions are excluded
+    positions.append((OWNER, 5, infos[0]._replace(liquidated=True)))
+    positions.append((OWNER, 6, infos[0]._replace(fraction_remaining=0)))
+    v = valuation(MARKET, state, PRICE, to_array(positions))
+
+    # longs paid 1% of notional to funding, shorts received 1%
+    expect = np.array([-0.01 * p.notional_initial / 1e18 if p.is_long
+                       else 0.01 * p.notional_initial / 1e18
+                       for p in infos])
+    expect[4] /= 2
+    assert v.funding[:5] == approx(expect, rel=1e-6)
+    assert v.value[5:].tolist() == [0, 0]
+    assert np.isnan(v.health[5:]).all()
+
+    t = totals([v, valuation(MARKET, state, PRICE, to_array([]))])
+    assert t.positions == 5
+    assert t.value == approx(v.value.sum())
+    assert t.funding == approx(v.funding.sum())
+    assert t.pnl == approx(t.value - t.collateral)
+    assert t.min_health == approx(np.nanmin(v.health))
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from scripts.reference.market import MarketState
+from scripts.reference.position import Info
+from scripts.reference.roller import Snapshot
+from scripts.utils import position_book
+from scripts.utils.position_book import to_floats, to_ints, to_limbs
+from .helpers import PARAMS
+
+
+MARKET = "0x8cc9a4a3a2a9cc6b4c0b3d2ee2b1b3f1f1e6d000"
+OWNER = "0x1000000000000000000000000000000000000000"
+
+
+def test_limbs_round_trip():
+    values = [0, 1, 2**64, 2**96 - 1, 2**255 + 12345]
+    arr = to_limbs(values, 4)
+    assert to_ints(arr) == values
+    assert to_floats(arr) == pytest.approx([float(v) for v in values])
+
+    signed = [-1, -2**191, 2**191 - 1, -123456789]
+    arr = to_limbs(signed, 3)
+    assert to_ints(arr, signed=True) == signed
+    assert to_floats(arr, signed=True) == pytest.approx(
+        [float(v) for v in signed])
+
+    with pytest.raises(ValueError):
+        to_limbs([2**96], 1)
+
+
+def test_write_and_load(tmp_path):
+    state = MarketState(PARAMS, 2**100, 3 * 10**18, 2**100 + 1, 10**18, 99)
+    snapshots = (Snapshot(1, 600, 10**18), Snapshot(2, 600, 0),
+                 Snapshot(3, 2592000, -5 * 10**18))
+    positions = [
+        (OWNER, 0, Info(2**96 - 1, 10**18, -10, -12, True, False,
+                        2**239, 10000)),
+        (MARKET, 7, Info(10**18, 0, 75000, 75010, False, True, 0, 0)),
+    ]
+    path = str(tmp_path / "market.book")
+    position_book.write(path, MARKET, 123, 456, state, snapshots, positions)
+
+    book = position_book.load(path)
+    assert isinstance(book.positions, np.memmap)
+    assert book.market == MARKET
+    assert book.block_number == 123
+    assert book.timestamp == 456
+    assert book.state() == state
+    assert book.snapshots() == snapshots
+    assert len(book.positions) == 2
+    for i, (owner, id, info) in enumerate(positions):
+        assert book.owner(i) == owner
+        assert int(book.positions["position_id"][i]) == id
+        assert book.info(i) == info
+
+    # columns are usable directly for vectorized analysis
+    assert book.positions["is_long"].tolist() == [True, False]
+    assert to_floats(book.positions["notional_initial"])[1] == 1e18
+
+
+def test_load_when_empty_or_invalid(tmp_path):
+    state = MarketState(PARAMS, 0, 0, 0, 0, 0)
+    path = str(tmp_path / "empty.book")
+    position_book.write(path, MARKET, 1, 1, state, (Snapshot(0, 0, 0),) * 3,
+                        [])
+    assert len(position_book.load(path).positions) == 0
+
+    path = tmp_path / "invalid.book"
+    path.write_bytes(b"not a book")
+    with pytest.raises(ValueError):
+        position_book.load(str(path))
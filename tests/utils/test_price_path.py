@@ -0,0 +1,43 @@
+import pytest
+
+from scripts.utils.price_path import Block, Step, from_series, load_csv, plan
+
+
+def test_load_csv(tmp_path):
+    path = tmp_path / "path.csv"
+    path.write_text("time,price,reserve\n"
+                    "0,2000.5,1000000\n"
+                    "60,1999.25,\n"
+                    "120,0.000000000000000001,2000000\n")
+    assert load_csv(str(path)) == [
+        Step(0, 2000500000000000000000, 1000000 * 10**18),
+        Step(60, 1999250000000000000000, None),
+        Step(120, 1, 2000000 * 10**18),
+    ]
+
+
+def test_from_series():
+    assert from_series([0, 12], [1, 2]) == [Step(0, 1), Step(12, 2)]
+    assert from_series([0], [1], [3]) == [Step(0, 1, 3)]
+    with pytest.raises(ValueError):
+        from_series([0, 12], [1])
+
+
+def test_plan_packs_and_drops_unchanged():
+    steps = [
+        Step(0, 100),  # unchanged
+        Step(12, 101, 5),
+        Step(12, 102),  # same block, last price wins
+        Step(24, 102, 5),  # unchanged
+        Step(36, 101, 6),
+        Step(36, 102),  # back to value set by earlier block
+    ]
+    assert plan(steps, price=100, reserve=1) == [
+        Block(12, [("setPrice", 102), ("setReserve", 5)]),
+        Block(36, [("setReserve", 6)]),
+    ]
+
+
+def test_plan_requires_time_order():
+    with pytest.raises(ValueError):
+        plan([Step(12, 1), Step(0, 2)], price=0, reserve=0)
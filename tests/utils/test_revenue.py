@@ -0,0 +1,106 @@
+from scripts.utils.revenue import DAY, HOUR, Ledger, attribute, load
+from .helpers import log, transfer
+
+
+MARKET = "0x8cc9a4a3a2a9cc6b4c0b3d2ee2b1b3f1f1e6d000"
+OTHER = "0x9cc9a4a3a2a9cc6b4c0b3d2ee2b1b3f1f1e6d000"
+FEE_RECIPIENT = "0xf000000000000000000000000000000000000000"
+ALICE = "0x1000000000000000000000000000000000000000"
+BOB = "0x2000000000000000000000000000000000000000"
+ZERO = "0x0000000000000000000000000000000000000000"
+
+
+def logs():
+    events = [
+        log(MARKET, "Build", {"sender": ALICE, "positionId": 0}, 1, "0x1", 0),
+        # two unwinds in one tx
+        log(MARKET, "Unwind", {"sender": ALICE, "positionId": 0}, 2, "0x2",
+            0),
+        log(MARKET, "Unwind", {"sender": ALICE, "positionId": 1}, 2, "0x2",
+            4),
+        log(MARKET, "Liquidate",
+            {"sender": BOB, "owner": ALICE, "positionId": 2}, 3, "0x3", 0),
+        log(OTHER, "Build", {"sender": BOB, "positionId": 0}, 4, "0x4", 0),
+        log(MARKET, "Update", {}, 4, "0x5", 0),
+    ]
+    transfers = [
+        transfer(ALICE, MARKET, 101, 1, "0x1", 1),
+        transfer(MARKET, FEE_RECIPIENT, 1, 1, "0x1", 2),
+        transfer(ZERO, MARKET, 10, 2, "0x2", 1),
+        transfer(MARKET, ALICE, 108, 2, "0x2", 2),
+        transfer(MARKET, FEE_RECIPIENT, 2, 2, "0x2", 3),
+        transfer(MARKET, ZERO, 5, 2, "0x2", 5),
+        transfer(MARKET, ALICE, 92, 2, "0x2", 6),
+        transfer(MARKET, FEE_RECIPIENT, 3, 2, "0x2", 7),
+        transfer(MARKET, ZERO, 50, 3, "0x3", 1),
+        transfer(MARKET, BOB, 1, 3, "0x3", 2),
+        transfer(MARKET, FEE_RECIPIENT, 7, 3, "0x3", 3),
+        transfer(BOB, OTHER, 202, 4, "0x4", 1),
+        transfer(OTHER, FEE_RECIPIENT, 4, 4, "0x4", 2),
+    ]
+    timestamps = {1: 0, 2: HOUR - 1, 3: HOUR, 4: DAY + 1}
+    return events, transfers, timestamps
+
+
+def test_attribute():
+    flows = attribute(*logs())
+    assert [(f.market, f.event, f.owner, f.position_id, f.amount)
+            for f in flows] == [
+        (MARKET, "Build", ALICE, 0, 1),
+        (MARKET, "Unwind", ALICE, 0, 2),
+        (MARKET, "Unwind", ALICE, 1, 3),
+        (MARKET, "Liquidate", ALICE, 2, 7),
+        (OTHER, "Build", BOB, 0, 4),
+    ]
+    assert {f.recipient for f in flows} == {FEE_RECIPIENT}
+    assert [f.kind for f in flows] == ["fee"] * 3 + ["margin", "fee"]
+
+    # scans only fetch transfers to the fee recipient
+    events, transfers, timestamps = logs()
+    fees = [t for t in transfers if t.args["to"] == FEE_RECIPIENT]
+    assert attribute(events, fees, timestamps) == flows
+
+
+def test_ledger_rollups():
+    ledger = Ledger()
+    ledger.add(attribute(*logs()))
+    assert ledger.last_block == 4
+
+    assert ledger.rows("hour") == [
+        (MARKET, 0, 6, 0, 3), (MARKET, HOUR, 0, 7, 1),
+        (OTHER, DAY, 4, 0, 1)]
+    assert ledger.rows("day") == [(MARKET, 0, 6, 7, 4),
+                                  (OTHER, DAY, 4, 0, 1)]
+    assert ledger.rows("market") == [(MARKET, 6, 7, 4), (OTHER, 4, 0, 1)]
+
+    total = ledger.revenue("hour", start=HOUR)
+    assert (total.fees, total.margin, total.count) == (4, 7, 2)
+    total = ledger.revenue("day", market=MARKET)
+    assert total.total == 13
+
+
+def test_ledger_save_resume(tmp_path):
+    events, transfers, timestamps = logs()
+    ledger = Ledger()
+    ledger.add(attribute(*logs()), 10)
+    assert ledger.last_block == 10
+
+    # scan to block 2, save, then resume from the saved last block
+    path = str(tmp_path / "revenue.json")
+    first = Ledger()
+    first.add(attribute(
+        [e for e in events if e.blockNumber <= 2],
+        [t for t in transfers if t.blockNumber <= 2], timestamps), 2)
+    first.save(path)
+    resumed = load(path)
+    assert resumed.last_block == 2
+    assert resumed.flows == first.flows
+    assert resumed.rows("hour") == first.rows("hour")
+
+    resumed.add(attribute(
+        [e for e in events if e.blockNumber > 2],
+        [t for t in transfers if t.blockNumber > 2], timestamps), 10)
+    assert resumed.flows == ledger.flows
+    for period in ("hour", "day", "market"):
+        assert resumed.rows(period) == ledger.rows(period)
+    assert resumed.last_block == 10
@@ -0,0 +1,38 @@
+from scripts.utils.rounds import (
+    DECIMALS, Round, batches, load_csv, shift, synthetic
+)
+
+
+def test_synthetic():
+    rounds = synthetic(0, 3 * 86400, 2000., 0.8, interval=60,
+                       deviation=0.005, heartbeat=3600, seed=1)
+    assert rounds[0] == Round(1, 2000 * 10**DECIMALS, 0)
+    assert [r.round_id for r in rounds] == list(range(1, len(rounds) + 1))
+    for prev, r in zip(rounds, rounds[1:]):
+        dt = r.updated_at - prev.updated_at
+        assert 0 < dt <= 3600
+        if dt < 3600:
+            # reported early only on deviation
+            assert abs(r.answer / prev.answer - 1) > 0.005
+
+    # deterministic given seed
+    assert synthetic(0, 86400, 2000., 0.8, seed=1) \
+        == synthetic(0, 86400, 2000., 0.8, seed=1)
+
+
+def test_load_csv_and_shift(tmp_path):
+    path = tmp_path / "rounds.csv"
+    path.write_text("updated_at,answer\n100,2000.5\n160,1999.12345678\n")
+    rounds = load_csv(str(path), first_round_id=5)
+    assert rounds == [Round(5, 200050000000, 100),
+                      Round(6, 199912345678, 160)]
+    assert [r.updated_at for r in shift(rounds, 1000)] == [940, 1000]
+
+
+def test_batches():
+    rounds = [Round(i, i * 10, i * 60) for i in range(1, 6)]
+    assert list(batches(rounds, 2)) == [
+        ([1, 2], [10, 20], [60, 120]),
+        ([3, 4], [30, 40], [180, 240]),
+        ([5], [50], [300]),
+    ]
@@ -0,0 +1,99 @@
+import pytest
+
+from scripts.reference.errors import Revert
+from scripts.reference.market import MarketState, build, dp_upper_limit
+from scripts.reference.oracle import Data
+from scripts.reference.roller import Snapshot
+from scripts.utils.sizing import (
+    Market, can_build, max_collateral, max_leverage, max_size
+)
+from .helpers import PARAMS
+
+
+DATA = Data(1000, 600, 3600, 2000000000000000000000,
+            2010000000000000000000, 2000000000000000000000,
+            1000000000000000000000000, True)
+EMPTY = (Snapshot(0, 0, 0),) * 3
+
+
+def market(params=PARAMS, snapshots=EMPTY, data=DATA):
+    return Market(MarketState(params, 0, 0, 0, 0, 0), snapshots, data,
+                  dp_upper_limit(params[13], 3600), 1000)
+
+
+@pytest.mark.parametrize("is_long", [True, False])
+@pytest.mark.parametrize("leverage", [10**18, 3 * 10**18, 5 * 10**18])
+def test_max_collateral(is_long, leverage):
+    m = market()
+    collateral = max_collateral(m, leverage, is_long)
+    assert can_build(m, collateral, leverage, is_long)
+    assert not can_build(m, collateral + 1, leverage, is_long)
+
+
+def test_max_collateral_when_cap_binds():
+    # small cap notional and impact: cap binds before impact makes the
+    # position liquidatable
+    params = list(PARAMS)
+    params[1] = 10**16
+    params[4] = 1000 * 10**18
+    m = market(params)
+    collateral = max_collateral(m, 2 * 10**18, False)
+    assert collateral == pytest.approx(500 * 10**18, rel=1e-9)
+    with pytest.raises(Revert, match="OVLV1:oi>cap"):
+        build(*m, collateral + 1, 2 * 10**18, False)
+
+
+def test_max_collateral_when_circuit_breaker():
+    m = market()
+    target = PARAMS[7]
+    unbroken = max_collateral(m, 10**18, False)
+
+    # minted 1.5x target: cap halved
+    m = market(snapshots=(EMPTY[0], EMPTY[1],
+                          Snapshot(1000, PARAMS[6], 3 * target // 2)))
+    assert max_collateral(m, 10**18, False) < unbroken
+    assert max_collateral(m, 10**18, False) == pytest.approx(
+        400000 * 10**18, rel=1e-9)
+
+    # minted 2x target: nothing can be built
+    m = market(snapshots=(EMPTY[0], EMPTY[1],
+                          Snapshot(1000, PARAMS[6], 2 * target)))
+    assert max_collateral(m, 10**18, False) == 0
+
+
+def test_max_collateral_when_data_invalid():
+    m = market(data=DATA._replace(price_one_macro_window_ago=10**18))
+    assert max_collateral(m, 10**18, True) == 0
+    assert max_leverage(m, 10**18, True) == 0
+
+
+@pytest.mark.parametrize("is_long", [True, False])
+@pytest.mark.parametrize("collateral", [10**18, 10**23])
+def test_max_leverage(is_long, collateral):
+    m = market()
+    leverage = max_leverage(m, collateral, is_long)
+    assert can_build(m, collateral, leverage, is_long)
+    if leverage < PARAMS[5]:
+        assert not can_build(m, collateral, leverage + 1, is_long)
+    else:
+        # small collateral is only bound by cap leverage
+        assert collateral == 10**18
+
+
+def test_max_leverage_with_recent_volume():
+    # recent ask volume of 50% of cap leaves less room before liquidatable
+    m = market()
+    volume = market(snapshots=(EMPTY[0], Snapshot(1000, 600, 5 * 10**17),
+                               EMPTY[2]))
+    assert max_leverage(volume, 10**23, True) \
+        < max_leverage(m, 10**23, True)
+
+
+def test_max_size():
+    m = market()
+    assert max_size(m, True, leverage=10**18) \
+        == max_collateral(m, 10**18, True)
+    assert max_size(m, True, collateral=10**18) \
+        == max_leverage(m, 10**18, True)
+    with pytest.raises(ValueError):
+        max_size(m, True)
@@ -0,0 +1,142 @@
+from scripts.reference.roller import Snapshot, transform
+from scripts.utils.supply import (
+    ZERO_ADDRESS, SupplyLedger, load, reconcile
+)
+from .helpers import log, transfer
+
+
+MARKET = "0x8cc9a4a3a2a9cc6b4c0b3d2ee2b1b3f1f1e6d000"
+FEE_RECIPIENT = "0xf000000000000000000000000000000000000000"
+ALICE = "0x1000000000000000000000000000000000000000"
+BOB = "0x2000000000000000000000000000000000000000"
+
+
+def logs():
+    events = [
+        log(MARKET, "Build", {"sender": ALICE, "positionId": 0}, 1, "0x1", 0),
+        log(MARKET, "Unwind",
+            {"sender": ALICE, "positionId": 0, "mint": 100}, 2, "0x2", 0),
+        log(MARKET, "Unwind",
+            {"sender": ALICE, "positionId": 1, "mint": -30}, 3, "0x3", 0),
+        log(MARKET, "Liquidate",
+            {"sender": BOB, "owner": ALICE, "positionId": 2, "mint": -10},
+            3, "0x4", 0),
+    ]
+    transfers = [
+        transfer(ALICE, MARKET, 101, 1, "0x1", 1),
+        transfer(ZERO_ADDRESS, MARKET, 100, 2, "0x2", 1),
+        transfer(MARKET, ALICE, 190, 2, "0x2", 2),
+        transfer(MARKET, FEE_RECIPIENT, 1, 2, "0x2", 3),
+        transfer(MARKET, ZERO_ADDRESS, 30, 3, "0x3", 1),
+        transfer(MARKET, ALICE, 60, 3, "0x3", 2),
+        transfer(MARKET, FEE_RECIPIENT, 1, 3, "0x3", 3),
+        transfer(MARKET, ZERO_ADDRESS, 10, 3, "0x4", 1),
+        transfer(MARKET, BOB, 1, 3, "0x4", 2),
+        transfer(MARKET, FEE_RECIPIENT, 2, 3, "0x4", 3),
+    ]
+    timestamps = {1: 0, 2: 100, 3: 600}
+    return events, transfers, timestamps
+
+
+def test_reconcile():
+    records = reconcile(*logs())
+    assert [(r.event, r.owner, r.position_id, r.minted) for r in records] \
+        == [("Unwind", ALICE, 0, 100), ("Unwind", ALICE, 1, -30),
+            ("Liquidate", ALICE, 2, -10)]
+    assert all(r.matches for r in records)
+
+
+def test_reconcile_chain_order():
+    # transaction hashes don't order logs within a block
+    events = [
+        log(MARKET, "Unwind",
+            {"sender": ALICE, "positionId": 0, "mint": 100}, 2, "0xb", 0),
+        log(MARKET, "Unwind",
+            {"sender": ALICE, "positionId": 1, "mint": -30}, 2, "0xa", 4),
+    ]
+    transfers = [
+        transfer(ZERO_ADDRESS, MARKET, 100, 2, "0xb", 1),
+        transfer(MARKET, ZERO_ADDRESS, 30, 2, "0xa", 5),
+    ]
+    records = reconcile(events, transfers, {2: 100})
+    assert [(r.position_id, r.log_index) for r in records] \
+        == [(0, 0), (1, 4)]
+
+
+def test_ledger():
+    ledger = SupplyLedger(window=1000)
+    ledger.add(reconcile(*logs()))
+    s = ledger.markets[MARKET]
+    assert (s.minted, s.burned, s.net) == (100, 40, 60)
+    assert [ledger.net_at(MARKET, t) for t in (0, 100, 599, 600)] \
+        == [0, 100, 100, 60]
+    assert ledger.day == {(MARKET, 0): 60}
+    assert ledger.mismatches() == []
+
+    # 100 decays to 50 over half the window, then 40 burned. window is
+    # the value weighted (50 * 500 + 40 * 1000) / 90
+    assert ledger.rolling(MARKET, 600) == 10
+    assert ledger.rolling(MARKET, 10**6) == 0
+    assert ledger.compare(MARKET, Snapshot(600, 722, 10), 700) \
+        == (ledger.rolling(MARKET, 700),) * 2
+
+
+def test_ledger_window_updates(tmp_path):
+    # window set to 2000 between the block 2 unwind and the block 3 logs
+    ledger = SupplyLedger(window=1000)
+    ledger.set_window(MARKET, 2000, 2, 5)
+    ledger.add(reconcile(*logs()))
+
+    snapshot = transform(Snapshot(0, 0, 0), 100, 1000, 100)
+    for mint in (-30, -10):
+        snapshot = transform(snapshot, 600, 2000, mint)
+    assert ledger.markets[MARKET].snapshot == snapshot
+    assert ledger.rolling(MARKET, 700) \
+        == ledger.compare(MARKET, snapshot, 700)[1]
+
+    unchanged = SupplyLedger(window=1000)
+    unchanged.add(reconcile(*logs()))
+    assert unchanged.markets[MARKET].snapshot != snapshot
+
+    path = str(tmp_path / "supply.json")
+    ledger.save(path)
+    resumed = load(path)
+    assert resumed.windows == ledger.windows
+    assert resumed.rolling(MARKET, 700) == ledger.rolling(MARKET, 700)
+
+
+def test_ledger_mismatch():
+    events, transfers, timestamps = logs()
+    events[1].args["mint"] = 99
+    ledger = SupplyLedger(window=1000)
+    ledger.add(reconcile(events, transfers, timestamps))
+    [r] = ledger.mismatches()
+    assert (r.position_id, r.minted, r.expected) == (0, 100, 99)
+
+
+def test_ledger_save_resume(tmp_path):
+    events, transfers, timestamps = logs()
+    ledger = SupplyLedger(window=1000)
+    ledger.add(reconcile(events, transfers, timestamps), 10)
+    assert ledger.last_block == 10
+
+    # scan to block 2, save, then resume from the saved last block
+    path = str(tmp_path / "supply.json")
+    first = SupplyLedger(window=1000)
+    first.add(reconcile(
+        [e for e in events if e.blockNumber <= 2],
+        [t for t in transfers if t.blockNumber <= 2], timestamps), 2)
+    first.save(path)
+    resumed = load(path)
+    assert resumed.last_block == 2
+    assert resumed.records == first.records
+    assert resumed.markets == first.markets
+
+    resumed.add(reconcile(
+        [e for e in events if e.blockNumber > 2],
+        [t for t in transfers if t.blockNumber > 2], timestamps), 10)
+    assert resumed.records == ledger.records
+    assert resumed.markets == ledger.markets
+    assert (resumed.hour, resumed.day) == (ledger.hour, ledger.day)
+    assert resumed.rolling(MARKET, 700) == ledger.rolling(MARKET, 700)
+    assert resumed.last_block == 10
@@ -0,0 +1,64 @@
+import numpy as np
+
+from pytest import approx
+
+from scripts.reference import tick
+from scripts.utils.tick_error import (
+    analyze, price_to_tick, round_trip, synthetic, tick_to_price
+)
+
+
+PRICE = 2000000000000000000000  # 2000
+
+
+def test_price_to_tick_matches_reference():
+    rng = np.random.default_rng(1)
+    prices = [int(p) for p in np.exp(rng.uniform(-20, 40, 200)) * 1e18]
+
+    # prices exactly at and either side of tick boundaries
+    for t in (-76013, -1, 0, 1, 76013, 200000):
+        p = tick.tick_to_price(t)
+        prices += [p - 1, p, p + 1]
+
+    expect = [tick.price_to_tick(p) for p in prices]
+    assert price_to_tick(prices).tolist() == expect
+    assert tick_to_price(expect).tolist() == [
+        tick.tick_to_price(t) / 1e18 for t in expect]
+
+
+def test_round_trip_truncates_toward_zero():
+    prices = round_trip([PRICE, 10**15])
+
+    # above one rounds down, below one rounds up, by at most a tick
+    assert PRICE / 1.0001 / 1e18 < prices[0] <= PRICE / 1e18
+    assert 1e-3 <= prices[1] < 1.0001e-3
+
+
+def test_analyze():
+    builds = synthetic(10000, 2000., 0.05, 0.0025)
+    bias = analyze(*builds)
+    assert bias["all"].count == 10000
+    assert bias["long"].count + bias["short"].count == 10000
+
+    # prices above one round down so entry errors are within (-1bp, 0]
+    for side in ("long", "short"):
+        assert -1 < bias[side].entry_error_mean <= 0
+        assert -1 < bias[side].entry_error_max <= 0
+    assert bias["all"].pnl_bias_total == approx(
+        bias["long"].pnl_bias_total + bias["short"].pnl_bias_total)
+
+    # longs enter lower so gain, shorts enter lower so lose
+    assert bias["long"].pnl_bias_mean > 0
+    assert bias["short"].pnl_bias_mean < 0
+
+
+def test_round_trip_of_tick_price_drops_a_tick():
+    # logDown rounds a price exactly at a tick just below it
+    price = tick.tick_to_price(76013)
+    assert price_to_tick([price]).tolist() == [76012]
+    assert round_trip([price])[0] == tick.tick_to_price(76012) / 1e18
+
+    bias = analyze([True, False], [1000., 1000.], [price] * 2, [price] * 2,
+                   [PRICE] * 2)
+    assert bias["long"].entry_error_max == approx(1 / 1.0001 * 1e4 - 1e4)
+    assert analyze([], [], [], [], [])["long"].count == 0
@@ -0,0 +1,109 @@
+import pytest
+from brownie import OverlayV1Token, web3
+
+from scripts.utils.transactions import (
+    CONFIRMED, FAILED, SKIPPED, PipelinedSender, contract_address
+)
+
+
+class Unverifiable:
+    """
+    Contract container whose source verification fails
+    """
+
+    def __init__(self, container):
+        self._container = container
+
+    def __getattr__(self, name):
+        return getattr(self._container, name)
+
+    def publish_source(self, contract):
+        raise ValueError("explorer unavailable")
+
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+
+@pytest.fixture(scope="module")
+def minter_role():
+    yield web3.solidity_keccak(['string'], ["MINTER"])
+
+
+def test_contract_address(accounts):
+    nonce = accounts[0].nonce
+    tok = accounts[0].deploy(OverlayV1Token)
+    assert contract_address(accounts[0].address, nonce) == tok.address
+
+
+def test_run_sends_steps_in_dependency_rounds(accounts, minter_role):
+    dev = accounts[0]
+    nonce = dev.nonce
+    sender = PipelinedSender(dev)
+
+    # token deploy and grants that only need the token deployed
+    ovl = sender.deploy(OverlayV1Token)
+    grants = [sender.transact(ovl, "grantRole", minter_role, accounts[i])
+              for i in range(1, 4)]
+    renounce = sender.transact(ovl, "renounceRole", "0x00", dev,
+                               after=grants)
+    sender.run()
+
+    # check nonces assigned locally in queue order
+    assert [s.nonce for s in sender.steps] == list(range(nonce, nonce + 5))
+    assert all(s.status == CONFIRMED for s in sender.steps)
+
+    # check predicted address matches deployed token
+    tok = OverlayV1Token.at(ovl.address)
+    assert ovl.address == contract_address(dev.address, nonce)
+    for i in range(1, 4):
+        assert tok.hasRole(minter_role, accounts[i]) is True
+    assert tok.hasRole("0x00", dev) is False
+
+    # check grants were sent together in one round
+    assert sender.rounds == 3
+    assert renounce.tx.block_number >= max(g.tx.block_number for g in grants)
+    assert sender.gas_used == sum(s.tx.gas_used for s in sender.steps)
+
+
+def test_run_skips_steps_after_failure(accounts, minter_role):
+    dev = accounts[0]
+    sender = PipelinedSender(dev)
+
+    # dev does not have minter role so mint reverts
+    ovl = sender.deploy(OverlayV1Token)
+    mint = sender.transact(ovl, "mint", dev, 1)
+    renounce = sender.transact(ovl, "renounceRole", "0x00", dev,
+                               after=[mint])
+
+    with pytest.raises(RuntimeError):
+        sender.run()
+
+    assert ovl.status == CONFIRMED
+    assert mint.status == FAILED
+    assert renounce.status == SKIPPED
+    assert renounce.tx is None
+
+    # sender still has admin since renounce never sent
+    tok = OverlayV1Token.at(ovl.address)
+    assert tok.hasRole("0x00", dev) is True
+
+
+def test_run_confirms_deploy_when_verification_fails(accounts, minter_role):
+    dev = accounts[0]
+    sender = PipelinedSender(dev, publish_source=True)
+
+    ovl = sender.deploy(Unverifiable(OverlayV1Token))
+    grant = sender.transact(ovl, "grantRole", minter_role, accounts[1])
+    sender.run()
+
+    # deploy still confirmed with a warning, and its dependent sent
+    assert ovl.status == CONFIRMED
+    assert ovl.error is None
+    assert "explorer unavailable" in ovl.warning
+    assert grant.status == CONFIRMED
+    assert "explorer unavailable" in sender.summary()[0]
+
+    tok = OverlayV1Token.at(ovl.address)
+    assert tok.hasRole(minter_role, accounts[1]) is True
@@ -0,0 +1,70 @@
+import pytest
+
+from scripts.reference.market import MarketState, build, dp_upper_limit
+from scripts.reference.oracle import Data
+from scripts.reference.roller import Snapshot
+from scripts.utils.impact import Market
+from scripts.utils.unwind_plan import plan, simulate
+from .helpers import PARAMS
+
+
+DATA = Data(1000, 600, 3600, 2000000000000000000000,
+            2010000000000000000000, 2000000000000000000000,
+            1000000000000000000000000, True)
+
+
+def built(is_long=True):
+    """
+    Returns the market a micro window after a large build, and the
+    position
+    """
+    m = Market(MarketState(PARAMS, 0, 0, 0, 0, 0), (Snapshot(0, 0, 0),) * 3,
+               DATA, dp_upper_limit(PARAMS[13], 3600), 1000)
+    b = build(*m, 100000 * 10**18, 10**18, is_long)
+    return Market(b.state, b.snapshots, DATA, m.dp_upper_limit,
+                  m.timestamp + 600), b.position
+
+
+@pytest.mark.parametrize("is_long", [True, False])
+def test_simulate_full_unwind(is_long):
+    m, pos = built(is_long)
+    one = simulate(m, pos, 10**18, 1, 0)
+    assert len(one.slices) == 1
+
+    # spacing slices a micro window apart lets volume decay in between
+    four = simulate(m, pos, 10**18, 4, 600)
+    assert len(four.slices) == 4
+    assert [s.time for s in four.slices] == [0, 600, 1200, 1800]
+    assert all(s.fraction % 10**14 == 0 for s in four.slices)
+    assert four.slices[-1].fraction == 10**18
+    assert four.proceeds > one.proceeds
+    assert one.risk == 0 and four.risk == 0
+
+
+def test_simulate_partial_unwind():
+    m, pos = built()
+    half = simulate(m, pos, 5 * 10**17, 3, 300, volatility=1e-4)
+    assert len(half.slices) == 3
+    assert half.risk > 0
+
+    # slices remove a third of the half each, to the bps
+    remaining = pos.fraction_remaining
+    for s in half.slices:
+        remaining = remaining * (10**18 - s.fraction) // 10**18
+    assert remaining == pos.fraction_remaining // 2
+
+
+def test_plan_trades_impact_against_risk():
+    m, pos = built()
+    patient = plan(m, pos, max_slices=5)
+    assert len(patient.slices) == 5
+    assert patient.interval > 0
+
+    # high risk aversion unwinds at once, though still in slices since
+    # each slice in the same block is priced before the next's volume
+    hurried = plan(m, pos, volatility=1e-3, risk_aversion=1.,
+                   max_slices=5)
+    assert hurried.interval == 0 and hurried.risk == 0
+    assert hurried.proceeds < patient.proceeds
+    prices = [s.price / 1e18 for s in hurried.slices]
+    assert min(prices) < hurried.average_price < max(prices)
@@ -0,0 +1,64 @@
+from scripts.reference.market import MAX_NATURAL_EXPONENT, MarketState
+from scripts.reference.oracle import Data
+from scripts.utils.updates import (
+    DEFAULT_UPDATE_GAS, UpdateScheduler, funding_step, saturation_time
+)
+from .helpers import PARAMS
+
+
+PRICE = 2000000000000000000000  # 2000
+DATA = Data(1000, 600, 3600, PRICE, PRICE, PRICE,
+            1000000000000000000000000, True)
+DP_UPPER_LIMIT = 10**18 * 11 // 10
+
+
+def state(oi_long, oi_short):
+    return MarketState(PARAMS, oi_long, oi_short, oi_long, oi_short, 1000)
+
+
+def test_funding_step():
+    s = state(10 * 10**18, 2 * 10**18)
+    assert funding_step(s, PRICE, 1000) == 0
+    step = funding_step(s, PRICE, 1100)
+    assert step > 0
+    assert funding_step(s, PRICE, 2000) > step
+
+    # balanced market pays no funding
+    assert funding_step(state(10**18, 10**18), PRICE, 10**6) == 0
+
+
+def test_poke_and_schedule():
+    # settling 1 OVL of funding worth 1000 gas at 1 gwei
+    scheduler = UpdateScheduler(gas_price=10**9, error_price=10**9 * 10**3,
+                                gas_budget=2 * DEFAULT_UPDATE_GAS)
+    heavy = state(1000 * 10**18, 10 * 10**18)
+    light = state(10 * 10**18, 9 * 10**18)
+    pokes = [scheduler.poke(m, s, DATA, DP_UPPER_LIMIT, PRICE, 1000 + dt)
+             for m, s, dt in [("a", heavy, 600), ("b", light, 600),
+                              ("c", heavy, 60), ("d", heavy, 0)]]
+    assert pokes[3] is None
+    assert pokes[0].score > pokes[2].score > 0 > pokes[1].score
+    assert [p.market for p in scheduler.schedule(pokes)] == ["a", "c"]
+
+    # forced pokes first, even if not worth the gas, within budget
+    scheduler.max_interval = 300
+    pokes = [scheduler.poke(m, s, DATA, DP_UPPER_LIMIT, PRICE, 1000 + dt)
+             for m, s, dt in [("a", heavy, 60), ("b", light, 600),
+                              ("c", heavy, 120)]]
+    assert [p.market for p in scheduler.schedule(pokes)] == ["b", "c"]
+
+    # invalid data would revert
+    invalid = DATA._replace(price_one_macro_window_ago=PRICE // 2)
+    assert scheduler.poke("a", heavy, invalid, DP_UPPER_LIMIT, PRICE,
+                          2000) is None
+
+
+def test_saturation_forces_poke():
+    k = PARAMS[0]
+    s = state(10 * 10**18, 2 * 10**18)
+    assert saturation_time(s) == MAX_NATURAL_EXPONENT // (2 * k)
+    scheduler = UpdateScheduler(gas_price=10**12, error_price=0,
+                                gas_budget=10**6)
+    poke = scheduler.poke("a", s, DATA, DP_UPPER_LIMIT, PRICE,
+                          1000 + saturation_time(s) // 2)
+    assert poke.forced and poke.score < 0
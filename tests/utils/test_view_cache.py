@@ -0,0 +1,124 @@
+import pytest
+
+from types import SimpleNamespace
+
+from scripts.utils.view_cache import CachedContract, ViewCache
+
+
+MARKET = "0x8cc9a4a3a2a9cc6b4c0b3d2ee2b1b3f1f1e6d000"
+FACTORY = "0x1000000000000000000000000000000000000000"
+
+
+class Method:
+    """
+    Stands in for a brownie ContractCall, counting calls per block. Calls
+    without a block_identifier are made at head()
+    """
+
+    def __init__(self, name, values, head, mutability="view"):
+        self.abi = {"name": name, "stateMutability": mutability}
+        self.signature = "0x" + name.encode().hex()[:8]
+        self.values = values
+        self.head = head
+        self.calls = []
+
+    def __call__(self, *args, block_identifier=None):
+        self.calls.append((args, block_identifier))
+        block = block_identifier if block_identifier is not None \
+            else self.head()
+        return self.values(block, *args)
+
+
+def contract(cache):
+    def head():
+        return cache.latest
+    return SimpleNamespace(
+        address=MARKET,
+        oiLong=Method("oiLong", lambda block: block * 10, head),
+        params=Method("params", lambda block, i: i + 100, head),
+        feed=Method("feed", lambda block: FACTORY, head),
+        positions=Method("positions", lambda block, key: len(key), head),
+        update=Method("update", lambda block: None, head, "nonpayable"))
+
+
+def test_views_cached_per_block():
+    cache = ViewCache(max_age=2)
+    c = contract(cache)
+    market = CachedContract(c, cache)
+
+    cache.advance(10)
+    assert market.oiLong() == 100
+    assert market.oiLong() == 100
+    assert market.oiLong(block_identifier=9) == 90
+    cache.advance(11)
+    assert market.oiLong() == 110
+    assert len(c.oiLong.calls) == 3
+    assert cache.stats()["oiLong"] == (1, 3)
+
+    # evicted once more than max_age blocks old, and not cached again
+    cache.advance(12)
+    market.oiLong(block_identifier=10)
+    assert len(c.oiLong.calls) == 3
+    cache.advance(13)
+    market.oiLong(block_identifier=10)
+    market.oiLong(block_identifier=10)
+    assert len(c.oiLong.calls) == 5
+
+
+def test_immutables_and_sticky_views():
+    cache = ViewCache(max_age=1)
+    c = contract(cache)
+    market = CachedContract(c, cache)
+
+    for block in range(10, 20):
+        cache.advance(block)
+        assert market.feed() == FACTORY
+        assert market.params(0) == 100
+        assert market.params(1) == 101
+    assert len(c.feed.calls) == 1
+    assert len(c.params.calls) == 2
+
+    # unrelated events don't invalidate
+    assert not cache.observe(SimpleNamespace(event="Build", address=MARKET,
+                                             block_number=20))
+    updated = SimpleNamespace(event="ParamUpdated", address=FACTORY,
+                              args={"market": MARKET.upper()},
+                              block_number=20)
+    assert cache.observe(updated)
+    cache.advance(20)
+    market.params(0)
+    market.params(0)
+    assert len(c.params.calls) == 3
+
+    # reads before the event aren't cached as current
+    market.params(0, block_identifier=19)
+    market.params(0)
+    assert len(c.params.calls) == 4
+
+    cache.observe(SimpleNamespace(event="CacheRiskCalc", address=MARKET,
+                                  blockNumber=21))
+    cache.advance(21)
+    market.params(0)
+    assert len(c.params.calls) == 5
+    assert cache.hit_rate == pytest.approx(
+        sum(cache.hits.values()) / (sum(cache.hits.values()) + 6))
+
+
+def test_transactions_not_cached():
+    cache = ViewCache()
+    c = contract(cache)
+    market = CachedContract(c, cache)
+    assert market.update is c.update
+
+    with pytest.raises(ValueError):
+        market.oiLong()
+
+
+def test_list_args_cached():
+    cache = ViewCache()
+    c = contract(cache)
+    market = CachedContract(c, cache)
+    cache.advance(10)
+    assert market.positions([1, [2, 3]]) == 2
+    assert market.positions((1, (2, 3))) == 2
+    assert len(c.positions.calls) == 1
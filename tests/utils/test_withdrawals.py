@@ -0,0 +1,52 @@
+from scripts.reference import position
+from scripts.reference.position import Info
+from scripts.utils.withdrawals import plan
+
+
+ALICE = "0x1000000000000000000000000000000000000000"
+BOB = "0x2000000000000000000000000000000000000000"
+
+
+def info(collateral, leverage=2, fraction_remaining=10000, liquidated=False):
+    notional = collateral * leverage
+    debt = notional - collateral
+    return Info(notional, debt, 0, 0, True, liquidated, notional,
+                fraction_remaining)
+
+
+def test_plan_orders_largest_first_and_skips_closed():
+    ids = [(ALICE, 0), (BOB, 0), (ALICE, 1), (BOB, 1), (ALICE, 2)]
+    positions = [info(3 * 10**18), info(5 * 10**18),
+                 info(7 * 10**18, fraction_remaining=0),
+                 info(2 * 10**18, fraction_remaining=5000),
+                 info(10**18, liquidated=True, fraction_remaining=0)]
+    p = plan(ids, positions, 100 * 10**18)
+
+    assert [(w.owner, w.position_id) for w in p.withdrawals] \
+        == [(BOB, 0), (ALICE, 0), (BOB, 1)]
+    for w in p.withdrawals:
+        pos = positions[ids.index((w.owner, w.position_id))]
+        assert w.cost == position.cost(pos, 10**18)
+        assert w.amount == w.cost
+    assert p.owed == 9 * 10**18
+    assert p.shortfall == 0
+    assert p.remaining == 91 * 10**18
+    assert p.by_owner() == {BOB: [p.withdrawals[0], p.withdrawals[2]],
+                            ALICE: [p.withdrawals[1]]}
+
+
+def test_plan_with_shortfall():
+    ids = [(ALICE, 0), (BOB, 0), (BOB, 1)]
+    positions = [info(3 * 10**18), info(5 * 10**18), info(10**18)]
+    p = plan(ids, positions, 6 * 10**18)
+
+    # paid in order until the balance runs out
+    assert [w.amount for w in p.withdrawals] == [5 * 10**18, 10**18, 0]
+    assert p.shortfall == 3 * 10**18
+    assert p.remaining == 0
+
+    # smallest first makes the most owners whole
+    p = plan(ids, positions, 6 * 10**18,
+             priority=lambda owner, id, cost: (cost, owner, id))
+    assert [w.amount for w in p.withdrawals] \
+        == [10**18, 3 * 10**18, 2 * 10**18]